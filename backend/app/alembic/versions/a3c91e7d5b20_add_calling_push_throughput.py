@@ -0,0 +1,27 @@
+"""add calling push throughput
+
+Revision ID: a3c91e7d5b20
+Revises: 615dfa3b142d
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c91e7d5b20'
+down_revision: Union[str, None] = '615dfa3b142d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('calling_task_config', sa.Column('push_concurrency', sa.Integer(), server_default='5', nullable=False, comment='推送并发数'), schema='calling')
+    op.add_column('calling_task_config', sa.Column('push_rate_limit', sa.Float(), server_default='0', nullable=False, comment='每秒最大推送数(0=不限速)'), schema='calling')
+
+
+def downgrade() -> None:
+    op.drop_column('calling_task_config', 'push_rate_limit', schema='calling')
+    op.drop_column('calling_task_config', 'push_concurrency', schema='calling')
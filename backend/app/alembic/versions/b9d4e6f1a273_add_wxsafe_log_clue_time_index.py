@@ -0,0 +1,27 @@
+"""add wxsafe log clue/time index
+
+Revision ID: b9d4e6f1a273
+Revises: e5b8d27c4a10
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'b9d4e6f1a273'
+down_revision: Union[str, None] = 'e5b8d27c4a10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # (clue_number, created_time) 复合索引可覆盖原 clue_number 单列索引
+    op.drop_index(op.f('ix_wxsafe_wxsafe_fz_log_clue_number'), table_name='wxsafe_fz_log', schema='wxsafe', if_exists=True)
+    op.create_index('ix_wxsafe_fz_log_clue_created_time', 'wxsafe_fz_log', ['clue_number', 'created_time'], unique=False, schema='wxsafe', if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_wxsafe_fz_log_clue_created_time', table_name='wxsafe_fz_log', schema='wxsafe')
+    op.create_index(op.f('ix_wxsafe_wxsafe_fz_log_clue_number'), 'wxsafe_fz_log', ['clue_number'], unique=False, schema='wxsafe')
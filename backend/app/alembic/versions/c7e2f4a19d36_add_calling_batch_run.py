@@ -0,0 +1,48 @@
+"""add calling batch run
+
+Revision ID: c7e2f4a19d36
+Revises: a3c91e7d5b20
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e2f4a19d36'
+down_revision: Union[str, None] = 'a3c91e7d5b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('call_batch_run',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False, comment='批次ID'),
+    sa.Column('task_id', sa.Integer(), nullable=False, comment='任务配置ID'),
+    sa.Column('status', sa.String(length=20), nullable=False, comment='状态(running/completed/failed/interrupted)'),
+    sa.Column('cursor_mobile', sa.String(length=20), nullable=True, comment='检查点: 已处理的最后一个手机号'),
+    sa.Column('chunk_count', sa.Integer(), nullable=False, comment='已完成分片数'),
+    sa.Column('total_count', sa.Integer(), nullable=False, comment='已推送号码数'),
+    sa.Column('success_count', sa.Integer(), nullable=False, comment='推送成功数'),
+    sa.Column('fail_count', sa.Integer(), nullable=False, comment='推送失败数'),
+    sa.Column('error_msg', sa.String(length=2000), nullable=True, comment='错误信息'),
+    sa.Column('started_time', sa.DateTime(), nullable=False, comment='开始时间'),
+    sa.Column('updated_time', sa.DateTime(), nullable=False, comment='检查点更新时间'),
+    sa.Column('finished_time', sa.DateTime(), nullable=True, comment='结束时间'),
+    sa.PrimaryKeyConstraint('id'),
+    schema='calling'
+    )
+    op.create_index(op.f('ix_calling_call_batch_run_task_id'), 'call_batch_run', ['task_id'], unique=False, schema='calling')
+    op.add_column('call_log', sa.Column('run_id', sa.Integer(), nullable=True, comment='批次ID'), schema='calling')
+    op.create_index(op.f('ix_calling_call_log_run_id'), 'call_log', ['run_id'], unique=False, schema='calling')
+    op.create_unique_constraint('uq_call_log_run_mobile', 'call_log', ['run_id', 'mobile_phone'], schema='calling')
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_call_log_run_mobile', 'call_log', schema='calling', type_='unique')
+    op.drop_index(op.f('ix_calling_call_log_run_id'), table_name='call_log', schema='calling')
+    op.drop_column('call_log', 'run_id', schema='calling')
+    op.drop_index(op.f('ix_calling_call_batch_run_task_id'), table_name='call_batch_run', schema='calling')
+    op.drop_table('call_batch_run', schema='calling')
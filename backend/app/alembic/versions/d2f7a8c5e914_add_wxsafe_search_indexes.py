@@ -0,0 +1,51 @@
+"""add wxsafe search indexes and location code
+
+Revision ID: d2f7a8c5e914
+Revises: b9d4e6f1a273
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2f7a8c5e914'
+down_revision: Union[str, None] = 'b9d4e6f1a273'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('wxsafe_fz_detail', sa.Column('join_location_code', sa.String(length=64), nullable=True, comment='入网属地编码 (规范化属地名，用于属地隔离等值查询)'), schema='wxsafe')
+    op.create_index(op.f('ix_wxsafe_wxsafe_fz_detail_join_location_code'), 'wxsafe_fz_detail', ['join_location_code'], unique=False, schema='wxsafe')
+
+    # 模糊检索 (LIKE '%x%') 三元组索引
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index('ix_wxsafe_fz_master_clue_trgm', 'wxsafe_fz_master', ['clue_number'], unique=False, schema='wxsafe', postgresql_using='gin', postgresql_ops={'clue_number': 'gin_trgm_ops'})
+    op.create_index('ix_wxsafe_fz_master_phone_trgm', 'wxsafe_fz_master', ['phone_number'], unique=False, schema='wxsafe', postgresql_using='gin', postgresql_ops={'phone_number': 'gin_trgm_ops'})
+    op.create_index('ix_wxsafe_fz_detail_location_trgm', 'wxsafe_fz_detail', ['join_location'], unique=False, schema='wxsafe', postgresql_using='gin', postgresql_ops={'join_location': 'gin_trgm_ops'})
+
+    # 按部门属地（去掉 "分公司"、"市"）最长前缀补全已有数据的属地编码
+    op.execute(
+        """
+        UPDATE wxsafe.wxsafe_fz_detail d
+        SET join_location_code = (
+            SELECT c.code
+            FROM (SELECT DISTINCT trim(replace(replace(name, '分公司', ''), '市', '')) AS code FROM sys_dept) c
+            WHERE c.code <> '' AND d.join_location LIKE c.code || '%'
+            ORDER BY length(c.code) DESC
+            LIMIT 1
+        )
+        WHERE d.join_location IS NOT NULL AND d.join_location_code IS NULL
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_wxsafe_fz_detail_location_trgm', table_name='wxsafe_fz_detail', schema='wxsafe')
+    op.drop_index('ix_wxsafe_fz_master_phone_trgm', table_name='wxsafe_fz_master', schema='wxsafe')
+    op.drop_index('ix_wxsafe_fz_master_clue_trgm', table_name='wxsafe_fz_master', schema='wxsafe')
+    op.drop_index(op.f('ix_wxsafe_wxsafe_fz_detail_join_location_code'), table_name='wxsafe_fz_detail', schema='wxsafe')
+    op.drop_column('wxsafe_fz_detail', 'join_location_code', schema='wxsafe')
@@ -0,0 +1,41 @@
+"""add call log indexes and daily rollup
+
+Revision ID: e5b8d27c4a10
+Revises: c7e2f4a19d36
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b8d27c4a10'
+down_revision: Union[str, None] = 'c7e2f4a19d36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('call_log_daily',
+    sa.Column('stat_date', sa.Date(), nullable=False, comment='统计日期'),
+    sa.Column('sys_name', sa.String(length=50), nullable=False, comment='系统名称'),
+    sa.Column('order_type', sa.String(length=50), nullable=False, comment='工单类型'),
+    sa.Column('success_count', sa.Integer(), nullable=False, comment='成功数'),
+    sa.Column('fail_count', sa.Integer(), nullable=False, comment='失败数'),
+    sa.Column('updated_time', sa.DateTime(), nullable=False, comment='汇总时间'),
+    sa.PrimaryKeyConstraint('stat_date', 'sys_name', 'order_type'),
+    schema='calling'
+    )
+    # (mobile_phone, push_time) 复合索引可覆盖原 mobile_phone 单列索引
+    op.drop_index(op.f('ix_calling_call_log_mobile_phone'), table_name='call_log', schema='calling')
+    op.create_index('ix_call_log_mobile_push_time', 'call_log', ['mobile_phone', 'push_time'], unique=False, schema='calling')
+    op.create_index('ix_call_log_push_time', 'call_log', ['push_time'], unique=False, schema='calling')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_call_log_push_time', table_name='call_log', schema='calling')
+    op.drop_index('ix_call_log_mobile_push_time', table_name='call_log', schema='calling')
+    op.create_index(op.f('ix_calling_call_log_mobile_phone'), 'call_log', ['mobile_phone'], unique=False, schema='calling')
+    op.drop_table('call_log_daily', schema='calling')
@@ -0,0 +1,112 @@
+"""add wxsafe location code triggers
+
+Revision ID: f4c1e9a7b358
+Revises: d2f7a8c5e914
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4c1e9a7b358'
+down_revision: Union[str, None] = 'd2f7a8c5e914'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 入网属地编码：去掉 "分公司"、"市" 的部门名中与入网属地前缀匹配的最长者
+    # (search_path 固定为迁移时的值，外部程序以其他 search_path 写入附表时也能找到 sys_dept)
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION wxsafe.wxsafe_location_code(location text) RETURNS varchar
+        LANGUAGE sql STABLE SET search_path FROM CURRENT AS $$
+            SELECT c.code
+            FROM (SELECT DISTINCT trim(replace(replace(name, '分公司', ''), '市', '')) AS code FROM sys_dept) c
+            WHERE c.code <> '' AND left(trim(location), length(c.code)) = c.code
+            ORDER BY length(c.code) DESC
+            LIMIT 1
+        $$
+        """
+    )
+
+    # 附表写入入网属地时 (含外部程序直接写入) 计算编码
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION wxsafe.wxsafe_fz_detail_location_code() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            NEW.join_location_code := wxsafe.wxsafe_location_code(NEW.join_location);
+            RETURN NEW;
+        END
+        $$
+        """
+    )
+    op.execute('DROP TRIGGER IF EXISTS trg_wxsafe_fz_detail_location_code ON wxsafe.wxsafe_fz_detail')
+    op.execute(
+        """
+        CREATE TRIGGER trg_wxsafe_fz_detail_location_code
+        BEFORE INSERT OR UPDATE OF join_location ON wxsafe.wxsafe_fz_detail
+        FOR EACH ROW EXECUTE PROCEDURE wxsafe.wxsafe_fz_detail_location_code()
+        """
+    )
+
+    # 部门新增、删除、改名时重新计算入网属地以新旧编码开头的行
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION wxsafe.wxsafe_refresh_location_codes() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            codes text[] := '{}';
+            code text;
+        BEGIN
+            IF TG_OP = 'UPDATE' AND OLD.name IS NOT DISTINCT FROM NEW.name THEN
+                RETURN NULL;
+            END IF;
+            IF TG_OP <> 'INSERT' THEN
+                codes := array_append(codes, trim(replace(replace(OLD.name, '分公司', ''), '市', '')));
+            END IF;
+            IF TG_OP <> 'DELETE' THEN
+                codes := array_append(codes, trim(replace(replace(NEW.name, '分公司', ''), '市', '')));
+            END IF;
+            -- 只有入网属地以新旧编码开头的行可能受影响：LIKE 走 join_location 的 trgm 索引，
+            -- left() 精确比较 (编码含 LIKE 通配符时 LIKE 只作预筛选)
+            FOR code IN SELECT DISTINCT c FROM unnest(codes) AS c WHERE c <> '' LOOP
+                UPDATE wxsafe.wxsafe_fz_detail
+                SET join_location_code = wxsafe.wxsafe_location_code(join_location)
+                WHERE join_location LIKE code || '%'
+                  AND left(join_location, length(code)) = code
+                  AND join_location_code IS DISTINCT FROM wxsafe.wxsafe_location_code(join_location);
+            END LOOP;
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    op.execute('DROP TRIGGER IF EXISTS trg_sys_dept_wxsafe_location_code ON sys_dept')
+    op.execute(
+        """
+        CREATE TRIGGER trg_sys_dept_wxsafe_location_code
+        AFTER INSERT OR DELETE OR UPDATE OF name ON sys_dept
+        FOR EACH ROW EXECUTE PROCEDURE wxsafe.wxsafe_refresh_location_codes()
+        """
+    )
+
+    # 修正已有数据中为空或已过期的编码
+    op.execute(
+        """
+        UPDATE wxsafe.wxsafe_fz_detail
+        SET join_location_code = wxsafe.wxsafe_location_code(join_location)
+        WHERE join_location_code IS DISTINCT FROM wxsafe.wxsafe_location_code(join_location)
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute('DROP TRIGGER IF EXISTS trg_sys_dept_wxsafe_location_code ON sys_dept')
+    op.execute('DROP TRIGGER IF EXISTS trg_wxsafe_fz_detail_location_code ON wxsafe.wxsafe_fz_detail')
+    op.execute('DROP FUNCTION IF EXISTS wxsafe.wxsafe_refresh_location_codes()')
+    op.execute('DROP FUNCTION IF EXISTS wxsafe.wxsafe_fz_detail_location_code()')
+    op.execute('DROP FUNCTION IF EXISTS wxsafe.wxsafe_location_code(text)')
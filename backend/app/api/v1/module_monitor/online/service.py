@@ -3,6 +3,7 @@ import json
 from redis.asyncio.client import Redis
 
 from app.common.enums import RedisInitKeyConfig
+from app.core.auth_cache import AuthCache
 from app.core.logger import log
 from app.core.redis_crud import RedisCURD
 from app.core.security import decode_access_token
@@ -63,6 +64,7 @@ class OnlineService:
         # 删除 token
         await RedisCURD(redis).delete(f"{RedisInitKeyConfig.ACCESS_TOKEN.key}:{session_id}")
         await RedisCURD(redis).delete(f"{RedisInitKeyConfig.REFRESH_TOKEN.key}:{session_id}")
+        await AuthCache.delete(redis=redis, session_id=session_id)
 
         log.info(f"强制下线用户会话: {session_id}")
         return True
@@ -81,6 +83,7 @@ class OnlineService:
         # 删除 token
         await RedisCURD(redis).clear(f"{RedisInitKeyConfig.ACCESS_TOKEN.key}:*")
         await RedisCURD(redis).clear(f"{RedisInitKeyConfig.REFRESH_TOKEN.key}:*")
+        await AuthCache.invalidate(redis=redis)
 
         log.info("清除所有在线用户会话成功")
         return True
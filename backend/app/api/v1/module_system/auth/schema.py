@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from pydantic import BaseModel, ConfigDict, Field, model_validator
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, model_validator
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.v1.module_system.user.model import UserModel
@@ -15,6 +15,27 @@ class AuthSchema(BaseModel):
     check_data_scope: bool = Field(default=True, description="是否检查数据权限")
     db: AsyncSession = Field(description="数据库会话")
 
+    # 请求级数据权限缓存: (角色数据权限范围集合, 可访问部门ID集合)
+    _data_scope_cache: tuple[frozenset[int], frozenset[int]] | None = PrivateAttr(default=None)
+    # 请求级权限标识缓存，由认证快照预计算
+    _permission_cache: frozenset[str] | None = PrivateAttr(default=None)
+
+    def get_data_scope_cache(self) -> tuple[frozenset[int], frozenset[int]] | None:
+        """获取当前请求已解析的数据权限范围"""
+        return self._data_scope_cache
+
+    def set_data_scope_cache(self, value: tuple[frozenset[int], frozenset[int]]) -> None:
+        """缓存当前请求已解析的数据权限范围"""
+        self._data_scope_cache = value
+
+    def get_permission_cache(self) -> frozenset[str] | None:
+        """获取当前用户已计算的权限标识集合"""
+        return self._permission_cache
+
+    def set_permission_cache(self, value: frozenset[str]) -> None:
+        """缓存当前用户的权限标识集合"""
+        self._permission_cache = value
+
 
 class JWTPayloadSchema(BaseModel):
     """JWT载荷模型"""
@@ -13,6 +13,7 @@ from app.api.v1.module_system.user.crud import UserCRUD
 from app.api.v1.module_system.user.model import UserModel
 from app.common.enums import RedisInitKeyConfig
 from app.config.setting import settings
+from app.core.auth_cache import AuthCache
 from app.core.exceptions import CustomException
 from app.core.logger import log
 from app.core.redis_crud import RedisCURD
@@ -318,6 +319,7 @@ class LoginService:
         # 删除Redis中的在线用户、访问令牌、刷新令牌
         await RedisCURD(redis).delete(f"{RedisInitKeyConfig.ACCESS_TOKEN.key}:{session_id}")
         await RedisCURD(redis).delete(f"{RedisInitKeyConfig.REFRESH_TOKEN.key}:{session_id}")
+        await AuthCache.delete(redis=redis, session_id=session_id)
 
         log.info(f"用户退出登录成功,会话编号:{session_id}")
 
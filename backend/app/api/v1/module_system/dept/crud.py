@@ -1,9 +1,11 @@
 from collections.abc import Sequence
 
+from sqlalchemy import Select, delete, insert, literal, select
+
 from app.api.v1.module_system.auth.schema import AuthSchema
 from app.core.base_crud import CRUDBase
 
-from .model import DeptModel
+from .model import DeptClosureModel, DeptModel
 from .schema import DeptCreateSchema, DeptUpdateSchema
 
 
@@ -99,3 +101,175 @@ class DeptCRUD(CRUDBase[DeptModel, DeptCreateSchema, DeptUpdateSchema]):
         """
         obj = await self.get(id=id)
         return obj.name if obj else None
+
+    async def get_existing_ids_crud(self, ids: Sequence[int]) -> set[int]:
+        """
+        批量查询存在的部门 ID（用于导入等批量写入前的校验）。
+
+        参数:
+        - ids (Sequence[int]): 部门 ID 列表。
+
+        返回:
+        - set[int]: 存在的部门 ID。
+        """
+        if not ids:
+            return set()
+        result = await self.auth.db.execute(select(DeptModel.id).where(DeptModel.id.in_(set(ids))))
+        return set(result.scalars().all())
+
+    @staticmethod
+    def descendant_ids_subquery(ids: list[int]) -> Select:
+        """
+        构造 "部门及全部下级部门ID" 子查询，可直接用于 in_() 过滤。
+
+        参数:
+        - ids (list[int]): 部门 ID 列表。
+
+        返回:
+        - Select: 后代部门ID子查询（含自身）。
+        """
+        return select(DeptClosureModel.descendant_id).where(DeptClosureModel.ancestor_id.in_(ids))
+
+    async def get_descendant_ids_crud(self, ids: list[int]) -> list[int]:
+        """
+        获取部门及其全部下级部门ID。
+
+        参数:
+        - ids (list[int]): 部门 ID 列表。
+
+        返回:
+        - list[int]: 部门ID列表（含自身，去重）。
+        """
+        result = await self.auth.db.execute(self.descendant_ids_subquery(ids).distinct())
+        return list(result.scalars().all())
+
+    async def get_ancestor_ids_crud(self, ids: list[int]) -> list[int]:
+        """
+        获取部门及其全部上级部门ID。
+
+        参数:
+        - ids (list[int]): 部门 ID 列表。
+
+        返回:
+        - list[int]: 部门ID列表（含自身，去重）。
+        """
+        sql = (
+            select(DeptClosureModel.ancestor_id)
+            .where(DeptClosureModel.descendant_id.in_(ids))
+            .distinct()
+        )
+        result = await self.auth.db.execute(sql)
+        return list(result.scalars().all())
+
+    async def insert_closure_crud(self, id: int, parent_id: int | None) -> None:
+        """
+        新增部门后写入闭包关系：自身一行，加上父部门全部祖先各一行。
+
+        参数:
+        - id (int): 新部门 ID。
+        - parent_id (int | None): 父部门 ID。
+
+        返回:
+        - None
+        """
+        db = self.auth.db
+        await db.execute(insert(DeptClosureModel).values(ancestor_id=id, descendant_id=id, depth=0))
+        if parent_id:
+            ancestors = select(
+                DeptClosureModel.ancestor_id,
+                literal(id),
+                DeptClosureModel.depth + 1,
+            ).where(DeptClosureModel.descendant_id == parent_id)
+            await db.execute(
+                insert(DeptClosureModel).from_select(
+                    ["ancestor_id", "descendant_id", "depth"], ancestors
+                )
+            )
+        await db.flush()
+
+    async def move_closure_crud(self, id: int, parent_id: int | None) -> None:
+        """
+        部门变更父级后迁移整棵子树的闭包关系。
+
+        先断开子树与原祖先的关系，再与新父部门的全部祖先做笛卡尔积写入。
+        子树ID先查询到内存，避免 MySQL 不允许在 DELETE 子查询中引用目标表。
+
+        参数:
+        - id (int): 部门 ID。
+        - parent_id (int | None): 新父部门 ID。
+
+        返回:
+        - None
+        """
+        db = self.auth.db
+        subtree_result = await db.execute(
+            select(DeptClosureModel.descendant_id, DeptClosureModel.depth).where(
+                DeptClosureModel.ancestor_id == id
+            )
+        )
+        subtree = subtree_result.all()
+        subtree_ids = [row.descendant_id for row in subtree] or [id]
+
+        await db.execute(
+            delete(DeptClosureModel).where(
+                DeptClosureModel.descendant_id.in_(subtree_ids),
+                DeptClosureModel.ancestor_id.notin_(subtree_ids),
+            )
+        )
+        if parent_id:
+            ancestor_result = await db.execute(
+                select(DeptClosureModel.ancestor_id, DeptClosureModel.depth).where(
+                    DeptClosureModel.descendant_id == parent_id
+                )
+            )
+            rows = [
+                {
+                    "ancestor_id": ancestor.ancestor_id,
+                    "descendant_id": node.descendant_id,
+                    "depth": ancestor.depth + node.depth + 1,
+                }
+                for ancestor in ancestor_result.all()
+                for node in subtree
+            ]
+            if rows:
+                await db.execute(insert(DeptClosureModel), rows)
+        await db.flush()
+
+    async def rebuild_closure_crud(self) -> int:
+        """
+        根据 sys_dept.parent_id 全量重建闭包表，用于存量数据迁移或数据修复。
+
+        返回:
+        - int: 写入的闭包关系条数。
+        """
+        db = self.auth.db
+        result = await db.execute(select(DeptModel.id, DeptModel.parent_id))
+        parent_map: dict[int, int | None] = {row.id: row.parent_id for row in result.all()}
+
+        rows: list[dict] = []
+        for dept_id in parent_map:
+            current: int | None = dept_id
+            depth = 0
+            visited: set[int] = set()
+            # 沿父级链向上遍历，visited 防止脏数据成环导致死循环
+            while current and current in parent_map and current not in visited:
+                visited.add(current)
+                rows.append({"ancestor_id": current, "descendant_id": dept_id, "depth": depth})
+                current = parent_map[current]
+                depth += 1
+
+        await db.execute(delete(DeptClosureModel))
+        if rows:
+            await db.execute(insert(DeptClosureModel), rows)
+        await db.flush()
+        return len(rows)
+
+    async def has_closure_crud(self) -> bool:
+        """
+        判断闭包表是否已有数据，用于启动时判断是否需要初始化。
+
+        返回:
+        - bool: 已有数据返回 True。
+        """
+        result = await self.auth.db.execute(select(DeptClosureModel.ancestor_id).limit(1))
+        return result.first() is not None
@@ -3,13 +3,40 @@ from typing import TYPE_CHECKING
 from sqlalchemy import ForeignKey, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.core.base_model import ModelMixin
+from app.core.base_model import MappedBase, ModelMixin
 
 if TYPE_CHECKING:
     from app.api.v1.module_system.role.model import RoleModel
     from app.api.v1.module_system.user.model import UserModel
 
 
+class DeptClosureModel(MappedBase):
+    """
+    部门闭包表
+
+    保存部门树中每一对祖先/后代关系（含自身，depth=0），
+    "本部门及以下" 查询可直接通过 ancestor_id 索引完成，无需递归
+    """
+
+    __tablename__: str = "sys_dept_closure"
+    __table_args__: dict[str, str] = {"comment": "部门闭包表"}
+
+    ancestor_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("sys_dept.id", ondelete="CASCADE", onupdate="CASCADE"),
+        primary_key=True,
+        comment="祖先部门ID",
+    )
+    descendant_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("sys_dept.id", ondelete="CASCADE", onupdate="CASCADE"),
+        primary_key=True,
+        index=True,
+        comment="后代部门ID",
+    )
+    depth: Mapped[int] = mapped_column(Integer, nullable=False, default=0, comment="层级距离")
+
+
 class DeptModel(ModelMixin):
     """
     部门模型
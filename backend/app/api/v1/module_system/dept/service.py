@@ -1,13 +1,9 @@
 from app.api.v1.module_system.auth.schema import AuthSchema
+from app.core.auth_cache import AuthCache
 from app.core.base_schema import BatchSetAvailable
+from app.core.data_scope import DataScopeResolver
 from app.core.exceptions import CustomException
-from app.utils.common_util import (
-    get_child_id_map,
-    get_child_recursion,
-    get_parent_id_map,
-    get_parent_recursion,
-    traversal_to_tree,
-)
+from app.utils.common_util import traversal_to_tree
 
 from .crud import DeptCRUD
 from .schema import (
@@ -92,6 +88,8 @@ class DeptService:
         if obj:
             raise CustomException(msg="创建失败，编码已存在")
         dept = await DeptCRUD(auth).create(data=data)
+        await DeptCRUD(auth).insert_closure_crud(id=dept.id, parent_id=dept.parent_id)
+        await DataScopeResolver.invalidate(db=auth.db)
         return DeptOutSchema.model_validate(dept).model_dump()
 
     @classmethod
@@ -116,7 +114,17 @@ class DeptService:
         exist_dept = await DeptCRUD(auth).get(name=data.name)
         if exist_dept and exist_dept.id != id:
             raise CustomException(msg="更新失败，部门名称重复")
+        old_parent_id = dept.parent_id
+        parent_changed = (old_parent_id or None) != (data.parent_id or None)
+        if parent_changed and data.parent_id:
+            descendant_ids = await DeptCRUD(auth).get_descendant_ids_crud(ids=[id])
+            if data.parent_id in descendant_ids or data.parent_id == id:
+                raise CustomException(msg="更新失败，上级部门不能为自身或下级部门")
         dept = await DeptCRUD(auth).update(id=id, data=data)
+        if parent_changed:
+            await DeptCRUD(auth).move_closure_crud(id=id, parent_id=data.parent_id)
+        await DataScopeResolver.invalidate(db=auth.db)
+        await AuthCache.invalidate(db=auth.db)
         return DeptOutSchema.model_validate(dept).model_dump()
 
     @classmethod
@@ -137,25 +145,14 @@ class DeptService:
         if len(ids) < 1:
             raise CustomException(msg="删除失败，删除对象不能为空")
 
-        # 获取所有部门列表，用于构建树形关系
-        all_depts = await DeptCRUD(auth).get_list_crud()
-
-        # 构建子部门ID映射
-        child_id_map = get_child_id_map(model_list=all_depts)
-
-        # 收集所有需要删除的部门ID，包括直接指定的ID和它们的所有子部门ID
-        delete_ids_set = set()
-
-        for id in ids:
-            # 递归获取该ID的所有子部门ID
-            all_descendants = get_child_recursion(id=id, id_map=child_id_map)
-            delete_ids_set.update(all_descendants)
-
-        # 将集合转换为列表
-        delete_ids = list(delete_ids_set)
+        # 通过闭包表一次查出所有需要删除的部门ID，包括直接指定的ID和它们的所有子部门ID
+        descendant_ids = await DeptCRUD(auth).get_descendant_ids_crud(ids=ids)
+        delete_ids = list(set(ids) | set(descendant_ids))
 
         # 执行批量删除操作
         await DeptCRUD(auth).delete(ids=delete_ids)
+        await DataScopeResolver.invalidate(db=auth.db)
+        await AuthCache.invalidate(db=auth.db)
 
     @classmethod
     async def batch_set_available_service(cls, auth: AuthSchema, data: BatchSetAvailable) -> None:
@@ -169,18 +166,28 @@ class DeptService:
         返回:
         - None
         """
-        dept_list = await DeptCRUD(auth).get_list_crud()
-        total_ids = []
-
         if data.status == "0":
-            id_map = get_parent_id_map(model_list=dept_list)
-            for dept_id in data.ids:
-                enable_ids = get_parent_recursion(id=dept_id, id_map=id_map)
-                total_ids.extend(enable_ids)
+            # 启用部门时同时启用全部上级部门
+            related_ids = await DeptCRUD(auth).get_ancestor_ids_crud(ids=data.ids)
         else:
-            id_map = get_child_id_map(model_list=dept_list)
-            for dept_id in data.ids:
-                disable_ids = get_child_recursion(id=dept_id, id_map=id_map)
-                total_ids.extend(disable_ids)
+            # 停用部门时同时停用全部下级部门
+            related_ids = await DeptCRUD(auth).get_descendant_ids_crud(ids=data.ids)
+        total_ids = list(set(data.ids) | set(related_ids))
 
         await DeptCRUD(auth).set_available_crud(ids=total_ids, status=data.status)
+        await AuthCache.invalidate(db=auth.db)
+
+    @classmethod
+    async def rebuild_closure_service(cls, auth: AuthSchema) -> int:
+        """
+        全量重建部门闭包表。
+
+        参数:
+        - auth (AuthSchema): 认证对象。
+
+        返回:
+        - int: 写入的闭包关系条数。
+        """
+        count = await DeptCRUD(auth).rebuild_closure_crud()
+        await DataScopeResolver.invalidate(db=auth.db)
+        return count
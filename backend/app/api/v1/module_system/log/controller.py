@@ -4,7 +4,6 @@ from fastapi import APIRouter, Body, Depends, Path
 from fastapi.responses import JSONResponse, StreamingResponse
 
 from app.api.v1.module_system.auth.schema import AuthSchema
-from app.common.request import PaginationService
 from app.common.response import StreamResponse, SuccessResponse
 from app.core.base_params import PaginationQueryParam
 from app.core.dependencies import AuthPermission
@@ -43,13 +42,14 @@ async def get_obj_list_controller(
     order_by = [{"created_time": "desc"}]
     if page.order_by:
         order_by = page.order_by
-    result_dict_list = await OperationLogService.get_log_list_service(
-        search=search, auth=auth, order_by=order_by
-    )
-    result_dict = await PaginationService.paginate(
-        data_list=result_dict_list,
+    # 使用数据库分页，深分页时可通过 cursor 切换为游标分页
+    result_dict = await OperationLogService.page_log_service(
+        auth=auth,
         page_no=page.page_no,
         page_size=page.page_size,
+        search=search,
+        order_by=order_by,
+        cursor=page.cursor,
     )
     log.info("查询日志成功")
     return SuccessResponse(data=result_dict, msg="查询日志成功")
@@ -56,6 +56,39 @@ class OperationLogService:
         log_dict_list = [OperationLogOutSchema.model_validate(log).model_dump() for log in log_list]
         return log_dict_list
 
+    @classmethod
+    async def page_log_service(
+        cls,
+        auth: AuthSchema,
+        page_no: int,
+        page_size: int,
+        search: OperationLogQueryParam | None = None,
+        order_by: list | None = None,
+        cursor: str | None = None,
+    ) -> dict:
+        """
+        分页获取日志列表（数据库分页）
+
+        参数:
+        - auth (AuthSchema): 认证信息模型
+        - page_no (int): 页码
+        - page_size (int): 每页数量
+        - search (OperationLogQueryParam | None): 日志查询参数模型
+        - order_by (list | None): 排序字段列表
+        - cursor (str | None): 分页游标，传入时使用游标分页
+
+        返回:
+        - dict: 分页数据
+        """
+        return await OperationLogCRUD(auth).page(
+            offset=(page_no - 1) * page_size,
+            limit=page_size,
+            order_by=order_by or [{"created_time": "desc"}],
+            search=search.__dict__ if search else {},
+            out_schema=OperationLogOutSchema,
+            cursor=cursor,
+        )
+
     @classmethod
     async def create_log_service(cls, auth: AuthSchema, data: OperationLogCreateSchema) -> dict:
         """
@@ -72,6 +105,22 @@ class OperationLogService:
         new_log_dict = OperationLogOutSchema.model_validate(new_log).model_dump()
         return new_log_dict
 
+    @classmethod
+    async def bulk_create_log_service(
+        cls, auth: AuthSchema, data: list[OperationLogCreateSchema]
+    ) -> int:
+        """
+        批量创建日志
+
+        参数:
+        - auth (AuthSchema): 认证信息模型
+        - data (list[OperationLogCreateSchema]): 日志创建模型列表
+
+        返回:
+        - int: 写入条数
+        """
+        return await OperationLogCRUD(auth).bulk_create(data=data)
+
     @classmethod
     async def delete_log_service(cls, auth: AuthSchema, ids: list[int]) -> None:
         """
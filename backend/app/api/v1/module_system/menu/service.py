@@ -1,4 +1,5 @@
 from app.api.v1.module_system.auth.schema import AuthSchema
+from app.core.auth_cache import AuthCache
 from app.core.base_schema import BatchSetAvailable
 from app.core.exceptions import CustomException
 from app.utils.common_util import (
@@ -160,6 +161,7 @@ class MenuService:
 
         # 执行批量删除操作
         await MenuCRUD(auth).delete(ids=delete_ids)
+        await AuthCache.invalidate(db=auth.db)
 
     @classmethod
     async def set_menu_available_service(cls, auth: AuthSchema, data: BatchSetAvailable) -> None:
@@ -190,3 +192,4 @@ class MenuService:
                 total_ids.extend(disable_ids)
 
         await MenuCRUD(auth).set_available_crud(ids=total_ids, status=data.status)
+        await AuthCache.invalidate(db=auth.db)
@@ -1,4 +1,7 @@
+import asyncio
 import json
+import time
+from dataclasses import dataclass, field
 
 from fastapi import UploadFile
 from redis.asyncio.client import Redis
@@ -11,6 +14,7 @@ from app.core.exceptions import CustomException
 from app.core.logger import log
 from app.core.redis_crud import RedisCURD
 from app.utils.excel_util import ExcelUtil
+from app.utils.ip_local_util import IpMatcher
 from app.utils.upload_util import UploadUtil
 
 from .crud import ParamsCRUD
@@ -22,11 +26,28 @@ from .schema import (
 )
 
 
+@dataclass(frozen=True)
+class MiddlewareConfig:
+    """中间件所需系统配置的预解析快照"""
+
+    demo_enable: bool = False
+    ip_white_list: IpMatcher = field(default_factory=IpMatcher)
+    white_api_list_path: frozenset[str] = frozenset()
+    ip_black_list: IpMatcher = field(default_factory=IpMatcher)
+
+
 class ParamsService:
     """
     配置管理模块服务层
     """
 
+    # 中间件配置本地快照有效期(秒)，配置变更时另通过 Redis 发布订阅立即失效
+    MIDDLEWARE_CONFIG_TTL: float = 5.0
+    CONFIG_CHANNEL = f"{RedisInitKeyConfig.SYSTEM_CONFIG.key}:changed"
+
+    _middleware_config: MiddlewareConfig | None = None
+    _middleware_config_at: float = 0.0
+
     @classmethod
     async def get_obj_detail_service(cls, auth: AuthSchema, id: int) -> dict:
         """
@@ -183,6 +204,7 @@ class ParamsService:
             log.error(f"更新系统配置失败: {e}")
             raise CustomException(msg="更新系统配置失败")
 
+        await cls.publish_config_changed(redis)
         return new_obj_dict
 
     @classmethod
@@ -225,6 +247,7 @@ class ParamsService:
             except Exception as e:
                 log.error(f"删除系统配置失败: {e}")
                 raise CustomException(msg="删除字典类型失败")
+        await cls.publish_config_changed(redis)
 
     @classmethod
     async def export_obj_service(cls, data_list: list[dict]) -> bytes:
@@ -416,3 +439,84 @@ class ParamsService:
             except json.JSONDecodeError:
                 log.error("解析IP黑名单配置失败")
         return config_result
+
+    @classmethod
+    async def get_middleware_config(cls, redis: Redis) -> MiddlewareConfig:
+        """
+        获取中间件配置快照，有效期内直接返回本地快照，过期后从 Redis 重新加载并预解析。
+
+        参数:
+        - redis (Redis): Redis 客户端实例
+
+        返回:
+        - MiddlewareConfig: 中间件配置快照
+        """
+        snapshot = cls._middleware_config
+        age = time.monotonic() - cls._middleware_config_at
+        if snapshot is not None and age < cls.MIDDLEWARE_CONFIG_TTL:
+            return snapshot
+
+        config = await cls.get_system_config_for_middleware(redis)
+        snapshot = MiddlewareConfig(
+            demo_enable=str(config["demo_enable"]).lower() == "true",
+            ip_white_list=IpMatcher(config["ip_white_list"] or []),
+            white_api_list_path=frozenset(config["white_api_list_path"] or []),
+            ip_black_list=IpMatcher(config["ip_black_list"] or []),
+        )
+        cls._middleware_config = snapshot
+        cls._middleware_config_at = time.monotonic()
+        return snapshot
+
+    @classmethod
+    def clear_middleware_config(cls) -> None:
+        """
+        清除本进程的中间件配置快照，下次请求时重新加载。
+
+        返回:
+        - None
+        """
+        cls._middleware_config = None
+        cls._middleware_config_at = 0.0
+
+    @classmethod
+    async def publish_config_changed(cls, redis: Redis) -> None:
+        """
+        发布系统配置变更通知，所有进程收到后清除本地快照。
+
+        参数:
+        - redis (Redis): Redis 客户端实例
+
+        返回:
+        - None
+        """
+        cls.clear_middleware_config()
+        try:
+            await redis.publish(cls.CONFIG_CHANNEL, "1")
+        except Exception as e:
+            log.error(f"发布系统配置变更通知失败: {e}")
+
+    @classmethod
+    async def listen_config_changed(cls, redis: Redis) -> None:
+        """
+        订阅系统配置变更通知（在应用生命周期内作为后台任务运行，连接异常时自动重连）。
+
+        参数:
+        - redis (Redis): Redis 客户端实例
+
+        返回:
+        - None
+        """
+        while True:
+            try:
+                async with redis.pubsub() as pubsub:
+                    await pubsub.subscribe(cls.CONFIG_CHANNEL)
+                    async for message in pubsub.listen():
+                        if message.get("type") == "message":
+                            cls.clear_middleware_config()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.error(f"系统配置变更订阅异常，稍后重试: {e}")
+                # 订阅中断期间可能错过通知，依赖快照有效期兜底
+                cls.clear_middleware_config()
+                await asyncio.sleep(5)
@@ -1,6 +1,7 @@
 from typing import Any
 
 from app.api.v1.module_system.auth.schema import AuthSchema
+from app.core.auth_cache import AuthCache
 from app.core.base_schema import BatchSetAvailable
 from app.core.exceptions import CustomException
 from app.utils.excel_util import ExcelUtil
@@ -95,6 +96,7 @@ class RoleService:
         if exist_role and exist_role.id != id:
             raise CustomException(msg="更新失败，角色名称重复")
         updated_role = await RoleCRUD(auth).update(id=id, data=data)
+        await AuthCache.invalidate(db=auth.db)
         return RoleOutSchema.model_validate(updated_role).model_dump()
 
     @classmethod
@@ -116,6 +118,7 @@ class RoleService:
             if not role:
                 raise CustomException(msg="删除失败，该角色不存在")
         await RoleCRUD(auth).delete(ids=ids)
+        await AuthCache.invalidate(db=auth.db)
 
     @classmethod
     async def set_role_permission_service(
@@ -144,6 +147,7 @@ class RoleService:
             await RoleCRUD(auth).set_role_depts_crud(role_ids=data.role_ids, dept_ids=data.dept_ids)
         else:
             await RoleCRUD(auth).set_role_depts_crud(role_ids=data.role_ids, dept_ids=[])
+        await AuthCache.invalidate(db=auth.db)
 
     @classmethod
     async def set_role_available_service(cls, auth: AuthSchema, data: BatchSetAvailable) -> None:
@@ -158,6 +162,7 @@ class RoleService:
         - None
         """
         await RoleCRUD(auth).set_available_crud(ids=data.ids, status=data.status)
+        await AuthCache.invalidate(db=auth.db)
 
     @classmethod
     async def export_role_list_service(cls, role_list: list[dict[str, Any]]) -> bytes:
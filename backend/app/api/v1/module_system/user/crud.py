@@ -2,10 +2,13 @@ from collections.abc import Sequence
 from datetime import datetime
 from typing import Any
 
+from sqlalchemy import select
+
 from app.api.v1.module_system.auth.schema import AuthSchema
 from app.api.v1.module_system.position.crud import PositionCRUD
 from app.api.v1.module_system.role.crud import RoleCRUD
 from app.core.base_crud import CRUDBase
+from app.core.permission import Permission
 
 from .model import UserModel
 from .schema import (
@@ -64,6 +67,41 @@ class UserCRUD(CRUDBase[UserModel, UserCreateSchema, UserUpdateSchema]):
             username=username,
         )
 
+    async def get_superuser_flags_crud(self, usernames: list[str]) -> dict[str, bool]:
+        """
+        批量查询已存在的用户名（不受数据权限限制，用于导入查重）
+
+        参数:
+        - usernames (list[str]): 用户名列表
+
+        返回:
+        - dict[str, bool]: {用户名: 是否超级管理员}
+        """
+        if not usernames:
+            return {}
+        sql = select(UserModel.username, UserModel.is_superuser).where(
+            UserModel.username.in_(usernames)
+        )
+        result = await self.auth.db.execute(sql)
+        return {row.username: row.is_superuser for row in result.all()}
+
+    async def get_accessible_usernames_crud(self, usernames: Sequence[str]) -> set[str]:
+        """
+        批量查询当前用户数据权限范围内的用户名（用于导入更新前的权限校验）
+
+        参数:
+        - usernames (Sequence[str]): 用户名列表
+
+        返回:
+        - set[str]: 数据权限范围内已存在的用户名
+        """
+        if not usernames:
+            return set()
+        sql = select(UserModel.username).where(UserModel.username.in_(usernames))
+        sql = await Permission(model=UserModel, auth=self.auth).filter_query(sql)
+        result = await self.auth.db.execute(sql)
+        return set(result.scalars().all())
+
     async def get_by_mobile_crud(
         self, mobile: str, preload: list[str | Any] | None = None
     ) -> UserModel | None:
@@ -1,7 +1,7 @@
-import io
+import contextlib
+from collections.abc import Awaitable, Callable
 from typing import Any
 
-import pandas as pd
 from fastapi import UploadFile
 
 from app.api.v1.module_system.auth.schema import AuthSchema
@@ -10,6 +10,7 @@ from app.api.v1.module_system.menu.crud import MenuCRUD
 from app.api.v1.module_system.menu.schema import MenuOutSchema
 from app.api.v1.module_system.position.crud import PositionCRUD
 from app.api.v1.module_system.role.crud import RoleCRUD
+from app.core.auth_cache import AuthCache
 from app.core.base_schema import BatchSetAvailable, UploadResponseSchema
 from app.core.exceptions import CustomException
 from app.core.logger import log
@@ -207,6 +208,7 @@ class UserService:
             await UserCRUD(auth).set_user_positions_crud(
                 user_ids=[id], position_ids=data.position_ids
             )
+        await AuthCache.invalidate(db=auth.db)
 
         user_dict = UserOutSchema.model_validate(new_user).model_dump()
         return user_dict
@@ -243,6 +245,7 @@ class UserService:
 
         # 删除用户
         await UserCRUD(auth).delete(ids=ids)
+        await AuthCache.invalidate(db=auth.db)
 
     @classmethod
     async def get_current_user_info_service(cls, auth: AuthSchema) -> dict:
@@ -330,6 +333,7 @@ class UserService:
                 raise CustomException(msg="更新失败，邮箱已存在")
         user_update_data = UserUpdateSchema(**data.model_dump())
         new_user = await UserCRUD(auth).update(id=auth.user.id, data=user_update_data)
+        await AuthCache.invalidate(db=auth.db)
         return UserOutSchema.model_validate(new_user).model_dump()
 
     @classmethod
@@ -351,6 +355,7 @@ class UserService:
             if user.is_superuser:
                 raise CustomException(msg="超级管理员状态不能修改")
         await UserCRUD(auth).set_available_crud(ids=data.ids, status=data.status)
+        await AuthCache.invalidate(db=auth.db)
 
     @classmethod
     async def upload_avatar_service(cls, base_url: str, file: UploadFile) -> dict:
@@ -499,6 +504,41 @@ class UserService:
         )
         return UserOutSchema.model_validate(new_user).model_dump()
 
+    @classmethod
+    async def __bulk_write(
+        cls,
+        auth: AuthSchema,
+        items: list[tuple[int, Any]],
+        writer: Callable[[list[Any]], Awaitable[int]],
+        error_msgs: list[str],
+    ) -> int:
+        """
+        在保存点中批量写入，失败时逐行（各自保存点）重试，失败行记入错误信息
+
+        参数:
+        - auth (AuthSchema): 认证信息模型
+        - items (list[tuple[int, Any]]): (行号, 数据) 列表
+        - writer (Callable): 写入函数
+        - error_msgs (list[str]): 错误信息列表
+
+        返回:
+        - int: 写入成功的条数
+        """
+        if not items:
+            return 0
+        try:
+            async with auth.db.begin_nested():
+                return await writer([data for _, data in items])
+        except Exception:
+            success_count = 0
+            for count, data in items:
+                try:
+                    async with auth.db.begin_nested():
+                        success_count += await writer([data])
+                except Exception as e:
+                    error_msgs.append(f"第{count}行: 异常{e!s}")
+            return success_count
+
     @classmethod
     async def batch_import_user_service(
         cls, auth: AuthSchema, file: UploadFile, update_support: bool = False
@@ -527,8 +567,7 @@ class UserService:
 
         try:
             # 读取Excel文件
-            contents = await file.read()
-            df = pd.read_excel(io.BytesIO(contents))
+            df = await ExcelUtil.read_excel(file.file, usecols=list(header_dict.keys()))
             await file.close()
 
             if df.empty:
@@ -556,15 +595,35 @@ class UserService:
                 raise CustomException(msg="；".join(errors))
 
             error_msgs = []
-            success_count = 0
-            count = 0
+            # (行号, 数据)，写入失败时按行号报告错误
+            create_list: list[tuple[int, UserCreateSchema]] = []
+            update_list: list[tuple[int, dict]] = []
+            seen_usernames: set[str] = set()
+
+            user_crud = UserCRUD(auth)
+            usernames = [str(name).strip() for name in df["username"]]
+            # 默认密码只计算一次哈希，避免逐行执行 bcrypt
+            default_password = PwdUtil.set_password_hash(password="123456")
+            # 一次查询所有已存在的用户名，避免逐行查库
+            exists_users = await user_crud.get_superuser_flags_crud(usernames=usernames)
+            # 已存在用户中当前用户数据权限范围内的（范围外的用户不允许通过导入修改）
+            accessible_users = (
+                await user_crud.get_accessible_usernames_crud(list(exists_users))
+                if update_support
+                else set()
+            )
+            # 一次校验全部部门编号
+            dept_ids: set[int] = set()
+            for dept_id in df["dept_id"]:
+                with contextlib.suppress(TypeError, ValueError):
+                    dept_ids.add(int(dept_id))
+            exists_dept_ids = await DeptCRUD(auth).get_existing_ids_crud(list(dept_ids))
 
             # 处理每一行数据
-            for _index, row in df.iterrows():
+            for count, (_index, row) in enumerate(df.iterrows(), start=1):
                 try:
-                    count = count + 1
                     # 数据转换
-                    gender = 1 if row["gender"] == "男" else (2 if row["gender"] == "女" else 1)
+                    gender = "1" if row["gender"] == "男" else ("2" if row["gender"] == "女" else "1")
                     status = "0" if row["status"] == "正常" else "1"
 
                     # 构建用户数据
@@ -576,33 +635,57 @@ class UserService:
                         "gender": gender,
                         "status": status,
                         "dept_id": int(row["dept_id"]),
-                        "password": PwdUtil.set_password_hash(password="123456"),  # 设置默认密码
+                        "password": default_password,  # 设置默认密码
                     }
 
+                    username = user_data["username"]
+                    if username in seen_usernames:
+                        error_msgs.append(f"第{count}行: 用户 {username} 在文件中重复")
+                        continue
+                    seen_usernames.add(username)
+
+                    if user_data["dept_id"] not in exists_dept_ids:
+                        error_msgs.append(f"第{count}行: 部门编号 {user_data['dept_id']} 不存在")
+                        continue
+
                     # 处理用户导入
-                    exists_user = await UserCRUD(auth).get_by_username_crud(
-                        username=user_data["username"]
-                    )
-                    if exists_user:
+                    if username in exists_users:
                         # 检查是否是超级管理员
-                        if exists_user.is_superuser:
+                        if exists_users[username]:
                             error_msgs.append(f"第{count}行: 超级管理员不允许修改")
                             continue
-                        if update_support:
-                            user_update_data = UserUpdateSchema(**user_data)
-                            await UserCRUD(auth).update(id=exists_user.id, data=user_update_data)
-                            success_count += 1
+                        if not update_support:
+                            error_msgs.append(f"第{count}行: 用户 {username} 已存在")
+                        elif username not in accessible_users:
+                            error_msgs.append(f"第{count}行: 用户 {username} 不在数据权限范围内，不允许修改")
                         else:
-                            error_msgs.append(f"第{count}行: 用户 {user_data['username']} 已存在")
+                            update_list.append(
+                                (count, UserUpdateSchema(**user_data).model_dump(exclude_unset=True))
+                            )
                     else:
-                        user_create_data = UserCreateSchema(**user_data)
-                        await UserCRUD(auth).create(data=user_create_data)
-                        success_count += 1
+                        create_list.append((count, UserCreateSchema(**user_data)))
 
                 except Exception as e:
                     error_msgs.append(f"第{count}行: 异常{e!s}")
                     continue
 
+            async def create_users(items: list) -> int:
+                return await user_crud.bulk_create(data=items)
+
+            async def update_users(items: list[dict]) -> int:
+                written = await user_crud.bulk_upsert(data=items, conflict_keys=["username"])
+                # 权限二次确认（与 update() 一致）：更新后仍需在数据权限范围内，如部门未被改到范围外
+                names = [item["username"] for item in items]
+                if len(await user_crud.get_accessible_usernames_crud(names)) != len(names):
+                    raise CustomException(msg="更新失败，对象不存在或无权限访问")
+                return written
+
+            # 批量写入，避免逐行 flush/refresh；失败时逐行重试以定位错误行
+            success_count = await cls.__bulk_write(auth, create_list, create_users, error_msgs)
+            if update_list:
+                success_count += await cls.__bulk_write(auth, update_list, update_users, error_msgs)
+                await AuthCache.invalidate(db=auth.db)
+
             # 返回详细的导入结果
             result = f"成功导入 {success_count} 条数据"
             if error_msgs:
@@ -49,6 +49,8 @@ class RedisInitKeyConfig(Enum):
         "key": "scheduler_job_lock",
         "remark": "定时任务初始化锁",
     }
+    DEPT_CLOSURE = {"key": "dept_closure", "remark": "部门闭包缓存"}
+    AUTH_USER = {"key": "auth_user", "remark": "用户认证快照"}
 
     @property
     def key(self) -> str:
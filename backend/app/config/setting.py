@@ -136,6 +136,12 @@ class Settings(BaseSettings):
         "HEAD",
         "OPTIONS",
     ]  # 需要记录的请求方法
+    OPERATION_LOG_QUEUE_SIZE: int = 10000  # 操作日志写入队列容量，队列满时丢弃并计数
+    OPERATION_LOG_BATCH_SIZE: int = 200  # 操作日志每批写入条数
+    OPERATION_LOG_FLUSH_INTERVAL: int = 500  # 操作日志最长攒批时间(毫秒)
+    IP_LOCATION_DB_PATH: Path = BASE_DIR / "static" / "data" / "ip_location.txt"  # 离线IP库文件
+    IP_LOCATION_CACHE_SIZE: int = 10000  # IP归属地查询LRU缓存条数
+    IP_LOCATION_ONLINE: bool = False  # 离线IP库未命中时是否调用在线接口查询
 
     # ================================================= #
     # ******************* Gzip压缩配置 ******************* #
@@ -197,7 +203,38 @@ class Settings(BaseSettings):
     CALLING_APP_KEY: str = "d076f7b066cdfb5f1338db20257b7fdb"
     CALLING_RETRY_COUNT: int = 3
     CALLING_REQUEST_INTERVAL: float = 0
+    CALLING_TARGET_RATE_LIMIT: float = 0  # 外呼网关每秒最大推送数(0=不限速)，本进程所有任务共享；单个任务的速率按任务配置
     CALLING_SCHEDULE_INTERVAL_MINUTES: int = 5
+    CALLING_STREAM_CHUNK_SIZE: int = 1000  # 源表流式读取分片大小，每片推送后立即回写
+    CALLING_DISTINCT_ID_BLOCK: int = 50  # 流水号每次向 Redis 预留的序号个数
+    CALLING_PREVIEW_TTL: int = 300  # 待推送预览快照有效期(秒)，源表或历史表变更时提前失效
+    CALLING_DEDUP_MODE: str = "sql"  # 历史去重方式: sql(NOT EXISTS 反连接) / redis(Redis 集合索引，源表在其他库或反连接较慢时使用)
+    CALLING_METRICS_PUBLISH_INTERVAL: float = 1.0  # 批次运行指标写入 Redis 的间隔(秒)
+    CALLING_METRICS_TTL: int = 86400  # 批次运行指标在 Redis 中的保留时间(秒)
+    CALLING_LOG_RETENTION_DAYS: int = 90  # 外呼流水日志保留天数(0=不清理)，汇总数据不受影响
+    CALLING_LOG_DELETE_BATCH: int = 5000  # 清理过期日志时每批删除行数
+    CALLING_LOG_ROLLUP_INTERVAL_MINUTES: int = 10  # 当天外呼日志汇总刷新间隔(分钟)，日汇总查询只读汇总表
+    CALLING_LOG_QUERY_MAX_PHONES: int = 1000  # 按号码查询日志时单次最多号码数
+    CALLING_NODE_HEARTBEAT_INTERVAL: int = 10  # 外呼调度节点心跳间隔(秒)，心跳时同步任务配置
+    CALLING_NODE_TTL: int = 30  # 外呼调度节点超过该时间未心跳视为下线(秒)
+    CALLING_HASH_REPLICAS: int = 100  # 一致性哈希每个节点的虚拟节点数
+    CALLING_RUN_LOCK_TTL: int = 60  # 外呼任务执行锁过期时间(秒)，执行期间每 1/3 过期时间续约
+    CALLING_CLEANUP_LOCK_TIMEOUT: int = 5  # 清空历史表时等待表锁的最长时间(秒)，超时后稍后重试，避免与执行中批次互相等待
+    CALLING_CLEANUP_MAX_WAIT: int = 3600  # 有批次执行中时清理任务最长等待时间(秒)，超时后跳过本次清理
+    CALLING_CLEANUP_RETRY_INTERVAL: int = 60  # 清理任务等待批次结束的重试间隔(秒)
+    CALLING_HTTP_TIMEOUT: float = 30.0  # 外呼网关请求超时(秒)
+    CALLING_HTTP_MAX_CONNECTIONS: int = 100  # 外呼网关连接池最大连接数
+    CALLING_HTTP_MAX_KEEPALIVE: int = 20  # 外呼网关连接池保活连接数
+    CALLING_HTTP_KEEPALIVE_EXPIRY: float = 30.0  # 保活连接空闲过期时间(秒)
+    CALLING_PAYLOAD_LOG_SAMPLE_RATE: float = 0.0  # 推送报文按比例以 INFO 级别采样记录(0~1)，其余仅 DEBUG 级别记录
+    CALLING_RETRY_BACKOFF_BASE: float = 0.5  # 重试退避基数(秒)，按 2 的指数增长并叠加随机抖动
+    CALLING_RETRY_BACKOFF_MAX: float = 10.0  # 单次重试最长等待(秒)
+    CALLING_CIRCUIT_FAILURE_THRESHOLD: int = 20  # 统计窗口内网关系统性错误达到该次数时熔断
+    CALLING_CIRCUIT_WINDOW_SECONDS: int = 60  # 熔断错误统计窗口(秒)
+    CALLING_CIRCUIT_OPEN_SECONDS: int = 60  # 熔断持续时间(秒)，到期后放行请求试探
+    CALLING_CIRCUIT_MAX_PAUSE_SECONDS: int = 1800  # 单个批次因熔断累计暂停的最长时间(秒)，超过后剩余号码记为失败
+    WXSAFE_LOCATION_CACHE_TTL: int = 300  # 网信安部门属地编码缓存时间(秒)
+    WXSAFE_EXPORT_CHUNK_SIZE: int = 2000  # 网信安导出服务端游标每批行数（流式写入 Excel/CSV，内存占用与导出总量无关）
 
     # ================================================= #
     # ******************* 重构配置 ******************* #
@@ -0,0 +1,261 @@
+import json
+from typing import Any
+
+from redis.asyncio.client import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1.module_system.dept.model import DeptModel
+from app.api.v1.module_system.menu.model import MenuModel
+from app.api.v1.module_system.position.model import PositionModel
+from app.api.v1.module_system.role.model import RoleModel
+from app.api.v1.module_system.user.model import UserModel
+from app.common.enums import RedisInitKeyConfig
+from app.core.database import run_after_commit
+from app.core.logger import log
+
+
+class AuthCache:
+    """
+    认证用户快照缓存
+
+    - 按会话ID缓存当前用户、部门、角色（含菜单与自定义数据权限部门）及预计算的权限标识，
+      命中时认证请求无需访问数据库
+    - 快照携带全局版本号，用户/角色/菜单/部门变更时递增版本号使所有快照失效
+    - 访问令牌、快照、版本号通过一次 MGET 读取
+    """
+
+    # 快照过期时间(秒)
+    SNAPSHOT_TTL: int = 300
+
+    VERSION_KEY = f"{RedisInitKeyConfig.AUTH_USER.key}:version"
+
+    # 类变量，存储应用的Redis连接，供服务层失效缓存使用
+    redis_instance: Redis | None = None
+
+    @classmethod
+    def init_redis(cls, redis: Redis) -> None:
+        """
+        保存应用的Redis连接。
+
+        参数:
+        - redis (Redis): Redis 客户端实例
+
+        返回:
+        - None
+        """
+        cls.redis_instance = redis
+
+    @classmethod
+    def snapshot_key(cls, session_id: str) -> str:
+        """获取会话对应的快照键名"""
+        return f"{RedisInitKeyConfig.AUTH_USER.key}:{session_id}"
+
+    @classmethod
+    async def load(cls, redis: Redis, session_id: str) -> tuple[bool, dict | None, str]:
+        """
+        一次性读取会话在线状态、用户快照与快照版本号。
+
+        参数:
+        - redis (Redis): Redis 客户端实例
+        - session_id (str): 会话ID
+
+        返回:
+        - tuple[bool, dict | None, str]: (是否在线, 有效快照, 当前版本号)
+        """
+        try:
+            token, snapshot, version = await redis.mget(
+                f"{RedisInitKeyConfig.ACCESS_TOKEN.key}:{session_id}",
+                cls.snapshot_key(session_id),
+                cls.VERSION_KEY,
+            )
+        except Exception as e:
+            log.error(f"读取认证缓存失败: {e!s}")
+            return False, None, "0"
+
+        version = str(version or "0")
+        if token is None:
+            return False, None, version
+        if not snapshot:
+            return True, None, version
+        try:
+            data = json.loads(snapshot)
+        except ValueError:
+            return True, None, version
+        if str(data.get("version")) != version:
+            return True, None, version
+        return True, data, version
+
+    @classmethod
+    async def save(cls, redis: Redis, session_id: str, user: UserModel, version: str) -> None:
+        """
+        写入用户快照。
+
+        参数:
+        - redis (Redis): Redis 客户端实例
+        - session_id (str): 会话ID
+        - user (UserModel): 已预加载部门、角色、岗位的用户对象
+        - version (str): 读取时的快照版本号
+
+        返回:
+        - None
+        """
+        try:
+            snapshot = cls.dump(user)
+            snapshot["version"] = version
+            await redis.set(cls.snapshot_key(session_id), json.dumps(snapshot), ex=cls.SNAPSHOT_TTL)
+        except Exception as e:
+            log.error(f"写入认证缓存失败: {e!s}")
+
+    @classmethod
+    async def invalidate(cls, redis: Redis | None = None, db: AsyncSession | None = None) -> None:
+        """
+        递增版本号，使全部用户快照失效。
+
+        传入处于事务中的 db 时在事务提交后递增：提交前并发请求仍读到旧数据，
+        提前递增会使其以旧数据按新版本号写入快照，撤销的权限在快照过期前仍然有效。
+
+        参数:
+        - redis (Redis | None): Redis 客户端实例，未传入时使用应用的Redis连接
+        - db (AsyncSession | None): 变更所在的数据库会话
+
+        返回:
+        - None
+        """
+        redis = redis or cls.redis_instance
+        if not redis:
+            return
+        await run_after_commit(db, "auth_cache", lambda: cls.__bump(redis))
+
+    @classmethod
+    async def __bump(cls, redis: Redis) -> None:
+        """递增快照版本号"""
+        try:
+            await redis.incr(cls.VERSION_KEY)
+        except Exception as e:
+            log.error(f"失效认证缓存失败: {e!s}")
+
+    @classmethod
+    async def delete(cls, redis: Redis, session_id: str) -> None:
+        """
+        删除指定会话的快照（退出登录、强制下线时使用）。
+
+        参数:
+        - redis (Redis): Redis 客户端实例
+        - session_id (str): 会话ID
+
+        返回:
+        - None
+        """
+        try:
+            await redis.delete(cls.snapshot_key(session_id))
+        except Exception as e:
+            log.error(f"删除认证缓存失败: {e!s}")
+
+    @staticmethod
+    def permissions(user: UserModel) -> set[str]:
+        """
+        计算用户权限标识集合（仅启用的角色与菜单）。
+
+        参数:
+        - user (UserModel): 用户对象
+
+        返回:
+        - set[str]: 权限标识集合
+        """
+        return {
+            menu.permission
+            for role in user.roles
+            for menu in role.menus
+            if role.status == "0" and menu.permission and menu.status == "0"
+        }
+
+    @classmethod
+    def dump(cls, user: UserModel) -> dict[str, Any]:
+        """
+        将用户对象序列化为快照字典。
+
+        参数:
+        - user (UserModel): 用户对象
+
+        返回:
+        - dict[str, Any]: 快照字典
+        """
+        dept = user.dept
+        return {
+            "user": {
+                "id": user.id,
+                "uuid": user.uuid,
+                "username": user.username,
+                "name": user.name,
+                "mobile": user.mobile,
+                "email": user.email,
+                "gender": user.gender,
+                "avatar": user.avatar,
+                "status": user.status,
+                "is_superuser": user.is_superuser,
+                "dept_id": user.dept_id,
+            },
+            "dept": (
+                {
+                    "id": dept.id,
+                    "name": dept.name,
+                    "code": dept.code,
+                    "parent_id": dept.parent_id,
+                    "status": dept.status,
+                }
+                if dept
+                else None
+            ),
+            "roles": [
+                {
+                    "id": role.id,
+                    "name": role.name,
+                    "code": role.code,
+                    "status": role.status,
+                    "data_scope": role.data_scope,
+                    "dept_ids": [d.id for d in role.depts],
+                    "menus": [
+                        {
+                            "id": menu.id,
+                            "type": menu.type,
+                            "permission": menu.permission,
+                            "status": menu.status,
+                        }
+                        for menu in role.menus
+                    ],
+                }
+                for role in user.roles
+            ],
+            "positions": [
+                {"id": pos.id, "name": pos.name, "status": pos.status} for pos in user.positions
+            ],
+            "permissions": sorted(cls.permissions(user)),
+        }
+
+    @staticmethod
+    def restore(snapshot: dict[str, Any]) -> tuple[UserModel, frozenset[str]]:
+        """
+        由快照还原用户对象（游离态，不关联数据库会话）及权限标识集合。
+
+        参数:
+        - snapshot (dict[str, Any]): 快照字典
+
+        返回:
+        - tuple[UserModel, frozenset[str]]: (用户对象, 权限标识集合)
+        """
+        roles = [
+            RoleModel(
+                id=role["id"],
+                name=role["name"],
+                code=role["code"],
+                status=role["status"],
+                data_scope=role["data_scope"],
+                depts=[DeptModel(id=dept_id) for dept_id in role["dept_ids"]],
+                menus=[MenuModel(**menu) for menu in role["menus"]],
+            )
+            for role in snapshot["roles"]
+        ]
+        positions = [PositionModel(**pos) for pos in snapshot["positions"]]
+        dept = DeptModel(**snapshot["dept"]) if snapshot["dept"] else None
+        user = UserModel(**snapshot["user"], dept=dept, roles=roles, positions=positions)
+        return user, frozenset(snapshot["permissions"])
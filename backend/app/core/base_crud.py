@@ -1,10 +1,15 @@
+import base64
 import builtins
-from collections.abc import Sequence
-from typing import TYPE_CHECKING, Any, Generic, TypeVar
+import json
+from collections.abc import Callable, Sequence
+from datetime import date, datetime
+from decimal import Decimal
+from typing import TYPE_CHECKING, Any, ClassVar, Generic, TypeVar
 
 from pydantic import BaseModel
-from sqlalchemy import Select, asc, delete, desc, func, select, update
+from sqlalchemy import Select, and_, asc, delete, desc, false, func, insert, or_, select, update
 from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.dialects import mysql, postgresql, sqlite
 from sqlalchemy.orm import selectinload
 from sqlalchemy.sql.elements import ColumnElement
 
@@ -21,10 +26,42 @@ CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 OutSchemaType = TypeVar("OutSchemaType", bound=BaseModel)
 
+# 语句模板缓存上限，超过后整体清空（键由模型、排序、预加载组合而成，数量有限）
+STATEMENT_CACHE_SIZE = 512
+
+# 查询操作符 -> 条件构造函数，返回 None 表示该条件不生效
+CONDITION_OPERATORS: dict[str, Callable[[Any, Any], ColumnElement | None]] = {
+    "None": lambda attr, val: attr.is_(None),
+    "not None": lambda attr, val: attr.isnot(None),
+    "date": lambda attr, val: func.date_format(attr, "%Y-%m-%d") == val if val else None,
+    "month": lambda attr, val: func.date_format(attr, "%Y-%m") == val if val else None,
+    "like": lambda attr, val: attr.like(f"%{val}%") if val else None,
+    "in": lambda attr, val: attr.in_(val) if val else None,
+    "between": lambda attr, val: (
+        attr.between(val[0], val[1]) if isinstance(val, (list, tuple)) and len(val) == 2 else None
+    ),
+    "!=": lambda attr, val: attr != val,
+    "ne": lambda attr, val: attr != val if val else None,
+    ">": lambda attr, val: attr > val,
+    "gt": lambda attr, val: attr > val if val else None,
+    ">=": lambda attr, val: attr >= val,
+    "ge": lambda attr, val: attr >= val if val else None,
+    "<": lambda attr, val: attr < val,
+    "lt": lambda attr, val: attr < val if val else None,
+    "<=": lambda attr, val: attr <= val,
+    "le": lambda attr, val: attr <= val if val else None,
+    "==": lambda attr, val: attr == val,
+    "eq": lambda attr, val: attr == val if val else None,
+}
+
 
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     """基础数据层"""
 
+    # 语句模板缓存: (模型, 排序, 预加载) -> 已应用排序与预加载选项的 Select
+    # Select 为不可变对象，复用模板只需追加 where 条件，结构相同的语句也能命中 SQLAlchemy 编译缓存
+    _select_cache: ClassVar[dict[tuple, Select]] = {}
+
     def __init__(self, model: type[ModelType], auth: AuthSchema) -> None:
         """
         初始化CRUDBase类
@@ -55,11 +92,8 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         """
         try:
             conditions = await self.__build_conditions(**kwargs)
-            sql = select(self.model).where(*conditions)
             # 应用可配置的预加载选项
-            for opt in self.__loader_options(preload):
-                sql = sql.options(opt)
-
+            sql = self.__select(order=None, preload=preload).where(*conditions)
             sql = await self.__filter_permissions(sql)
 
             result: Result = await self.auth.db.execute(sql)
@@ -91,10 +125,8 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         try:
             conditions = await self.__build_conditions(**search) if search else []
             order = order_by or [{"id": "asc"}]
-            sql = select(self.model).where(*conditions).order_by(*self.__order_by(order))
             # 应用可配置的预加载选项
-            for opt in self.__loader_options(preload):
-                sql = sql.options(opt)
+            sql = self.__select(order=order, preload=preload).where(*conditions)
             sql = await self.__filter_permissions(sql)
             result: Result = await self.auth.db.execute(sql)
             return result.scalars().all()
@@ -126,7 +158,6 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         try:
             conditions = await self.__build_conditions(**search) if search else []
             order = order_by or [{"id": "asc"}]
-            sql = select(self.model).where(*conditions).order_by(*self.__order_by(order))
 
             # 处理预加载选项
             final_preload = preload
@@ -138,9 +169,7 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
                 final_preload = [*list(model_defaults), children_attr]
 
             # 应用预加载选项
-            for opt in self.__loader_options(final_preload):
-                sql = sql.options(opt)
-
+            sql = self.__select(order=order, preload=final_preload).where(*conditions)
             sql = await self.__filter_permissions(sql)
             result: Result = await self.auth.db.execute(sql)
             return result.scalars().all()
@@ -155,20 +184,28 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         search: dict,
         out_schema: type[OutSchemaType],
         preload: builtins.list[str | Any] | None = None,
+        cursor: str | None = None,
+        keyset: bool = False,
     ) -> dict:
         """
         获取分页数据
 
+        默认使用 OFFSET/LIMIT 分页；传入 cursor 或 keyset=True 时切换为游标分页:
+        按排序字段（自动追加主键保证唯一）生成 WHERE 条件，多取一条判断 has_next，
+        总数只在第一页统计一次并写入游标，后续翻页不再执行 COUNT。
+
         参数:
-        - offset (int): 偏移量
+        - offset (int): 偏移量（游标分页时仅用于计算首页页码）
         - limit (int): 每页数量
         - order_by (List[Dict[str, str]]): 排序字段
         - search (Dict): 查询条件
         - out_schema (Type[OutSchemaType]): 输出数据模型
         - preload (Optional[List[Union[str, Any]]]): 预加载关系
+        - cursor (str | None): 上一页返回的 next_cursor
+        - keyset (bool): 是否使用游标分页（传入 cursor 时自动启用）
 
         返回:
-        - Dict: 分页数据
+        - Dict: 分页数据，游标分页时额外返回 next_cursor
 
         异常:
         - CustomException: 查询失败时抛出异常
@@ -176,28 +213,21 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         try:
             conditions = await self.__build_conditions(**search) if search else []
             order = order_by or [{"id": "asc"}]
-            sql = select(self.model).where(*conditions).order_by(*self.__order_by(order))
+            if cursor or keyset:
+                return await self.__keyset_page(
+                    conditions=conditions,
+                    order=order,
+                    limit=limit,
+                    out_schema=out_schema,
+                    preload=preload,
+                    cursor=cursor,
+                )
+
             # 应用预加载选项
-            for opt in self.__loader_options(preload):
-                sql = sql.options(opt)
+            sql = self.__select(order=order, preload=preload).where(*conditions)
             sql = await self.__filter_permissions(sql)
 
-            # 优化count查询：使用主键计数而非全表扫描
-            mapper = sa_inspect(self.model)
-            pk_cols = list(getattr(mapper, "primary_key", []))
-            if pk_cols:
-                # 使用主键的第一列进行计数（主键必定非NULL，性能更好）
-                count_sql = select(func.count(pk_cols[0])).select_from(self.model)
-            else:
-                # 降级方案：使用count(*)
-                count_sql = select(func.count()).select_from(self.model)
-
-            if conditions:
-                count_sql = count_sql.where(*conditions)
-            count_sql = await self.__filter_permissions(count_sql)
-
-            total_result = await self.auth.db.execute(count_sql)
-            total = total_result.scalar() or 0
+            total = await self.__count(conditions)
 
             result: Result = await self.auth.db.execute(sql.offset(offset).limit(limit))
             objs = result.scalars().all()
@@ -209,6 +239,8 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
                 "has_next": offset + limit < total,
                 "items": [out_schema.model_validate(obj).model_dump() for obj in objs],
             }
+        except CustomException:
+            raise
         except Exception as e:
             raise CustomException(msg=f"分页查询失败: {e!s}")
 
@@ -243,6 +275,106 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         except Exception as e:
             raise CustomException(msg=f"创建失败: {e!s}")
 
+    async def bulk_create(
+        self,
+        data: Sequence[CreateSchemaType | dict],
+        batch_size: int = 1000,
+        return_keys: bool = False,
+    ) -> int | builtins.list[Any]:
+        """
+        批量创建对象
+
+        按 batch_size 分批执行 executemany 插入，不逐条 flush/refresh，
+        适用于导入等大批量写入场景。各行需提供相同的字段。
+
+        参数:
+        - data (Sequence[Union[CreateSchemaType, Dict]]): 对象属性列表
+        - batch_size (int): 每批写入条数
+        - return_keys (bool): 是否返回新记录主键（数据库不支持 RETURNING 时返回条数）
+
+        返回:
+        - Union[int, List[Any]]: 写入条数，或新记录主键列表
+
+        异常:
+        - CustomException: 创建失败时抛出异常
+        """
+        try:
+            rows = self.__bulk_rows(data)
+            if not rows:
+                return [] if return_keys else 0
+
+            pk_cols = list(getattr(sa_inspect(self.model), "primary_key", []))
+            dialect = self.auth.db.get_bind().dialect
+            use_returning = (
+                return_keys and bool(pk_cols) and dialect.insert_executemany_returning
+            )
+
+            keys: builtins.list[Any] = []
+            for start in range(0, len(rows), batch_size):
+                batch = rows[start : start + batch_size]
+                if use_returning:
+                    stmt = insert(self.model).returning(pk_cols[0])
+                    result = await self.auth.db.execute(stmt, batch)
+                    keys.extend(result.scalars().all())
+                else:
+                    await self.auth.db.execute(insert(self.model), batch)
+            await self.auth.db.flush()
+            return keys if use_returning else len(rows)
+        except Exception as e:
+            raise CustomException(msg=f"批量创建失败: {e!s}")
+
+    async def bulk_upsert(
+        self,
+        data: Sequence[CreateSchemaType | dict],
+        conflict_keys: builtins.list[str],
+        update_fields: builtins.list[str] | None = None,
+        batch_size: int = 1000,
+    ) -> int:
+        """
+        批量新增或更新对象
+
+        PostgreSQL/SQLite 使用 INSERT ... ON CONFLICT DO UPDATE，
+        MySQL 使用 INSERT ... ON DUPLICATE KEY UPDATE（依赖表上的主键/唯一索引，conflict_keys 仅用于排除更新列）。
+
+        参数:
+        - data (Sequence[Union[CreateSchemaType, Dict]]): 对象属性列表
+        - conflict_keys (List[str]): 冲突判定字段（主键或唯一索引字段）
+        - update_fields (Optional[List[str]]): 冲突时更新的字段，默认更新除冲突字段及创建信息外的全部字段
+        - batch_size (int): 每批写入条数
+
+        返回:
+        - int: 提交写入的条数
+
+        异常:
+        - CustomException: 写入失败时抛出异常
+        """
+        try:
+            rows = self.__bulk_rows(data)
+            if not rows:
+                return 0
+
+            if update_fields is None:
+                # 取所有行字段的并集，保证各批次更新列一致
+                provided: set[str] = set()
+                for row in rows:
+                    provided.update(row)
+                immutable = {*conflict_keys, "id", "uuid", "created_id", "created_time"}
+                update_fields = [field for field in provided if field not in immutable]
+            if "updated_id" in rows[0] and "updated_id" not in update_fields:
+                update_fields = [*update_fields, "updated_id"]
+
+            dialect_name = self.auth.db.get_bind().dialect.name
+            for start in range(0, len(rows), batch_size):
+                batch = rows[start : start + batch_size]
+                stmt = self.__upsert_statement(dialect_name, conflict_keys, update_fields)
+                await self.auth.db.execute(stmt, batch)
+            await self.auth.db.flush()
+            return len(rows)
+        except CustomException:
+            raise
+        except Exception as e:
+            raise CustomException(msg=f"批量写入失败: {e!s}")
+
     async def update(self, id: int, data: UpdateSchemaType | dict) -> ModelType:
         """
         更新对象
@@ -359,6 +491,241 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         except Exception as e:
             raise CustomException(msg=f"批量更新失败: {e!s}")
 
+    async def __count(self, conditions: builtins.list[ColumnElement]) -> int:
+        """
+        统计满足条件（含数据权限）的记录数。
+        """
+        # 优化count查询：使用主键计数而非全表扫描
+        mapper = sa_inspect(self.model)
+        pk_cols = list(getattr(mapper, "primary_key", []))
+        if pk_cols:
+            # 使用主键的第一列进行计数（主键必定非NULL，性能更好）
+            count_sql = select(func.count(pk_cols[0])).select_from(self.model)
+        else:
+            # 降级方案：使用count(*)
+            count_sql = select(func.count()).select_from(self.model)
+
+        if conditions:
+            count_sql = count_sql.where(*conditions)
+        count_sql = await self.__filter_permissions(count_sql)
+
+        total_result = await self.auth.db.execute(count_sql)
+        return total_result.scalar() or 0
+
+    async def __keyset_page(
+        self,
+        conditions: builtins.list[ColumnElement],
+        order: builtins.list[dict[str, str]],
+        limit: int,
+        out_schema: type[OutSchemaType],
+        preload: builtins.list[str | Any] | None,
+        cursor: str | None,
+    ) -> dict:
+        """
+        游标（keyset）分页。
+
+        游标内容: {"v": 上一页最后一行的排序字段值, "p": 下一页页码, "t": 总数}
+        """
+        keys = self.__keyset_keys(order)
+        state = self.__decode_cursor(cursor) if cursor else {}
+        values = state.get("v")
+        if values is not None and len(values) != len(keys):
+            raise CustomException(msg="分页游标与排序字段不匹配")
+
+        sql = self.__select(order=None, preload=preload).where(*conditions)
+        if values is not None:
+            sql = sql.where(self.__keyset_condition(keys, values))
+        # 可为空的排序字段统一空值排在最后（col IS NULL 升序，各数据库通用，MySQL 不支持 NULLS LAST）
+        order_clauses = []
+        for _, col, is_desc, nullable in keys:
+            if nullable:
+                order_clauses.append(asc(col.is_(None)))
+            order_clauses.append(desc(col) if is_desc else asc(col))
+        sql = sql.order_by(*order_clauses)
+        sql = await self.__filter_permissions(sql)
+
+        # 总数只在首页统计，之后随游标传递
+        total = state.get("t")
+        if total is None:
+            total = await self.__count(conditions)
+
+        # 多取一条判断是否有下一页，避免依赖 total
+        result: Result = await self.auth.db.execute(sql.limit(limit + 1))
+        objs = list(result.scalars().all())
+        has_next = len(objs) > limit
+        objs = objs[:limit]
+
+        page_no = state.get("p", 1)
+        next_cursor = None
+        if has_next and objs:
+            last = objs[-1]
+            next_cursor = self.__encode_cursor(
+                {
+                    "v": [getattr(last, field) for field, _, _, _ in keys],
+                    "p": page_no + 1,
+                    "t": total,
+                }
+            )
+
+        return {
+            "page_no": page_no,
+            "page_size": limit or 10,
+            "total": total,
+            "has_next": has_next,
+            "next_cursor": next_cursor,
+            "items": [out_schema.model_validate(obj).model_dump() for obj in objs],
+        }
+
+    def __keyset_keys(
+        self, order: builtins.list[dict[str, str]]
+    ) -> builtins.list[tuple[str, Any, bool, bool]]:
+        """
+        获取游标分页的排序键 [(字段名, 列, 是否倒序, 是否可为空)]，末尾补充主键保证排序唯一。
+        """
+        mapper = sa_inspect(self.model)
+        keys: builtins.list[tuple[str, Any, bool, bool]] = []
+        for item in order:
+            for field, direction in item.items():
+                column = mapper.columns.get(field)
+                nullable = bool(column is not None and column.nullable and not column.primary_key)
+                keys.append((field, getattr(self.model, field), direction.lower() == "desc", nullable))
+
+        fields = {field for field, _, _, _ in keys}
+        for pk in getattr(mapper, "primary_key", []):
+            if pk.key not in fields:
+                is_desc = keys[-1][2] if keys else False
+                keys.append((pk.key, getattr(self.model, pk.key), is_desc, False))
+        return keys
+
+    @staticmethod
+    def __keyset_condition(
+        keys: builtins.list[tuple[str, Any, bool, bool]], values: builtins.list[Any]
+    ) -> ColumnElement:
+        """
+        构造 "位于上一页最后一行之后" 的条件:
+        (k1 > v1) OR (k1 = v1 AND k2 > v2) OR ...，倒序字段使用 <
+
+        可为空字段的空值排在最后：上一行该字段非空时，之后的行包括更大的值与全部空值；
+        上一行该字段为空时，该字段上没有 "之后" 的行，相等条件为 IS NULL。
+        """
+
+        def equals(col: Any, value: Any) -> ColumnElement:
+            return col.is_(None) if value is None else col == value
+
+        clauses = []
+        for i, (_, col, is_desc, nullable) in enumerate(keys):
+            if values[i] is None:
+                continue
+            after = col < values[i] if is_desc else col > values[i]
+            if nullable:
+                after = or_(after, col.is_(None))
+            clauses.append(
+                and_(*[equals(keys[j][1], values[j]) for j in range(i)], after)
+            )
+        return or_(*clauses) if clauses else false()
+
+    @staticmethod
+    def __encode_cursor(state: dict) -> str:
+        """将游标状态编码为不透明字符串"""
+
+        def default(value: Any) -> Any:
+            if isinstance(value, datetime):
+                return {"__dt__": value.isoformat()}
+            if isinstance(value, date):
+                return {"__d__": value.isoformat()}
+            if isinstance(value, Decimal):
+                return {"__dec__": str(value)}
+            return str(value)
+
+        raw = json.dumps(state, default=default, separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    @staticmethod
+    def __decode_cursor(cursor: str) -> dict:
+        """解析游标字符串，格式错误时抛出异常"""
+
+        def object_hook(obj: dict) -> Any:
+            if "__dt__" in obj:
+                return datetime.fromisoformat(obj["__dt__"])
+            if "__d__" in obj:
+                return date.fromisoformat(obj["__d__"])
+            if "__dec__" in obj:
+                return Decimal(obj["__dec__"])
+            return obj
+
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            state = json.loads(base64.urlsafe_b64decode(padded), object_hook=object_hook)
+        except Exception:
+            raise CustomException(msg="分页游标无效")
+        if not isinstance(state, dict):
+            raise CustomException(msg="分页游标无效")
+        return state
+
+    def __bulk_rows(self, data: Sequence[CreateSchemaType | dict]) -> builtins.list[dict]:
+        """
+        将批量写入数据转换为列字典列表，丢弃非表字段并填充创建人/更新人。
+        """
+        column_keys = {attr.key for attr in sa_inspect(self.model).column_attrs}
+        user_id = self.auth.user.id if self.auth.user else None
+        stamp_created_id = user_id is not None and "created_id" in column_keys
+        stamp_updated_id = user_id is not None and "updated_id" in column_keys
+
+        rows = []
+        for item in data:
+            obj_dict = item if isinstance(item, dict) else item.model_dump()
+            row = {key: value for key, value in obj_dict.items() if key in column_keys}
+            if stamp_created_id:
+                row["created_id"] = user_id
+            if stamp_updated_id:
+                row["updated_id"] = user_id
+            rows.append(row)
+        return rows
+
+    def __upsert_statement(
+        self,
+        dialect_name: str,
+        conflict_keys: builtins.list[str],
+        update_fields: builtins.list[str],
+    ) -> Any:
+        """
+        按数据库方言构造 upsert 语句。
+
+        冲突更新不会触发列的 onupdate，更新时间需显式写入（与 update() 一致使用应用时间）。
+        """
+        touch = (
+            {"updated_time": datetime.now()}
+            if "updated_time" in sa_inspect(self.model).columns and "updated_time" not in update_fields
+            else {}
+        )
+        if dialect_name == "postgresql":
+            stmt = postgresql.insert(self.model)
+            if not update_fields:
+                return stmt.on_conflict_do_nothing(index_elements=conflict_keys)
+            return stmt.on_conflict_do_update(
+                index_elements=conflict_keys,
+                set_={**{field: stmt.excluded[field] for field in update_fields}, **touch},
+            )
+        if dialect_name == "sqlite":
+            stmt = sqlite.insert(self.model)
+            if not update_fields:
+                return stmt.on_conflict_do_nothing(index_elements=conflict_keys)
+            return stmt.on_conflict_do_update(
+                index_elements=conflict_keys,
+                set_={**{field: stmt.excluded[field] for field in update_fields}, **touch},
+            )
+        if dialect_name in ("mysql", "mariadb"):
+            stmt = mysql.insert(self.model)
+            if not update_fields:
+                # 无可更新字段时以冲突字段自身赋值，等价于忽略冲突
+                return stmt.on_duplicate_key_update(
+                    {field: stmt.inserted[field] for field in conflict_keys[:1]}
+                )
+            return stmt.on_duplicate_key_update(
+                {**{field: stmt.inserted[field] for field in update_fields}, **touch}
+            )
+        raise CustomException(msg=f"当前数据库({dialect_name})不支持批量更新写入")
+
     async def __filter_permissions(self, sql: Select) -> Select:
         """
         过滤数据权限（仅用于Select）。
@@ -387,36 +754,60 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             attr = getattr(self.model, key)
             if isinstance(value, tuple):
                 seq, val = value
-                if seq == "None":
-                    conditions.append(attr.is_(None))
-                elif seq == "not None":
-                    conditions.append(attr.isnot(None))
-                elif seq == "date" and val:
-                    conditions.append(func.date_format(attr, "%Y-%m-%d") == val)
-                elif seq == "month" and val:
-                    conditions.append(func.date_format(attr, "%Y-%m") == val)
-                elif seq == "like" and val:
-                    conditions.append(attr.like(f"%{val}%"))
-                elif seq == "in" and val:
-                    conditions.append(attr.in_(val))
-                elif seq == "between" and isinstance(val, (list, tuple)) and len(val) == 2:
-                    conditions.append(attr.between(val[0], val[1]))
-                elif seq == "!=" or (seq == "ne" and val):
-                    conditions.append(attr != val)
-                elif seq == ">" or (seq == "gt" and val):
-                    conditions.append(attr > val)
-                elif seq == ">=" or (seq == "ge" and val):
-                    conditions.append(attr >= val)
-                elif seq == "<" or (seq == "lt" and val):
-                    conditions.append(attr < val)
-                elif seq == "<=" or (seq == "le" and val):
-                    conditions.append(attr <= val)
-                elif seq == "==" or (seq == "eq" and val):
-                    conditions.append(attr == val)
+                builder = CONDITION_OPERATORS.get(seq)
+                condition = builder(attr, val) if builder else None
+                if condition is not None:
+                    conditions.append(condition)
             else:
                 conditions.append(attr == value)
         return conditions
 
+    def __select(
+        self,
+        order: builtins.list[dict[str, str]] | None,
+        preload: builtins.list[str | Any] | None,
+    ) -> Select:
+        """
+        获取已应用排序与预加载选项的 Select 模板（按模型、排序、预加载缓存）。
+
+        参数:
+        - order (Optional[List[Dict[str, str]]]): 排序字段
+        - preload (Optional[List[Union[str, Any]]]): 预加载关系
+
+        返回:
+        - Select: 查询语句模板
+        """
+        order_key = (
+            tuple(
+                (field, direction.lower() == "desc")
+                for item in order
+                for field, direction in item.items()
+            )
+            if order
+            else ()
+        )
+        # 预加载仅字符串项生效，None 表示使用模型默认项，[] 表示不预加载；
+        # 非空列表（即使只有非字符串项）会合并模型默认项，需与 [] 区分
+        preload_key = (
+            None
+            if preload is None
+            else (bool(preload), tuple(sorted(p for p in preload if isinstance(p, str))))
+        )
+        key = (self.model, order_key, preload_key)
+
+        sql = CRUDBase._select_cache.get(key)
+        if sql is None:
+            sql = select(self.model)
+            if order:
+                sql = sql.order_by(*self.__order_by(order))
+            options = self.__loader_options(preload)
+            if options:
+                sql = sql.options(*options)
+            if len(CRUDBase._select_cache) >= STATEMENT_CACHE_SIZE:
+                CRUDBase._select_cache.clear()
+            CRUDBase._select_cache[key] = sql
+        return sql
+
     def __order_by(self, order_by: builtins.list[dict[str, str]]) -> builtins.list[ColumnElement]:
         """
         获取排序字段
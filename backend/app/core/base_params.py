@@ -16,6 +16,10 @@ class PaginationQueryParam:
             default=None,
             description="排序字段,格式:[{'field1': 'asc'}, {'field2': 'desc'}]",
         ),
+        cursor: str | None = Query(
+            default=None,
+            description="分页游标,传入上一页返回的 next_cursor 时使用游标分页(忽略 page_no)",
+        ),
     ) -> None:
         """
         初始化分页查询参数。
@@ -24,12 +28,14 @@ class PaginationQueryParam:
         - page_no (int | None): 当前页码，默认 None。
         - page_size (int | None): 每页数量，默认 None，最大 100。
         - order_by (str | None): 排序字段，格式 'field,asc;field2,desc'。
+        - cursor (str | None): 分页游标，默认 None。
 
         返回:
         - None
         """
         self.page_no = page_no
         self.page_size = page_size
+        self.cursor = cursor
         # 将字符串格式的order_by转换为服务层需要的List[Dict[str, str]]格式
         if order_by:
             try:
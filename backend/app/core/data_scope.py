@@ -0,0 +1,237 @@
+import asyncio
+import json
+import time
+
+from redis.asyncio.client import Redis
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1.module_system.auth.schema import AuthSchema
+from app.api.v1.module_system.dept.model import DeptClosureModel
+from app.common.enums import RedisInitKeyConfig
+from app.core.database import run_after_commit
+from app.core.logger import log
+
+
+class DataScopeResolver:
+    """
+    数据权限范围解析器
+
+    - 部门闭包 {部门ID: 本部门及全部子部门ID} 缓存在进程内与 Redis 两级,
+      通过 Redis 中的版本号在多进程/多实例间同步失效
+    - 单个请求内解析出的可访问部门集合缓存在 AuthSchema 上,
+      同一请求内的 count 查询与数据查询只解析一次
+    - 部门新增/修改/删除后调用 invalidate 使缓存失效
+    """
+
+    # 数据权限常量定义，与 Permission 保持一致
+    DATA_SCOPE_SELF = 1  # 仅本人数据
+    DATA_SCOPE_DEPT = 2  # 本部门数据
+    DATA_SCOPE_DEPT_AND_CHILD = 3  # 本部门及以下数据
+    DATA_SCOPE_ALL = 4  # 全部数据
+    DATA_SCOPE_CUSTOM = 5  # 自定义数据
+
+    # 进程内缓存信任时长(秒)，超过后与 Redis 版本号比对一次
+    LOCAL_TTL: float = 5.0
+    # 闭包最长缓存时长(秒)
+    CLOSURE_TTL: int = 300
+
+    CLOSURE_KEY = f"{RedisInitKeyConfig.DEPT_CLOSURE.key}:data"
+    VERSION_KEY = f"{RedisInitKeyConfig.DEPT_CLOSURE.key}:version"
+
+    # 类变量，存储应用的Redis连接
+    redis_instance: Redis | None = None
+
+    _closure: dict[int, frozenset[int]] | None = None
+    _version: str = "0"
+    _checked_at: float = 0.0
+    _loaded_at: float = 0.0
+    _lock = asyncio.Lock()
+
+    @classmethod
+    def init_redis(cls, redis: Redis) -> None:
+        """
+        保存应用的Redis连接，未初始化时仅使用进程内缓存。
+
+        参数:
+        - redis (Redis): Redis 客户端实例
+
+        返回:
+        - None
+        """
+        cls.redis_instance = redis
+
+    @classmethod
+    async def resolve(cls, auth: AuthSchema) -> tuple[frozenset[int], frozenset[int]]:
+        """
+        解析当前用户的数据权限范围（同一请求内只解析一次）。
+
+        参数:
+        - auth (AuthSchema): 认证信息模型
+
+        返回:
+        - tuple[frozenset[int], frozenset[int]]: (角色数据权限范围集合, 可访问部门ID集合)
+        """
+        cached = auth.get_data_scope_cache()
+        if cached is not None:
+            return cached
+
+        roles = getattr(auth.user, "roles", []) or []
+        data_scopes: set[int] = set()
+        accessible_dept_ids: set[int] = set()
+
+        for role in roles:
+            data_scopes.add(role.data_scope)
+            # 收集自定义权限（data_scope=5）关联的部门ID
+            if role.data_scope == cls.DATA_SCOPE_CUSTOM and getattr(role, "depts", None):
+                accessible_dept_ids.update(dept.id for dept in role.depts)
+
+        user_dept_id = getattr(auth.user, "dept_id", None)
+        if cls.DATA_SCOPE_ALL not in data_scopes and user_dept_id is not None:
+            # 处理本部门数据权限（2）
+            if cls.DATA_SCOPE_DEPT in data_scopes:
+                accessible_dept_ids.add(user_dept_id)
+            # 处理本部门及以下数据权限（3）
+            if cls.DATA_SCOPE_DEPT_AND_CHILD in data_scopes:
+                accessible_dept_ids.update(
+                    await cls.get_dept_and_children(db=auth.db, dept_id=user_dept_id)
+                )
+
+        result = (frozenset(data_scopes), frozenset(accessible_dept_ids))
+        auth.set_data_scope_cache(result)
+        return result
+
+    @classmethod
+    async def get_dept_and_children(cls, db: AsyncSession, dept_id: int) -> frozenset[int]:
+        """
+        获取本部门及全部子部门ID。
+
+        参数:
+        - db (AsyncSession): 数据库会话
+        - dept_id (int): 部门ID
+
+        返回:
+        - frozenset[int]: 本部门及全部子部门ID集合，查询失败时降级为本部门
+        """
+        try:
+            closure = await cls.get_closure(db)
+        except Exception as e:
+            log.error(f"获取部门闭包失败，降级为本部门: {e!s}")
+            return frozenset({dept_id})
+        return closure.get(dept_id, frozenset({dept_id}))
+
+    @classmethod
+    async def get_closure(cls, db: AsyncSession) -> dict[int, frozenset[int]]:
+        """
+        获取部门闭包，依次命中进程内缓存、Redis 缓存，均未命中时从数据库重建。
+
+        参数:
+        - db (AsyncSession): 数据库会话
+
+        返回:
+        - dict[int, frozenset[int]]: {部门ID: 本部门及全部子部门ID集合}
+        """
+        if cls._closure is not None and time.monotonic() - cls._checked_at < cls.LOCAL_TTL:
+            return cls._closure
+
+        async with cls._lock:
+            # 等待锁期间可能已被其他协程刷新
+            if cls._closure is not None and time.monotonic() - cls._checked_at < cls.LOCAL_TTL:
+                return cls._closure
+
+            version = await cls.__get_remote_version()
+            expired = time.monotonic() - cls._loaded_at >= cls.CLOSURE_TTL
+            if cls._closure is None or version != cls._version or expired:
+                closure = await cls.__load_from_redis(version)
+                if closure is None:
+                    closure = await cls.__build_from_db(db)
+                    await cls.__save_to_redis(version, closure)
+                cls._closure = closure
+                cls._version = version
+                cls._loaded_at = time.monotonic()
+            cls._checked_at = time.monotonic()
+            return cls._closure
+
+    @classmethod
+    async def invalidate(cls, db: AsyncSession | None = None) -> None:
+        """
+        部门结构变更后失效缓存：清空进程内缓存并递增 Redis 版本号，通知其他实例重建。
+
+        传入处于事务中的 db 时在事务提交后失效，避免提交前其他请求以旧数据按新版本号重建闭包。
+
+        参数:
+        - db (AsyncSession | None): 变更所在的数据库会话
+
+        返回:
+        - None
+        """
+        await run_after_commit(db, "data_scope", cls.__reset)
+
+    @classmethod
+    async def __reset(cls) -> None:
+        """清空进程内闭包并递增 Redis 版本号"""
+        cls._closure = None
+        cls._checked_at = 0.0
+        if not cls.redis_instance:
+            return
+        try:
+            await cls.redis_instance.incr(cls.VERSION_KEY)
+            await cls.redis_instance.delete(cls.CLOSURE_KEY)
+        except Exception as e:
+            log.error(f"失效部门闭包缓存失败: {e!s}")
+
+    @classmethod
+    async def __get_remote_version(cls) -> str:
+        """获取 Redis 中的闭包版本号，Redis 不可用时沿用本地版本号"""
+        if not cls.redis_instance:
+            return cls._version
+        try:
+            return str(await cls.redis_instance.get(cls.VERSION_KEY) or "0")
+        except Exception as e:
+            log.error(f"获取部门闭包版本失败: {e!s}")
+            return cls._version
+
+    @classmethod
+    async def __load_from_redis(cls, version: str) -> dict[int, frozenset[int]] | None:
+        """从 Redis 加载指定版本的闭包，版本不一致或不存在时返回 None"""
+        if not cls.redis_instance:
+            return None
+        try:
+            data = await cls.redis_instance.get(cls.CLOSURE_KEY)
+            if not data:
+                return None
+            payload = json.loads(data)
+            if str(payload.get("version")) != version:
+                return None
+            return {
+                int(dept_id): frozenset(children)
+                for dept_id, children in payload.get("closure", {}).items()
+            }
+        except Exception as e:
+            log.error(f"加载部门闭包缓存失败: {e!s}")
+            return None
+
+    @classmethod
+    async def __save_to_redis(cls, version: str, closure: dict[int, frozenset[int]]) -> None:
+        """将闭包连同构建时的版本号写入 Redis"""
+        if not cls.redis_instance:
+            return
+        try:
+            payload = {
+                "version": version,
+                "closure": {dept_id: list(children) for dept_id, children in closure.items()},
+            }
+            await cls.redis_instance.set(cls.CLOSURE_KEY, json.dumps(payload), ex=cls.CLOSURE_TTL)
+        except Exception as e:
+            log.error(f"写入部门闭包缓存失败: {e!s}")
+
+    @classmethod
+    async def __build_from_db(cls, db: AsyncSession) -> dict[int, frozenset[int]]:
+        """从部门闭包表构建 {祖先ID: 后代ID集合}，无需加载部门对象及递归"""
+        result = await db.execute(
+            select(DeptClosureModel.ancestor_id, DeptClosureModel.descendant_id)
+        )
+        closure: dict[int, set[int]] = {}
+        for ancestor_id, descendant_id in result.all():
+            closure.setdefault(ancestor_id, set()).add(descendant_id)
+        return {dept_id: frozenset(children) for dept_id, children in closure.items()}
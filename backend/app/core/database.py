@@ -1,7 +1,11 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import Any
+
 from fastapi import FastAPI
 from redis import exceptions
 from redis.asyncio import Redis
-from sqlalchemy import Engine, create_engine
+from sqlalchemy import Engine, create_engine, event
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
@@ -113,6 +117,52 @@ async def create_tables() -> None:
         await coon.run_sync(MappedBase.metadata.create_all)
 
 
+# 提交后执行的后台任务（保留引用，避免任务未完成即被回收）
+_after_commit_tasks: set[asyncio.Task] = set()
+
+
+async def run_after_commit(
+    session: AsyncSession | None, key: str, func: Callable[[], Awaitable[Any]]
+) -> None:
+    """
+    在会话当前事务提交后执行 func，会话不在事务中时立即执行。
+
+    用于缓存失效等操作：事务提交前其他请求仍读到旧数据，若提前失效，
+    并发请求可能以旧数据重建缓存。同一事务内相同 key 只执行一次，事务回滚时不执行。
+
+    参数:
+    - session (AsyncSession | None): 数据库会话
+    - key (str): 去重键
+    - func (Callable[[], Awaitable[Any]]): 无参异步函数
+
+    返回:
+    - None
+    """
+    if session is None or not session.in_transaction():
+        await func()
+        return
+
+    if not session.info.get("after_commit_listening"):
+        session.info["after_commit_listening"] = True
+        loop = asyncio.get_running_loop()
+
+        def on_commit(_session: Any) -> None:
+            for callback in session.info.pop("after_commit", {}).values():
+                task = loop.create_task(callback())
+                _after_commit_tasks.add(task)
+                task.add_done_callback(_after_commit_tasks.discard)
+
+        def on_transaction_end(_session: Any, transaction: Any) -> None:
+            # 最外层事务结束（回滚）时丢弃，保存点结束不影响
+            if transaction.parent is None:
+                session.info.pop("after_commit", None)
+
+        event.listen(session.sync_session, "after_commit", on_commit)
+        event.listen(session.sync_session, "after_transaction_end", on_transaction_end)
+    pending: dict[str, Callable[[], Awaitable[Any]]] = session.info.setdefault("after_commit", {})
+    pending[key] = func
+
+
 async def drop_tables() -> None:
     """删除数据库表"""
     async with async_engine.begin() as conn:
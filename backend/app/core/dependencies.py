@@ -9,11 +9,10 @@ from sqlalchemy.orm import selectinload
 from app.api.v1.module_system.auth.schema import AuthSchema
 from app.api.v1.module_system.user.crud import UserCRUD
 from app.api.v1.module_system.user.model import UserModel
-from app.common.enums import RedisInitKeyConfig
+from app.core.auth_cache import AuthCache
 from app.core.database import async_db_session
 from app.core.exceptions import CustomException
 from app.core.logger import log
-from app.core.redis_crud import RedisCURD
 from app.core.security import OAuth2Schema, decode_access_token
 
 
@@ -64,7 +63,11 @@ async def get_current_user(
     if token.startswith("Bearer"):
         token = token.split(" ")[1]
 
-    payload = decode_access_token(token)
+    # 复用请求日志中间件已解码的载荷，避免重复解码
+    if request.scope.get("access_token") == token and request.scope.get("token_payload"):
+        payload = request.scope["token_payload"]
+    else:
+        payload = decode_access_token(token)
     if not payload or not hasattr(payload, "is_refresh") or payload.is_refresh:
         raise CustomException(msg="非法凭证", code=10401, status_code=401)
 
@@ -76,10 +79,8 @@ async def get_current_user(
     if not session_id:
         raise CustomException(msg="认证已失效", code=10401, status_code=401)
 
-    # 检查用户是否在线
-    online_ok = await RedisCURD(redis).exists(
-        key=f"{RedisInitKeyConfig.ACCESS_TOKEN.key}:{session_id}"
-    )
+    # 检查用户是否在线，同时读取认证快照
+    online_ok, snapshot, version = await AuthCache.load(redis=redis, session_id=session_id)
     if not online_ok:
         raise CustomException(msg="认证已失效", code=10401, status_code=401)
 
@@ -88,16 +89,24 @@ async def get_current_user(
     username = user_info.get("user_name")
     if not username:
         raise CustomException(msg="认证已失效", code=10401, status_code=401)
-    # 获取用户信息，使用深层预加载确保RoleModel.creator被正确加载
-    user = await UserCRUD(auth).get_by_username_crud(
-        username=username,
-        preload=[
-            "dept",
-            selectinload(UserModel.roles),
-            "positions",
-            "created_by",
-        ],
-    )
+
+    if snapshot:
+        # 命中快照，无需查询数据库
+        user, permissions = AuthCache.restore(snapshot)
+        auth.set_permission_cache(permissions)
+    else:
+        # 获取用户信息，使用深层预加载确保RoleModel.creator被正确加载
+        user = await UserCRUD(auth).get_by_username_crud(
+            username=username,
+            preload=[
+                "dept",
+                selectinload(UserModel.roles),
+                "positions",
+                "created_by",
+            ],
+        )
+        if user:
+            await AuthCache.save(redis=redis, session_id=session_id, user=user, version=version)
     if not user:
         raise CustomException(msg="用户不存在", code=10401, status_code=401)
     if user.status == "1":
@@ -163,13 +172,10 @@ class AuthPermission:
         if not auth.user or not auth.user.roles:
             raise CustomException(msg="无权限操作", code=10403, status_code=403)
 
-        # 获取用户权限集合
-        user_permissions = {
-            menu.permission
-            for role in auth.user.roles
-            for menu in role.menus
-            if role.status == "0" and menu.permission and menu.status == "0"
-        }
+        # 获取用户权限集合，优先使用认证快照中预计算的结果
+        user_permissions = auth.get_permission_cache()
+        if user_permissions is None:
+            user_permissions = AuthCache.permissions(auth.user)
 
         # 权限验证 - 满足任一权限即可
         if not any(perm in user_permissions for perm in self.permissions):
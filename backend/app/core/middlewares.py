@@ -1,17 +1,13 @@
 import json
 import time
 
-from starlette.middleware.base import (
-    BaseHTTPMiddleware,
-    RequestResponseEndpoint,
-)
+from starlette.datastructures import MutableHeaders
 from starlette.middleware.cors import CORSMiddleware
 from starlette.middleware.gzip import GZipMiddleware
 from starlette.requests import Request
-from starlette.responses import Response
-from starlette.types import ASGIApp
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from app.api.v1.module_system.params.service import ParamsService
+from app.api.v1.module_system.params.service import MiddlewareConfig, ParamsService
 from app.common.response import ErrorResponse
 from app.config.setting import settings
 from app.core.exceptions import CustomException
@@ -33,19 +29,27 @@ class CustomCORSMiddleware(CORSMiddleware):
         )
 
 
-class RequestLogMiddleware(BaseHTTPMiddleware):
+class RequestLogMiddleware:
     """
-    记录请求日志中间件: 提供一个基础的中间件类，允许你自定义请求和响应处理逻辑。
+    记录请求日志中间件（纯 ASGI 实现）。
+
+    - 不经过 BaseHTTPMiddleware 的任务与队列转发，流式响应（SSE、文件下载）逐块直接透传
+    - X-Process-Time 为请求进入到响应开始（http.response.start）的耗时，
+      响应日志同时记录响应开始到最后一个响应体分片的传输耗时
+    - 访问令牌只在此处解码一次，解码结果写入 scope 供后续依赖（get_current_user）复用
     """
 
     def __init__(self, app: ASGIApp) -> None:
-        super().__init__(app)
+        self.app = app
 
     @staticmethod
     def _extract_session_id_from_request(request: Request) -> str | None:
         """
         从请求中提取session_id（支持从Token或已设置的scope中获取）
 
+        解码成功时将访问令牌及其载荷写入 scope（access_token、token_payload），
+        后续依赖可直接复用，避免重复解码。
+
         参数:
         - request (Request): 请求对象
 
@@ -71,6 +75,10 @@ class RequestLogMiddleware(BaseHTTPMiddleware):
             if not payload or not hasattr(payload, "sub"):
                 return None
 
+            # 缓存解码结果，供后续依赖复用
+            request.scope["access_token"] = token
+            request.scope["token_payload"] = payload
+
             # 从payload中提取session_id
             user_info = json.loads(payload.sub)
             session_id = user_info.get("session_id")
@@ -84,8 +92,13 @@ class RequestLogMiddleware(BaseHTTPMiddleware):
             # 解析失败静默处理，返回None（可能是未认证请求）
             return None
 
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
-        start_time = time.time()
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        request = Request(scope)
 
         # 尝试提取session_id
         session_id = self._extract_session_id_from_request(request)
@@ -98,95 +111,104 @@ class RequestLogMiddleware(BaseHTTPMiddleware):
         )
         log.info(log_fields)
 
+        # 获取请求路径
+        path = scope.get("path")
+
+        # 尝试获取客户端真实IP
+        request_ip = (
+            x_forwarded_for.split(",")[0].strip()
+            if (x_forwarded_for := request.headers.get("X-Forwarded-For"))
+            else request.client.host
+            if request.client
+            else None
+        )
+        # 检查是否启用演示模式
+        config = MiddlewareConfig()
+
         try:
-            # 初始化响应变量
-            response = None
-
-            # 获取请求路径
-            path = request.scope.get("path")
-
-            # 尝试获取客户端真实IP
-            request_ip = None
-            request_ip = (
-                x_forwarded_for.split(",")[0].strip()
-                if (x_forwarded_for := request.headers.get("X-Forwarded-For"))
-                else request.client.host
-                if request.client
-                else None
-            )
-            # 检查是否启用演示模式
-            demo_enable = False
-            ip_white_list = []
-            white_api_list_path = []
-            ip_black_list = []
-
-            try:
-                # 从应用实例获取Redis连接
-                redis = request.app.state.redis
-                if not redis:
-                    raise CustomException(msg="无法获取Redis连接")
-
-                # 使用ParamsService获取系统配置
-                system_config = await ParamsService.get_system_config_for_middleware(redis)
-                # 提取配置值
-                demo_enable = system_config["demo_enable"]
-                ip_white_list = system_config["ip_white_list"]
-                white_api_list_path = system_config["white_api_list_path"]
-                ip_black_list = system_config["ip_black_list"]
-
-            except Exception as e:
-                log.error(f"获取系统配置失败: {e}")
-
-            # 检查是否需要拦截请求
-            should_block = False
-            block_reason = ""
-
-            # 1. 首先检查IP是否在黑名单中
-            if request_ip and request_ip in ip_black_list:
-                should_block = True
-                block_reason = f"IP地址 {request_ip} 在黑名单中"
-
-            # 2. 如果不在黑名单中，检查是否在演示模式下需要拦截
-            elif demo_enable in ["true", "True"] and request.method != "GET":
-                # 在演示模式下，非GET请求需要检查白名单
-                is_ip_whitelisted = request_ip in ip_white_list
-                is_path_whitelisted = path in white_api_list_path
-
-                if not is_ip_whitelisted and not is_path_whitelisted:
-                    should_block = True
-                    block_reason = f"演示模式下拦截非GET请求，IP: {request_ip}, 路径: {path}"
-
-            if should_block:
-                # 增强安全审计：记录详细的拦截日志
-                log.warning([
-                    f"会话ID: {session_id or '未认证'}",
-                    f"请求被拦截: {block_reason}",
-                    f"请求来源: {request_ip}",
-                    f"请求方法: {request.method}",
-                    f"请求路径: {path}",
-                    f"用户代理: {request.headers.get('user-agent', '未知')}",
-                    f"演示模式: {demo_enable}",
-                ])
-                # 拦截请求
-                return ErrorResponse(msg="演示环境，禁止操作")
-            # 正常处理请求
-            response = await call_next(request)
+            # 从应用实例获取Redis连接
+            redis = request.app.state.redis
+            if not redis:
+                raise CustomException(msg="无法获取Redis连接")
 
-            # 计算处理时间并添加到响应头
-            process_time = round(time.time() - start_time, 5)
-            response.headers["X-Process-Time"] = str(process_time)
+            # 使用ParamsService获取本地配置快照（名单已预解析）
+            config = await ParamsService.get_middleware_config(redis)
 
-            # 构建响应日志信息
+        except Exception as e:
+            log.error(f"获取系统配置失败: {e}")
 
-            content_length = response.headers.get("content-length", "0")
-            response_info = f"响应状态: {response.status_code}, 响应内容长度: {content_length}, 处理时间: {round(process_time * 1000, 3)}ms"
-            log.info(response_info)
+        # 检查是否需要拦截请求
+        should_block = False
+        block_reason = ""
 
-            return response
+        # 1. 首先检查IP是否在黑名单中
+        if request_ip and config.ip_black_list.match(request_ip):
+            should_block = True
+            block_reason = f"IP地址 {request_ip} 在黑名单中"
 
+        # 2. 如果不在黑名单中，检查是否在演示模式下需要拦截
+        elif config.demo_enable and request.method != "GET":
+            # 在演示模式下，非GET请求需要检查白名单
+            is_ip_whitelisted = config.ip_white_list.match(request_ip)
+            is_path_whitelisted = path in config.white_api_list_path
+
+            if not is_ip_whitelisted and not is_path_whitelisted:
+                should_block = True
+                block_reason = f"演示模式下拦截非GET请求，IP: {request_ip}, 路径: {path}"
+
+        if should_block:
+            # 增强安全审计：记录详细的拦截日志
+            log.warning([
+                f"会话ID: {session_id or '未认证'}",
+                f"请求被拦截: {block_reason}",
+                f"请求来源: {request_ip}",
+                f"请求方法: {request.method}",
+                f"请求路径: {path}",
+                f"用户代理: {request.headers.get('user-agent', '未知')}",
+                f"演示模式: {config.demo_enable}",
+            ])
+            # 拦截请求
+            await ErrorResponse(msg="演示环境，禁止操作")(scope, receive, send)
+            return
+
+        status_code = 0
+        content_length = "0"
+        process_time = 0.0
+        response_started_at = 0.0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, content_length, process_time, response_started_at
+
+            if message["type"] == "http.response.start":
+                response_started_at = time.perf_counter()
+                process_time = round(response_started_at - start_time, 5)
+                headers = MutableHeaders(scope=message)
+                headers["X-Process-Time"] = str(process_time)
+                status_code = message["status"]
+                content_length = headers.get("content-length", "0")
+
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                # 最后一个响应体分片发送完成后记录响应日志
+                await send(message)
+                transfer_time = time.perf_counter() - response_started_at
+                log.info(
+                    f"响应状态: {status_code}, 响应内容长度: {content_length}, "
+                    f"处理时间: {round(process_time * 1000, 3)}ms, "
+                    f"传输时间: {round(transfer_time * 1000, 3)}ms"
+                )
+                return
+
+            await send(message)
+
+        try:
+            # 正常处理请求
+            await self.app(scope, receive, send_wrapper)
         except CustomException as e:
             log.error(f"中间件处理异常: {e!s}")
-            return ErrorResponse(msg="系统异常，请联系管理员", data=str(e))
+            # 响应已开始时无法再返回错误响应
+            if status_code:
+                raise
+            await ErrorResponse(msg="系统异常，请联系管理员", data=str(e))(scope, receive, send)
 
 
 class CustomGZipMiddleware(GZipMiddleware):
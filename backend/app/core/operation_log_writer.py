@@ -0,0 +1,179 @@
+import asyncio
+import contextlib
+import time
+from typing import Any
+
+from app.api.v1.module_system.auth.schema import AuthSchema
+from app.api.v1.module_system.log.schema import OperationLogCreateSchema
+from app.api.v1.module_system.log.service import OperationLogService
+from app.config.setting import settings
+from app.core.database import async_db_session
+from app.core.logger import log
+from app.utils.ip_local_util import IpLocalUtil
+
+
+class OperationLogWriter:
+    """
+    操作日志异步批量写入器
+
+    - 请求线程只负责把日志记录放入有界队列，不等待 IP 归属地查询与数据库写入
+    - 后台任务每攒满 OPERATION_LOG_BATCH_SIZE 条或等待 OPERATION_LOG_FLUSH_INTERVAL 毫秒写入一批，
+      同一批内相同 IP 只查询一次归属地
+    - 队列满时丢弃新日志并计数（背压），写入失败的批次计入失败数
+    """
+
+    _queue: asyncio.Queue[dict[str, Any]] | None = None
+    _worker: asyncio.Task | None = None
+
+    # 统计计数
+    submitted: int = 0
+    written: int = 0
+    dropped: int = 0
+    failed: int = 0
+
+    @classmethod
+    def start(cls) -> None:
+        """
+        创建写入队列并启动后台写入任务。
+
+        返回:
+        - None
+        """
+        if cls._worker and not cls._worker.done():
+            return
+        cls._queue = asyncio.Queue(maxsize=settings.OPERATION_LOG_QUEUE_SIZE)
+        cls._worker = asyncio.create_task(cls.__run())
+
+    @classmethod
+    async def stop(cls) -> None:
+        """
+        停止后台写入任务，并写入队列中剩余的日志。
+
+        返回:
+        - None
+        """
+        if cls._worker:
+            cls._worker.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await cls._worker
+            cls._worker = None
+
+        queue = cls._queue
+        if queue is None:
+            return
+        batch: list[dict[str, Any]] = []
+        while not queue.empty():
+            batch.append(queue.get_nowait())
+            if len(batch) >= settings.OPERATION_LOG_BATCH_SIZE:
+                await cls.__flush(batch)
+                batch = []
+        if batch:
+            await cls.__flush(batch)
+        log.info(f"操作日志写入统计: {cls.stats()}")
+
+    @classmethod
+    def submit(cls, record: dict[str, Any]) -> bool:
+        """
+        提交一条操作日志，不阻塞请求。
+
+        参数:
+        - record (dict[str, Any]): OperationLogCreateSchema 字段字典（login_location 由写入任务补全）
+
+        返回:
+        - bool: 是否入队成功，写入器未启动或队列已满时返回 False
+        """
+        if cls._queue is None:
+            cls.dropped += 1
+            return False
+        try:
+            cls._queue.put_nowait(record)
+        except asyncio.QueueFull:
+            cls.dropped += 1
+            # 按数量级输出告警，避免日志刷屏
+            if cls.dropped & (cls.dropped - 1) == 0:
+                log.warning(f"操作日志队列已满，累计丢弃 {cls.dropped} 条")
+            return False
+        cls.submitted += 1
+        return True
+
+    @classmethod
+    def stats(cls) -> dict[str, int]:
+        """
+        获取写入统计。
+
+        返回:
+        - dict[str, int]: 入队、写入、丢弃、失败条数及当前队列长度
+        """
+        return {
+            "submitted": cls.submitted,
+            "written": cls.written,
+            "dropped": cls.dropped,
+            "failed": cls.failed,
+            "pending": cls._queue.qsize() if cls._queue else 0,
+        }
+
+    @classmethod
+    async def __run(cls) -> None:
+        """后台写入循环：攒批后写入，单批异常不影响后续批次"""
+        assert cls._queue is not None
+        queue = cls._queue
+        interval = settings.OPERATION_LOG_FLUSH_INTERVAL / 1000
+        while True:
+            batch: list[dict[str, Any]] = []
+            try:
+                batch.append(await queue.get())
+                deadline = time.monotonic() + interval
+                while len(batch) < settings.OPERATION_LOG_BATCH_SIZE:
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+                await cls.__flush(batch)
+            except asyncio.CancelledError:
+                # 停止时未写入的批次放回队列，由 stop 统一写入
+                for record in batch:
+                    with contextlib.suppress(asyncio.QueueFull):
+                        queue.put_nowait(record)
+                raise
+
+    @classmethod
+    async def __flush(cls, batch: list[dict[str, Any]]) -> None:
+        """补全 IP 归属地后批量写入数据库，提交成功后清空 batch"""
+        data: list[OperationLogCreateSchema] = []
+        try:
+            ips = list({record["request_ip"] for record in batch if record.get("request_ip")})
+            locations = dict(
+                zip(
+                    ips,
+                    await asyncio.gather(*(IpLocalUtil.get_ip_location(ip) for ip in ips)),
+                    strict=True,
+                )
+            )
+            for record in batch:
+                try:
+                    data.append(
+                        OperationLogCreateSchema(
+                            **record, login_location=locations.get(record.get("request_ip"))
+                        )
+                    )
+                except ValueError as e:
+                    cls.failed += 1
+                    log.error(f"操作日志数据校验失败: {e!s}")
+            if not data:
+                batch.clear()
+                return
+            async with async_db_session() as session:
+                async with session.begin():
+                    auth = AuthSchema(db=session)
+                    await OperationLogService.bulk_create_log_service(auth=auth, data=data)
+                # 已提交即清空批次，之后（如关闭会话时）被取消也不会重新入队导致重复写入
+                batch.clear()
+                cls.written += len(data)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            cls.failed += len(data) or len(batch)
+            log.error(f"批量写入操作日志失败({len(data) or len(batch)}条): {e!s}")
@@ -1,12 +1,10 @@
 from typing import Any
 
-from sqlalchemy import select
 from sqlalchemy.sql.elements import ColumnElement
 
 from app.api.v1.module_system.auth.schema import AuthSchema
-from app.api.v1.module_system.dept.model import DeptModel
 from app.api.v1.module_system.user.model import UserModel
-from app.utils.common_util import get_child_id_map, get_child_recursion
+from app.core.data_scope import DataScopeResolver
 
 
 class Permission:
@@ -88,53 +86,19 @@ class Permission:
                 return created_id_attr == self.auth.user.id
             return None
 
-        # 获取用户所有角色的权限范围
-        data_scopes = set()
-        custom_dept_ids = set()  # 自定义权限（data_scope=5）关联的部门ID集合
-
-        for role in roles:
-            data_scopes.add(role.data_scope)
-            # 收集自定义权限（data_scope=5）关联的部门ID
-            if role.data_scope == self.DATA_SCOPE_CUSTOM and hasattr(role, "depts") and role.depts:
-                custom_dept_ids.update(dept.id for dept in role.depts)
+        # 获取用户所有角色的权限范围及可访问部门（2、3、5权限的并集），同一请求内只解析一次
+        data_scopes, accessible_dept_ids = await DataScopeResolver.resolve(self.auth)
 
         # 权限优先级处理：全部数据权限最高优先级
         if self.DATA_SCOPE_ALL in data_scopes:
             return None
 
-        # 收集所有可访问的部门ID（2、3、5权限的并集）
-        accessible_dept_ids = set()
-        user_dept_id = getattr(self.auth.user, "dept_id", None)
-
-        # 处理自定义数据权限（5）
-        if self.DATA_SCOPE_CUSTOM in data_scopes:
-            accessible_dept_ids.update(custom_dept_ids)
-
-        # 处理本部门数据权限（2）
-        if self.DATA_SCOPE_DEPT in data_scopes and user_dept_id is not None:
-            accessible_dept_ids.add(user_dept_id)
-
-        # 处理本部门及以下数据权限（3）
-        if self.DATA_SCOPE_DEPT_AND_CHILD in data_scopes and user_dept_id is not None:
-            try:
-                # 查询所有部门并递归获取子部门
-                dept_sql = select(DeptModel)
-                dept_result = await self.auth.db.execute(dept_sql)
-                dept_objs = dept_result.scalars().all()
-                id_map = get_child_id_map(dept_objs)
-                # get_child_recursion返回的结果已包含自身ID和所有子部门ID
-                dept_with_children_ids = get_child_recursion(id=user_dept_id, id_map=id_map)
-                accessible_dept_ids.update(dept_with_children_ids)
-            except Exception:
-                # 查询失败时降级到本部门
-                accessible_dept_ids.add(user_dept_id)
-
         # 如果有部门权限（2、3、5任一），使用部门过滤
         if accessible_dept_ids:
             creator_rel = getattr(self.model, "created_by", None)
             # 优先使用关系过滤（性能更好）
             if creator_rel is not None and hasattr(UserModel, "dept_id"):
-                return creator_rel.has(UserModel.dept_id.in_(list(accessible_dept_ids)))
+                return creator_rel.has(UserModel.dept_id.in_(sorted(accessible_dept_ids)))
             # 降级方案：如果模型没有created_by关系但有created_id，则只能查看自己的数据
             created_id_attr = getattr(self.model, "created_id", None)
             if created_id_attr is not None:
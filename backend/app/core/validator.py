@@ -38,6 +38,9 @@ TimeStr = Annotated[
     WithJsonSchema({"type": "string"}, mode="serialization"),
 ]
 
+# 手机号格式
+MOBILE_REGEX = r"^1(3\d|4[4-9]|5[0-35-9]|6[67]|7[013-8]|8[0-9]|9[0-9])\d{8}$"
+
 # 自定义手机号类型
 Telephone = Annotated[
     str,
@@ -121,9 +124,7 @@ def mobile_validator(value: str | None) -> str | None:
     if len(value) != 11 or not value.isdigit():
         raise CustomException(code=RET.ERROR.code, msg="手机号格式不正确")
 
-    regex = r"^1(3\d|4[4-9]|5[0-35-9]|6[67]|7[013-8]|8[0-9]|9[0-9])\d{8}$"
-
-    if not re.match(regex, value):
+    if not re.match(MOBILE_REGEX, value):
         raise CustomException(code=RET.ERROR.code, msg="手机号格式不正确")
 
     return value
@@ -1,3 +1,5 @@
+import asyncio
+import contextlib
 from collections.abc import AsyncGenerator
 from typing import Any
 
@@ -35,11 +37,15 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[Any, Any]:
     """
     from app.api.v1.module_system.dict.service import DictDataService
     from app.api.v1.module_system.params.service import ParamsService
+    from app.core.auth_cache import AuthCache
+    from app.core.data_scope import DataScopeResolver
+    from app.core.operation_log_writer import OperationLogWriter
     from app.plugin.module_application.job.tools.ap_scheduler import SchedulerUtil
+    from app.utils.ip_local_util import IpLocalUtil
 
     try:
         # 在初始化数据库之前，先创建 schema（如果是 PostgreSQL）
-        from app.utils.schema_util import create_schema_if_not_exists, set_default_schema
+        from app.utils.schema_util import create_extension_if_not_exists, create_schema_if_not_exists, set_default_schema
         from app.core.database import async_engine
         
         if await create_schema_if_not_exists(async_engine, settings.DATABASE_SCHEMA):
@@ -53,6 +59,9 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[Any, Any]:
 
         if await create_schema_if_not_exists(async_engine, settings.BRIEF_SCHEMA):
             log.info(f"✅ PostgreSQL brief 模块 schema ({settings.BRIEF_SCHEMA}) 检查/创建完成")
+
+        # wxsafe 模糊检索使用 pg_trgm 三元组索引，需在建表前创建扩展
+        await create_extension_if_not_exists(async_engine, "pg_trgm")
             
         # 确保导入新模块的模型，以便 create_tables 能扫描到
         from app.plugin.module_wxsafe.info.model import WxSafeInfo, WxSafeLog  # noqa: F401
@@ -66,8 +75,20 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[Any, Any]:
         log.info("✅ 全局事件模块加载完成")
         await ParamsService().init_config_service(redis=app.state.redis)
         log.info("✅ Redis系统配置初始化完成")
+        app.state.config_listener = asyncio.create_task(
+            ParamsService.listen_config_changed(redis=app.state.redis)
+        )
+        log.info("✅ 系统配置变更订阅已启动")
         await DictDataService().init_dict_service(redis=app.state.redis)
         log.info("✅ Redis数据字典初始化完成")
+        DataScopeResolver.init_redis(redis=app.state.redis)
+        log.info("✅ 数据权限缓存初始化完成")
+        AuthCache.init_redis(redis=app.state.redis)
+        log.info("✅ 认证缓存初始化完成")
+        IpLocalUtil.load_database()
+        log.info("✅ 离线IP库初始化完成")
+        OperationLogWriter.start()
+        log.info("✅ 操作日志写入任务已启动")
         await SchedulerUtil.init_system_scheduler(redis=app.state.redis)
         log.info("✅ 定时任务调度器初始化完成")
         
@@ -75,6 +96,9 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[Any, Any]:
         from app.plugin.module_calling.service import CallingSchedulerService
         await CallingSchedulerService.init_calling_scheduler(redis=app.state.redis)
         log.info("✅ 外呼任务调度初始化完成")
+        from app.plugin.module_calling.gateway import CallingGateway
+        CallingGateway.init_client()
+        log.info("✅ 外呼网关客户端初始化完成")
         await FastAPILimiter.init(
             redis=app.state.redis,
             prefix=settings.REQUEST_LIMITER_REDIS_PREFIX,
@@ -104,12 +128,25 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[Any, Any]:
     yield
 
     try:
+        config_listener = getattr(app.state, "config_listener", None)
+        if config_listener:
+            config_listener.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await config_listener
+        await OperationLogWriter.stop()
+        log.info("✅ 操作日志写入任务已停止")
         await import_modules_async(
             modules=settings.EVENT_LIST, desc="全局事件", app=app, status=False
         )
         log.info("✅ 全局事件模块卸载完成")
         await SchedulerUtil.close_system_scheduler()
         log.info("✅ 定时任务调度器已关闭")
+        from app.plugin.module_calling.service import CallingSchedulerService
+        await CallingSchedulerService.close_calling_scheduler()
+        log.info("✅ 外呼调度节点已注销")
+        from app.plugin.module_calling.gateway import CallingGateway
+        await CallingGateway.close_client()
+        log.info("✅ 外呼网关客户端已关闭")
         await FastAPILimiter.close()
         log.info("✅ 请求限制器已关闭")
         console_close()
@@ -1,6 +1,5 @@
 # -*- coding: utf-8 -*-
 import pandas as pd
-import io
 import httpx
 import json
 import asyncio
@@ -10,6 +9,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.logger import log
 from app.config.setting import settings
+from app.utils.excel_util import ExcelSource, ExcelUtil
 from app.plugin.module_brief.crud import BriefReportCRUD
 from app.plugin.module_brief.model import BriefReport
 from app.api.v1.module_system.auth.schema import AuthSchema
@@ -21,13 +21,13 @@ class BriefService:
     """
 
     @staticmethod
-    async def parse_excel(file_content: bytes) -> pd.DataFrame:
+    async def parse_excel(file_content: ExcelSource) -> pd.DataFrame:
         """
         解析 Excel 内容并返回 DataFrame，进行基本校验
         """
         try:
-            # 使用 pandas 读取 Excel
-            df = pd.read_excel(io.BytesIO(file_content))
+            # 流式读取 Excel（线程池中解析，不阻塞事件循环）
+            df = await ExcelUtil.read_excel(file_content)
             
             # 校验必要列
             required_cols = ["自分类", "问题描述"]
@@ -142,8 +142,7 @@ class BriefService:
         完整的业务流：解析 -> 统计 -> AI 分析 -> 存储
         """
         # 1. 读取并解析文件
-        content = await file.read()
-        df = await BriefService.parse_excel(content)
+        df = await BriefService.parse_excel(file.file)
         
         # 2. 后端预计算
         summary_data = BriefService.generate_summary(df)
@@ -1,14 +1,18 @@
 # -*- coding: utf-8 -*-
 """外呼任务配置服务层"""
+import asyncio
 import json
 from typing import Any, List
 from collections.abc import Sequence
 
 from fastapi import status
 from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
 from redis.asyncio import Redis
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 import time
+from datetime import date, datetime, time as dt_time, timedelta
 
 from app.config.setting import settings
 
@@ -16,10 +20,15 @@ from app.api.v1.module_system.auth.schema import AuthSchema
 from app.core.exceptions import CustomException
 from app.core.database import async_db_session
 from app.core.logger import log
-from .model import CallingTaskConfig, CallLog
-from sqlalchemy import select, desc
+from .model import CallingTaskConfig, CallLog, CallLogDaily, CallBatchRun
+from sqlalchemy import select, desc, update, func, any_, bindparam, String
+from sqlalchemy.dialects.postgresql import ARRAY
 
 from .crud import CallingTaskCRUD
+from .cluster import CallingCluster
+from .dedup import HistoryDedupIndex
+from .metrics import RunMetrics
+from .service import CallingService
 from .schema import (
     CallingTaskCreateSchema,
     CallingTaskUpdateSchema,
@@ -29,6 +38,8 @@ from .schema import (
     TableInfoSchema,
     ColumnInfoSchema,
     CallLogOutSchema,
+    CallLogDailyOutSchema,
+    CallBatchRunOutSchema,
 )
 
 
@@ -155,6 +166,8 @@ class CallingTaskService:
             is_enabled=obj.is_enabled,
             remark=obj.remark,
             field_mapping=FieldMappingSchema(**field_mapping_dict),
+            push_concurrency=obj.push_concurrency,
+            push_rate_limit=obj.push_rate_limit,
             created_time=obj.created_time.strftime("%Y-%m-%d %H:%M:%S") if obj.created_time else "",
             updated_time=obj.updated_time.strftime("%Y-%m-%d %H:%M:%S") if obj.updated_time else "",
         )
@@ -269,14 +282,21 @@ class CallLogService:
 
         返回:
         - List[CallLogOutSchema]: 日志列表
+
+        异常:
+        - CustomException: 号码数量超过 CALLING_LOG_QUERY_MAX_PHONES
         """
+        mobile_phones = list(dict.fromkeys(phone for phone in mobile_phones if phone))
         if not mobile_phones:
             return []
-            
+        if len(mobile_phones) > settings.CALLING_LOG_QUERY_MAX_PHONES:
+            raise CustomException(msg=f"单次最多查询 {settings.CALLING_LOG_QUERY_MAX_PHONES} 个号码")
+
         async with async_db_session() as db:
+            # 号码列表作为单个数组参数传入（= ANY），避免号码较多时生成超长 IN 语句
             result = await db.execute(
                 select(CallLog)
-                .where(CallLog.mobile_phone.in_(mobile_phones))
+                .where(CallLog.mobile_phone == any_(bindparam("mobile_phones", mobile_phones, type_=ARRAY(String(20)))))
                 .order_by(desc(CallLog.push_time))
                 .limit(limit)
             )
@@ -306,9 +326,7 @@ class CallLogService:
         返回:
         - List[CallLogOutSchema]: 日志列表
         """
-        from datetime import datetime, time as dt_time
-        
-        # 获取今天的开始时间
+        # 获取今天的开始时间（push_time 索引范围扫描）
         today_start = datetime.combine(datetime.now().date(), dt_time.min)
         
         async with async_db_session() as db:
@@ -334,16 +352,253 @@ class CallLogService:
             ]
 
 
+class CallBatchRunService:
+    """外呼批次服务类"""
+
+    # 可续推的批次状态
+    RESUMABLE_STATUS = (CallBatchRun.STATUS_FAILED, CallBatchRun.STATUS_INTERRUPTED)
+
+    @classmethod
+    async def get_run_list_service(cls, task_id: int | None = None, limit: int = 20) -> List[CallBatchRunOutSchema]:
+        """
+        获取最近的执行批次
+
+        参数:
+        - task_id (int | None): 任务ID，为空时返回全部任务的批次
+        - limit (int): 返回数量限制
+
+        返回:
+        - List[CallBatchRunOutSchema]: 批次列表
+        """
+        query = select(CallBatchRun).order_by(desc(CallBatchRun.id)).limit(limit)
+        if task_id is not None:
+            query = query.where(CallBatchRun.task_id == task_id)
+        async with async_db_session() as db:
+            result = await db.execute(query)
+            return [cls._model_to_schema(run) for run in result.scalars().all()]
+
+    @classmethod
+    async def claim_run_service(cls, run_id: int, redis: Redis | None = None) -> int:
+        """
+        将已失败/已中断的批次置为执行中，准备续推（原子更新，避免重复续推）
+
+        参数:
+        - run_id (int): 批次ID
+        - redis (Redis | None): Redis 连接，传入时检查任务是否正在其他节点执行
+
+        返回:
+        - int: 批次所属任务ID
+
+        异常:
+        - CustomException: 批次不存在、当前状态不可续推或任务正在执行时抛出
+        """
+        if redis is not None:
+            run = await CallingService.get_run(run_id)
+            if run and await CallingCluster.is_locked(redis, run.task_id):
+                raise CustomException(msg=f"任务ID {run.task_id} 正在执行中，请稍后再续推")
+        async with async_db_session() as db:
+            async with db.begin():
+                result = await db.execute(
+                    update(CallBatchRun)
+                    .where(CallBatchRun.id == run_id, CallBatchRun.status.in_(cls.RESUMABLE_STATUS))
+                    .values(status=CallBatchRun.STATUS_RUNNING, error_msg=None, finished_time=None)
+                    .returning(CallBatchRun.task_id)
+                )
+                task_id = result.scalar_one_or_none()
+            if task_id is not None:
+                return task_id
+            run = await db.get(CallBatchRun, run_id)
+        if not run:
+            raise CustomException(msg=f"批次ID {run_id} 不存在", status_code=status.HTTP_404_NOT_FOUND)
+        raise CustomException(msg=f"批次状态为 {run.status}，仅失败或中断的批次可续推")
+
+    @classmethod
+    async def get_run_metrics_service(cls, redis: Redis, run_id: int) -> dict:
+        """
+        获取批次运行指标
+
+        参数:
+        - redis (Redis): Redis 连接
+        - run_id (int): 批次ID
+
+        返回:
+        - dict: 最新指标快照
+
+        异常:
+        - CustomException: 批次不存在，或指标已过期
+        """
+        metrics = await RunMetrics.load(redis, run_id)
+        if metrics:
+            return metrics
+        run = await CallingService.get_run(run_id)
+        if not run:
+            raise CustomException(msg=f"批次ID {run_id} 不存在", status_code=status.HTTP_404_NOT_FOUND)
+        raise CustomException(msg="批次运行指标不存在或已过期")
+
+    @classmethod
+    def _model_to_schema(cls, obj: CallBatchRun) -> CallBatchRunOutSchema:
+        """将模型转换为 Schema"""
+        return CallBatchRunOutSchema(
+            id=obj.id,
+            task_id=obj.task_id,
+            status=obj.status,
+            cursor_mobile=obj.cursor_mobile,
+            chunk_count=obj.chunk_count,
+            total_count=obj.total_count,
+            success_count=obj.success_count,
+            fail_count=obj.fail_count,
+            error_msg=obj.error_msg,
+            started_time=obj.started_time.strftime("%Y-%m-%d %H:%M:%S") if obj.started_time else "",
+            updated_time=obj.updated_time.strftime("%Y-%m-%d %H:%M:%S") if obj.updated_time else "",
+            finished_time=obj.finished_time.strftime("%Y-%m-%d %H:%M:%S") if obj.finished_time else "",
+        )
+
+
 class PreviewDataService:
-    """待推送数据预览服务"""
+    """
+    待推送数据预览服务
+
+    首次预览时将待推送集合（已排除 call_history）按手机号排序写入 Redis 快照：
+    - calling:preview:{task_id}:ids   有序集合（score 均为 0，按成员字典序即手机号排序）
+    - calling:preview:{task_id}:rows  哈希（手机号 -> 行数据 JSON）
+    - calling:preview:{task_id}:meta  快照签名与总数
+    之后的翻页与总数直接读取快照；源表写入计数或历史版本号变化、或超过 CALLING_PREVIEW_TTL 后重建。
+    """
+
+    KEY_PREFIX = "calling:preview"
+
+    @classmethod
+    def _keys(cls, task_id: int) -> tuple[str, str, str, str]:
+        """快照各 Key：有序集合、行数据、元信息、构建锁"""
+        base = f"{cls.KEY_PREFIX}:{task_id}"
+        return f"{base}:ids", f"{base}:rows", f"{base}:meta", f"{base}:lock"
+
+    @classmethod
+    async def _signature(cls, db: Any, redis: Redis, schema_name: str, table_name: str) -> str:
+        """
+        计算快照签名：源表累计增删改行数 + call_history 版本号
+
+        两者任一变化说明待推送集合可能变化，需重建快照。
+        """
+        result = await db.execute(text("""
+            SELECT n_tup_ins, n_tup_upd, n_tup_del FROM pg_stat_user_tables
+            WHERE schemaname = :schema_name AND relname = :table_name
+        """), {"schema_name": schema_name, "table_name": table_name})
+        row = result.first()
+        version = await redis.get(CallingService.HISTORY_VERSION_KEY) or "0"
+        source = "-".join(str(v) for v in row) if row else "0"
+        return f"{source}:{version}"
+
+    @classmethod
+    async def _build_snapshot(cls, db: Any, redis: Redis, task: CallingTaskOutSchema, signature: str) -> int:
+        """流式读取待推送数据写入临时 Key，完成后原子替换旧快照，返回总数"""
+        ids_key, rows_key, meta_key, _ = cls._keys(task.id)
+        tmp_ids, tmp_rows = f"{ids_key}:tmp", f"{rows_key}:tmp"
+        ttl = settings.CALLING_PREVIEW_TTL
+        field_mapping = task.field_mapping.model_dump()
+
+        cast_mobile = not await CallingService.is_text_column(
+            db, task.source_schema, task.source_table, field_mapping["mobile_phone"]
+        )
+        use_dedup_index = HistoryDedupIndex.enabled()
+        if use_dedup_index:
+            await HistoryDedupIndex.ensure(redis)
+        query = CallingService.build_source_query(
+            field_mapping,
+            task.source_schema,
+            task.source_table,
+            cast_mobile=cast_mobile,
+            exclude_history=not use_dedup_index,
+        ).execution_options(yield_per=settings.CALLING_STREAM_CHUNK_SIZE)
+
+        await redis.delete(tmp_ids, tmp_rows)
+        total = 0
+        last_mobile = None
+        result = await db.stream(query)
+        async for partition in result.partitions(settings.CALLING_STREAM_CHUNK_SIZE):
+            members: dict[str, int] = {}
+            rows: dict[str, str] = {}
+            for row in partition:
+                mobile = str(row[0]) if row[0] else ""
+                # 已按手机号排序，重复号码相邻
+                if not mobile or mobile == last_mobile:
+                    continue
+                last_mobile = mobile
+                members[mobile] = 0
+                rows[mobile] = json.dumps({
+                    "mobile_phone": mobile,
+                    "staff_name": str(row[1]) if row[1] else "",
+                    "sys_name": str(row[2]) if row[2] else "",
+                    "order_type": str(row[3]) if row[3] else "",
+                    "order_nums": int(row[4]) if row[4] else 0
+                }, ensure_ascii=False)
+            if members and use_dedup_index:
+                new_mobiles = await HistoryDedupIndex.filter_new(redis, list(members))
+                members = {mobile: 0 for mobile in new_mobiles}
+                rows = {mobile: rows[mobile] for mobile in new_mobiles}
+            if members:
+                pipe = redis.pipeline(transaction=False)
+                pipe.zadd(tmp_ids, members)
+                pipe.hset(tmp_rows, mapping=rows)
+                pipe.expire(tmp_ids, ttl)
+                pipe.expire(tmp_rows, ttl)
+                await pipe.execute()
+                total += len(members)
+
+        pipe = redis.pipeline(transaction=True)
+        if total:
+            pipe.rename(tmp_ids, ids_key)
+            pipe.rename(tmp_rows, rows_key)
+        else:
+            pipe.delete(ids_key, rows_key)
+        pipe.hset(meta_key, mapping={"signature": signature, "total": total})
+        pipe.expire(meta_key, ttl)
+        await pipe.execute()
+        log.info(f"待推送预览快照已重建，任务ID: {task.id}，共 {total} 条")
+        return total
+
+    @classmethod
+    async def _ensure_snapshot(cls, redis: Redis, task: CallingTaskOutSchema) -> int:
+        """快照有效时直接返回总数，否则（加锁）重建"""
+        _, _, meta_key, lock_key = cls._keys(task.id)
+        async with async_db_session() as db:
+            signature = await cls._signature(db, redis, task.source_schema, task.source_table)
+            meta = await redis.hgetall(meta_key)
+            if meta.get("signature") == signature:
+                return int(meta.get("total", 0))
+
+            # 同一任务同时只允许一个请求重建，其余请求短暂等待后读取
+            if not await redis.set(lock_key, "1", ex=settings.CALLING_PREVIEW_TTL, nx=True):
+                for _ in range(50):
+                    await asyncio.sleep(0.2)
+                    meta = await redis.hgetall(meta_key)
+                    if meta.get("signature") == signature:
+                        return int(meta.get("total", 0))
+                raise CustomException(msg="待推送预览快照正在生成，请稍后重试")
+            try:
+                return await cls._build_snapshot(db, redis, task, signature)
+            finally:
+                await redis.delete(lock_key)
+
+    @classmethod
+    async def get_snapshot_total(cls, redis: Redis, task_id: int) -> int | None:
+        """读取预览快照中的待推送总数，无快照时返回 None（用于估算批次剩余时间）"""
+        try:
+            total = await redis.hget(cls._keys(task_id)[2], "total")
+        except Exception as e:
+            log.error(f"读取待推送预览快照失败: {e}")
+            return None
+        return int(total) if total is not None else None
 
     @classmethod
     async def get_pending_data_service(
         cls,
         task_id: int,
         auth: Any,
+        redis: Redis,
         page_no: int = 1,
-        page_size: int = 20
+        page_size: int = 20,
+        cursor: str | None = None,
     ) -> dict:
         """
         获取任务待推送数据预览
@@ -351,75 +606,38 @@ class PreviewDataService:
         参数:
         - task_id (int): 任务ID
         - auth: 认证信息
-        - page_no (int): 页码
+        - redis (Redis): Redis 连接
+        - page_no (int): 页码（未传 cursor 时生效）
         - page_size (int): 每页数量
+        - cursor (str | None): 上一页最后一个手机号，传入时按键集分页读取其后的数据
 
         返回:
-        - dict: 包含 total, items, page_no, page_size
+        - dict: 包含 total, items, page_no, page_size, next_cursor
         """
-        from app.config.setting import settings
-        
-        # 获取任务配置
         task = await CallingTaskService.get_obj_detail_service(id=task_id, auth=auth)
-        
-        # 解析字段映射
-        field_mapping = task.field_mapping
-        
-        async with async_db_session() as db:
-            source_table = f'"{task.source_schema}"."{task.source_table}"'
-            mobile_col = f'"{field_mapping.mobile_phone}"'
-            history_table = f'"{settings.CALLING_SCHEMA}"."call_history"'
-            
-            # 查询总数
-            count_query = text(f"""
-                SELECT COUNT(*) 
-                FROM {source_table} source_t
-                WHERE NOT EXISTS (
-                    SELECT 1 FROM {history_table} h 
-                    WHERE h.mobile_phone = source_t.{mobile_col}::VARCHAR
-                )
-            """)
-            count_result = await db.execute(count_query)
-            total = count_result.scalar() or 0
-            
-            # 分页查询数据
+        total = await cls._ensure_snapshot(redis, task)
+
+        ids_key, rows_key, _, _ = cls._keys(task_id)
+        if cursor:
+            mobiles = await redis.zrange(
+                ids_key, f"({cursor}", "+", bylex=True, offset=0, num=page_size
+            )
+        else:
             offset = (page_no - 1) * page_size
-            data_query = text(f"""
-                SELECT 
-                    {mobile_col} as mobile_phone,
-                    "{field_mapping.staff_name}" as staff_name,
-                    "{field_mapping.sys_name}" as sys_name,
-                    "{field_mapping.order_type}" as order_type,
-                    "{field_mapping.order_nums}" as order_nums
-                FROM {source_table} source_t
-                WHERE NOT EXISTS (
-                    SELECT 1 FROM {history_table} h 
-                    WHERE h.mobile_phone = source_t.{mobile_col}::VARCHAR
-                )
-                LIMIT :limit OFFSET :offset
-            """)
-            
-            result = await db.execute(data_query, {"limit": page_size, "offset": offset})
-            rows = result.fetchall()
-            
-            items = [
-                {
-                    "mobile_phone": str(row[0]),
-                    "staff_name": str(row[1]) if row[1] else "",
-                    "sys_name": str(row[2]) if row[2] else "",
-                    "order_type": str(row[3]) if row[3] else "",
-                    "order_nums": int(row[4]) if row[4] else 0
-                }
-                for row in rows
-            ]
-            
-                
-            return {
-                "total": total,
-                "items": items,
-                "page_no": page_no,
-                "page_size": page_size
-            }
+            mobiles = await redis.zrange(ids_key, offset, offset + page_size - 1)
+
+        items = []
+        if mobiles:
+            rows = await redis.hmget(rows_key, mobiles)
+            items = [json.loads(row) for row in rows if row]
+
+        return {
+            "total": total,
+            "items": items,
+            "page_no": page_no,
+            "page_size": page_size,
+            "next_cursor": mobiles[-1] if len(mobiles) == page_size else None,
+        }
 
 
 class CallingCleanupService:
@@ -449,20 +667,52 @@ class CallingCleanupService:
 
     @classmethod
     async def execute_cleanup(cls):
-        """执行清理操作"""
+        """
+        执行清理操作
+
+        执行中的批次在整个运行期间持有源表查询（sql 去重模式下含 call_history 的 NOT EXISTS），
+        而回写使用独立会话插入 call_history。此时 TRUNCATE 排队等待排他锁，
+        后续回写又排在 TRUNCATE 之后，形成经过应用的循环等待，数据库无法检测为死锁。
+        因此有批次执行中（持有执行锁）时等待其结束后再清理，并为 TRUNCATE 设置锁等待超时，
+        超时（检查后恰好有批次开始）时同样稍后重试；等待超过 CALLING_CLEANUP_MAX_WAIT 秒则跳过本次清理。
+        """
         start_time = time.time()
         log.info("====== 开始执行历史记录清理 ======")
-        
-        async with async_db_session() as db:
-            try:
-                # 使用 TRUNCATE 快速清空
-                await db.execute(text(f'TRUNCATE TABLE "{settings.CALLING_SCHEMA}"."call_history"'))
-                await db.commit()
-                log.info("历史记录表已清空 (call_history)")
-            except Exception as e:
-                await db.rollback()
-                log.error(f"清理历史记录失败: {e}")
-                
+        redis = CallingService.redis_instance
+        deadline = time.monotonic() + settings.CALLING_CLEANUP_MAX_WAIT
+
+        while True:
+            running = await CallingCluster.locked_task_ids(redis) if redis else []
+            if not running:
+                async with async_db_session() as db:
+                    try:
+                        await db.execute(text(f"SET LOCAL lock_timeout = '{settings.CALLING_CLEANUP_LOCK_TIMEOUT}s'"))
+                        # 使用 TRUNCATE 快速清空
+                        await db.execute(text(f'TRUNCATE TABLE "{settings.CALLING_SCHEMA}"."call_history"'))
+                        await db.commit()
+                        log.info("历史记录表已清空 (call_history)")
+                        await HistoryDedupIndex.clear(redis)
+                        await CallingService.touch_history()
+                        break
+                    except DBAPIError as e:
+                        await db.rollback()
+                        # 55P03: lock_not_available，锁等待超时
+                        if getattr(e.orig, "sqlstate", None) != "55P03":
+                            log.error(f"清理历史记录失败: {e}")
+                            break
+                        log.warning("清理历史记录等待表锁超时，稍后重试")
+                    except Exception as e:
+                        await db.rollback()
+                        log.error(f"清理历史记录失败: {e}")
+                        break
+            else:
+                log.info(f"外呼任务 {running} 执行中，稍后重试清理历史记录")
+
+            if time.monotonic() + settings.CALLING_CLEANUP_RETRY_INTERVAL > deadline:
+                log.warning(f"等待外呼批次结束超过 {settings.CALLING_CLEANUP_MAX_WAIT} 秒，跳过本次历史记录清理")
+                break
+            await asyncio.sleep(settings.CALLING_CLEANUP_RETRY_INTERVAL)
+
         duration = time.time() - start_time
         log.info(f"====== 清理完成，耗时 {duration:.2f} 秒 ======")
 
@@ -504,3 +754,182 @@ class CallingCleanupService:
                     log.info(f"任务 {cls.JOB_ID} 添加到 redis 存储器成功")
             except Exception as e:
                 log.error(f"添加清理调度任务失败: {e}")
+
+
+class CallLogMaintenanceService:
+    """外呼日志汇总与保留期清理服务"""
+
+    # 调度任务 ID（每天 00:30 执行）
+    JOB_ID = "calling_log_maintenance_daily"
+    # 当天汇总刷新任务 ID（每 CALLING_LOG_ROLLUP_INTERVAL_MINUTES 分钟执行）
+    ROLLUP_JOB_ID = "calling_log_rollup_today"
+
+    @classmethod
+    async def rollup_day(cls, db: Any, day: date) -> None:
+        """按日期、系统名称、工单类型重新汇总一天的日志（幂等覆盖）"""
+        schema = settings.CALLING_SCHEMA
+        await db.execute(text(f"""
+            INSERT INTO "{schema}"."call_log_daily"
+                (stat_date, sys_name, order_type, success_count, fail_count, updated_time)
+            SELECT
+                :day,
+                COALESCE(sys_name, ''),
+                COALESCE(order_type, ''),
+                COUNT(*) FILTER (WHERE status = 1),
+                COUNT(*) FILTER (WHERE status <> 1),
+                now()
+            FROM "{schema}"."call_log"
+            WHERE push_time >= :start AND push_time < :end
+            GROUP BY 2, 3
+            ON CONFLICT (stat_date, sys_name, order_type) DO UPDATE SET
+                success_count = EXCLUDED.success_count,
+                fail_count = EXCLUDED.fail_count,
+                updated_time = EXCLUDED.updated_time
+        """), {
+            "day": day,
+            "start": datetime.combine(day, dt_time.min),
+            "end": datetime.combine(day + timedelta(days=1), dt_time.min),
+        })
+
+    @classmethod
+    async def execute_maintenance(cls) -> None:
+        """
+        汇总日志并清理过期原始日志
+
+        从最近一次汇总日期（首次执行时从最早日志日期）补汇总至今天，
+        再按 CALLING_LOG_RETENTION_DAYS 分批删除过期原始日志，避免长事务与长时间锁表。
+        """
+        start_time = time.time()
+        today = datetime.now().date()
+
+        async with async_db_session() as db:
+            try:
+                last_day = (await db.execute(select(func.max(CallLogDaily.stat_date)))).scalar()
+                if last_day is None:
+                    first_time = (await db.execute(select(func.min(CallLog.push_time)))).scalar()
+                    last_day = first_time.date() if first_time else today
+                day = last_day
+                while day <= today:
+                    await cls.rollup_day(db, day)
+                    day += timedelta(days=1)
+                await db.commit()
+                log.info(f"外呼日志汇总完成: {last_day} ~ {today}")
+            except Exception as e:
+                await db.rollback()
+                log.error(f"外呼日志汇总失败: {e}")
+                return
+
+        if settings.CALLING_LOG_RETENTION_DAYS <= 0:
+            return
+        cutoff = datetime.combine(today - timedelta(days=settings.CALLING_LOG_RETENTION_DAYS), dt_time.min)
+        schema = settings.CALLING_SCHEMA
+        deleted = 0
+        async with async_db_session() as db:
+            try:
+                while True:
+                    result = await db.execute(text(f"""
+                        DELETE FROM "{schema}"."call_log" WHERE id IN (
+                            SELECT id FROM "{schema}"."call_log" WHERE push_time < :cutoff LIMIT :batch
+                        )
+                    """), {"cutoff": cutoff, "batch": settings.CALLING_LOG_DELETE_BATCH})
+                    await db.commit()
+                    deleted += result.rowcount
+                    if result.rowcount < settings.CALLING_LOG_DELETE_BATCH:
+                        break
+            except Exception as e:
+                await db.rollback()
+                log.error(f"清理过期外呼日志失败: {e}")
+        duration = time.time() - start_time
+        log.info(f"外呼日志维护完成: 清理 {cutoff:%Y-%m-%d} 前日志 {deleted} 条，耗时 {duration:.2f} 秒")
+
+    @classmethod
+    async def execute_rollup_today(cls) -> None:
+        """
+        刷新昨天与今天的日汇总
+
+        日汇总查询只读汇总表，当天数据由本任务定时刷新；
+        同时刷新昨天，覆盖跨零点时最后一个间隔内的日志。
+        """
+        today = datetime.now().date()
+        async with async_db_session() as db:
+            try:
+                for day in (today - timedelta(days=1), today):
+                    await cls.rollup_day(db, day)
+                await db.commit()
+            except Exception as e:
+                await db.rollback()
+                log.error(f"外呼日志当天汇总失败: {e}")
+
+    @classmethod
+    def register_job(cls) -> None:
+        """注册每日汇总与清理任务、当天汇总刷新任务"""
+        from app.plugin.module_application.job.tools.ap_scheduler import scheduler, SchedulerUtil
+
+        scheduler.add_job(
+            func=SchedulerUtil._task_wrapper,
+            trigger=CronTrigger(hour=0, minute=30),
+            args=[cls.execute_maintenance, cls.JOB_ID],
+            id=cls.JOB_ID,
+            name="外呼日志汇总清理任务",
+            jobstore="redis",
+            replace_existing=True,
+            misfire_grace_time=3600
+        )
+        log.info(f"任务 {cls.JOB_ID} 添加到 redis 存储器成功")
+
+        scheduler.add_job(
+            func=SchedulerUtil._task_wrapper,
+            trigger=IntervalTrigger(minutes=settings.CALLING_LOG_ROLLUP_INTERVAL_MINUTES),
+            args=[cls.execute_rollup_today, cls.ROLLUP_JOB_ID],
+            id=cls.ROLLUP_JOB_ID,
+            name="外呼日志当天汇总任务",
+            jobstore="redis",
+            replace_existing=True,
+            coalesce=True,
+            max_instances=1,
+        )
+        log.info(f"任务 {cls.ROLLUP_JOB_ID} 添加到 redis 存储器成功")
+
+    @classmethod
+    async def get_daily_stats_service(
+        cls,
+        start_date: date,
+        end_date: date,
+        sys_name: str | None = None,
+    ) -> List[CallLogDailyOutSchema]:
+        """
+        获取外呼日汇总统计
+
+        参数:
+        - start_date (date): 开始日期
+        - end_date (date): 结束日期（含）
+        - sys_name (str | None): 系统名称
+
+        返回:
+        - List[CallLogDailyOutSchema]: 汇总列表
+
+        异常:
+        - CustomException: 开始日期晚于结束日期
+        """
+        if start_date > end_date:
+            raise CustomException(msg="开始日期不能晚于结束日期")
+
+        # 只读汇总表，当天数据由 execute_rollup_today 定时刷新
+        async with async_db_session() as db:
+            query = select(CallLogDaily).where(
+                CallLogDaily.stat_date >= start_date, CallLogDaily.stat_date <= end_date
+            )
+            if sys_name:
+                query = query.where(CallLogDaily.sys_name == sys_name)
+            result = await db.execute(
+                query.order_by(desc(CallLogDaily.stat_date), CallLogDaily.sys_name, CallLogDaily.order_type)
+            )
+            return [
+                CallLogDailyOutSchema(
+                    stat_date=obj.stat_date.strftime("%Y-%m-%d"),
+                    sys_name=obj.sys_name,
+                    order_type=obj.order_type,
+                    success_count=obj.success_count,
+                    fail_count=obj.fail_count,
+                ) for obj in result.scalars().all()
+            ]
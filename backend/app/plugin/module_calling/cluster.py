@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+"""外呼调度集群：节点心跳、一致性哈希分配任务、任务执行锁（自动续约）"""
+import asyncio
+import bisect
+import contextlib
+import hashlib
+import os
+import socket
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from typing import Any, List
+
+from redis.asyncio import Redis
+
+from app.config.setting import settings
+from app.core.logger import log
+from app.core.redis_crud import RedisCURD
+
+
+class HashRing:
+    """一致性哈希环（虚拟节点），节点增减时只有少量任务改变归属"""
+
+    def __init__(self, nodes: List[str], replicas: int = 100):
+        self.ring: List[tuple[int, str]] = sorted(
+            (self._hash(f"{node}#{i}"), node) for node in nodes for i in range(replicas)
+        )
+        self.keys = [h for h, _ in self.ring]
+
+    @staticmethod
+    def _hash(value: str) -> int:
+        return int.from_bytes(hashlib.md5(value.encode("utf-8")).digest()[:8], "big")
+
+    def get(self, key: str) -> str | None:
+        """获取 key 归属的节点"""
+        if not self.ring:
+            return None
+        index = bisect.bisect(self.keys, self._hash(key)) % len(self.ring)
+        return self.ring[index][1]
+
+
+class CallingCluster:
+    """
+    外呼调度集群
+
+    多个 worker / Pod 都会注册相同的外呼调度任务：
+    - 每个节点定期在 Redis 有序集合中心跳，超过 CALLING_NODE_TTL 未心跳的节点视为下线
+    - 触发时按一致性哈希计算任务归属节点，只有归属节点执行，任务在节点间均匀分布
+    - 执行前获取任务级分布式锁并定期续约（手动执行、续推、节点视图短暂不一致时仍保证同一任务只有一个批次在跑），
+      续约失败说明锁已丢失，立即取消本节点的执行
+    """
+
+    NODES_KEY = "calling:scheduler:nodes"
+    LOCK_PREFIX = "calling:run_lock"
+
+    node_id: str = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+    redis: Redis | None = None
+    _heartbeat: asyncio.Task | None = None
+
+    @classmethod
+    def lock_key(cls, task_id: int) -> str:
+        return f"{cls.LOCK_PREFIX}:{task_id}"
+
+    @classmethod
+    async def start(cls, redis: Redis, on_heartbeat: Callable[[], Awaitable[Any]] | None = None) -> None:
+        """
+        注册节点并启动心跳
+
+        参数:
+        - redis: Redis 连接
+        - on_heartbeat: 每次心跳后执行的回调（用于同步调度任务）
+        """
+        cls.redis = redis
+        await cls._beat()
+        if cls._heartbeat is None or cls._heartbeat.done():
+            cls._heartbeat = asyncio.create_task(cls._heartbeat_loop(on_heartbeat))
+        log.info(f"外呼调度节点已注册: {cls.node_id}")
+
+    @classmethod
+    async def stop(cls) -> None:
+        """停止心跳并注销节点，其负责的任务由其余节点接管"""
+        if cls._heartbeat is not None:
+            cls._heartbeat.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await cls._heartbeat
+            cls._heartbeat = None
+        if cls.redis is not None:
+            with contextlib.suppress(Exception):
+                await cls.redis.zrem(cls.NODES_KEY, cls.node_id)
+            log.info(f"外呼调度节点已注销: {cls.node_id}")
+
+    @classmethod
+    async def _beat(cls) -> None:
+        now = time.time()
+        pipe = cls.redis.pipeline(transaction=False)
+        pipe.zadd(cls.NODES_KEY, {cls.node_id: now})
+        pipe.zremrangebyscore(cls.NODES_KEY, "-inf", now - settings.CALLING_NODE_TTL)
+        await pipe.execute()
+
+    @classmethod
+    async def _heartbeat_loop(cls, on_heartbeat: Callable[[], Awaitable[Any]] | None) -> None:
+        while True:
+            await asyncio.sleep(settings.CALLING_NODE_HEARTBEAT_INTERVAL)
+            try:
+                await cls._beat()
+                if on_heartbeat:
+                    await on_heartbeat()
+            except Exception as e:
+                log.error(f"外呼调度节点心跳失败: {e}")
+
+    @classmethod
+    async def alive_nodes(cls) -> List[str]:
+        """当前存活节点"""
+        return await cls.redis.zrangebyscore(
+            cls.NODES_KEY, time.time() - settings.CALLING_NODE_TTL, "+inf"
+        )
+
+    @classmethod
+    async def owner(cls, task_id: int) -> str | None:
+        """任务归属节点"""
+        ring = HashRing(await cls.alive_nodes(), settings.CALLING_HASH_REPLICAS)
+        return ring.get(str(task_id))
+
+    @classmethod
+    async def is_owner(cls, task_id: int) -> bool:
+        """
+        本节点是否负责该任务
+
+        Redis 不可用或无存活节点时返回 True，由执行锁兜底防止重复执行。
+        """
+        if cls.redis is None:
+            return True
+        try:
+            owner = await cls.owner(task_id)
+        except Exception as e:
+            log.error(f"计算外呼任务归属节点失败: {e}")
+            return True
+        return owner is None or owner == cls.node_id
+
+    @classmethod
+    async def is_locked(cls, redis: Redis, task_id: int) -> bool:
+        """任务是否正在某个节点执行"""
+        return bool(await redis.exists(cls.lock_key(task_id)))
+
+    @classmethod
+    async def locked_task_ids(cls, redis: Redis) -> List[int]:
+        """所有正在执行（持有执行锁）的任务ID"""
+        task_ids = []
+        async for key in redis.scan_iter(match=f"{cls.LOCK_PREFIX}:*"):
+            with contextlib.suppress(ValueError):
+                task_ids.append(int(key.rsplit(":", 1)[1]))
+        return task_ids
+
+    @classmethod
+    async def run_locked(cls, redis: Redis, task_id: int, func: Callable[[], Awaitable[Any]]) -> bool:
+        """
+        持有任务执行锁运行 func，锁按 1/3 过期时间续约
+
+        参数:
+        - redis: Redis 连接
+        - task_id: 任务ID
+        - func: 执行函数
+
+        返回:
+        - bool: 是否获取到锁并执行
+        """
+        client = RedisCURD(redis)
+        key = cls.lock_key(task_id)
+        ttl = settings.CALLING_RUN_LOCK_TTL
+        acquired, value = await client.lock(key, ttl, f"{cls.node_id}:{uuid.uuid4().hex}")
+        if not acquired:
+            log.info(f"外呼任务 {task_id} 正在其他节点执行，跳过本次执行")
+            return False
+
+        runner = asyncio.create_task(func())
+        lost = False
+
+        async def renew() -> None:
+            nonlocal lost
+            while True:
+                await asyncio.sleep(ttl / 3)
+                if not await client.renew_lock(key, ttl, value):
+                    log.error(f"外呼任务 {task_id} 执行锁续约失败，停止本节点执行防止重复推送")
+                    lost = True
+                    runner.cancel()
+                    return
+
+        renewal = asyncio.create_task(renew())
+        try:
+            await runner
+        except asyncio.CancelledError:
+            # 外部取消（如应用关闭）时同时取消执行；锁丢失导致的取消不向上抛出
+            if not lost:
+                runner.cancel()
+                raise
+        finally:
+            renewal.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await renewal
+            await client.unlock(key, value)
+        return True
@@ -1,9 +1,12 @@
 # -*- coding: utf-8 -*-
 """外呼任务配置 API 路由"""
+import asyncio
+import json
+from datetime import date
 from typing import Annotated
 
-from fastapi import APIRouter, Body, Depends, Path, Query
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Body, Depends, Path, Query, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 from redis.asyncio import Redis
 
 from app.api.v1.module_system.auth.schema import AuthSchema
@@ -11,10 +14,15 @@ from app.common.request import PaginationService
 from app.common.response import SuccessResponse
 from app.core.base_params import PaginationQueryParam
 from app.core.dependencies import AuthPermission, redis_getter
+from app.core.exceptions import CustomException
+from app.config.setting import settings
 from app.core.logger import log
 from app.core.router_class import OperationLogRoute
 from app.core.router_class import OperationLogRoute
-from .service import CallingService, CallingSchedulerService
+from .cluster import CallingCluster
+from .metrics import RunMetrics
+from .model import CallBatchRun
+from .service import CallingSchedulerService
 
 from .schema import (
     CallingTaskCreateSchema,
@@ -25,9 +33,18 @@ from .schema import (
     TableInfoSchema,
     ColumnInfoSchema,
     CallLogOutSchema,
+    CallLogDailyOutSchema,
+    CallBatchRunOutSchema,
+    CallRunMetricsOutSchema,
     CleanupConfigSchema,
 )
-from .api_service import CallingTaskService, MetadataService, CallLogService
+from .api_service import (
+    CallingTaskService,
+    MetadataService,
+    CallLogService,
+    CallLogMaintenanceService,
+    CallBatchRunService,
+)
 
 
 CallingTaskRouter = APIRouter(route_class=OperationLogRoute, prefix="/task", tags=["外呼任务管理"])
@@ -155,16 +172,108 @@ async def execute_task_controller(
     """
     # 检查任务是否存在
     task = await CallingTaskService.get_obj_detail_service(id=id, auth=auth)
+    if await CallingCluster.is_locked(redis, id):
+        raise CustomException(msg=f"任务 '{task.name}' 正在执行中，请稍后再试")
     
-    # 异步触发任务执行（后台运行）
-    # 使用新的 execute_task_with_config 方法，根据任务配置动态读取源表数据
-    import asyncio
-    asyncio.create_task(CallingService.execute_task_with_config(redis, id))
+    # 异步触发任务执行（后台运行），持有任务执行锁，避免与调度触发或其他节点重复推送
+    asyncio.create_task(CallingSchedulerService.run_exclusive(redis, id))
     
     log.info(f"触发外呼任务执行: {task.name} (ID: {id})")
     return SuccessResponse(msg=f"任务 '{task.name}' 已触发执行，请点击日志按钮查看结果")
 
 
+@CallingTaskRouter.get(
+    "/runs",
+    summary="获取执行批次",
+    description="获取最近的外呼执行批次及检查点",
+    response_model=list[CallBatchRunOutSchema],
+)
+async def get_runs_controller(
+    auth: Annotated[AuthSchema, Depends(AuthPermission(["module_calling:task:query"]))],
+    task_id: Annotated[int | None, Query(description="任务ID")] = None,
+    limit: Annotated[int, Query(description="返回数量限制", ge=1, le=100)] = 20,
+) -> JSONResponse:
+    """获取执行批次"""
+    result = await CallBatchRunService.get_run_list_service(task_id=task_id, limit=limit)
+    return SuccessResponse(data=result, msg="获取执行批次成功")
+
+
+@CallingTaskRouter.post(
+    "/resume/{run_id}",
+    summary="续推批次",
+    description="从检查点继续执行已失败或已中断的外呼批次，不重新推送已回写的号码",
+)
+async def resume_run_controller(
+    run_id: Annotated[int, Path(description="批次ID")],
+    redis: Annotated[Redis, Depends(redis_getter)],
+    auth: Annotated[AuthSchema, Depends(AuthPermission(["module_calling:task:execute"]))],
+) -> JSONResponse:
+    """续推批次"""
+    task_id = await CallBatchRunService.claim_run_service(run_id=run_id, redis=redis)
+
+    asyncio.create_task(CallingSchedulerService.run_exclusive(redis, task_id, run_id=run_id))
+
+    log.info(f"触发外呼批次续推: 批次 {run_id} (任务ID: {task_id})")
+    return SuccessResponse(msg=f"批次 {run_id} 已从检查点继续执行，请点击日志按钮查看结果")
+
+
+@CallingTaskRouter.get(
+    "/runs/{run_id}/metrics",
+    summary="获取批次运行指标",
+    description="获取外呼批次的进度、吞吐、推送耗时分布、在途数、预计剩余时间及失败原因分布",
+    response_model=CallRunMetricsOutSchema,
+)
+async def get_run_metrics_controller(
+    run_id: Annotated[int, Path(description="批次ID")],
+    redis: Annotated[Redis, Depends(redis_getter)],
+    auth: Annotated[AuthSchema, Depends(AuthPermission(["module_calling:task:query"]))],
+) -> JSONResponse:
+    """获取批次运行指标"""
+    result = await CallBatchRunService.get_run_metrics_service(redis=redis, run_id=run_id)
+    return SuccessResponse(data=result, msg="获取批次运行指标成功")
+
+
+@CallingTaskRouter.get(
+    "/runs/{run_id}/metrics/stream",
+    summary="订阅批次运行指标",
+    description="以 SSE 推送外呼批次运行指标，指标变化时推送，批次结束后关闭",
+)
+async def stream_run_metrics_controller(
+    request: Request,
+    run_id: Annotated[int, Path(description="批次ID")],
+    redis: Annotated[Redis, Depends(redis_getter)],
+    auth: Annotated[AuthSchema, Depends(AuthPermission(["module_calling:task:query"]))],
+) -> StreamingResponse:
+    """订阅批次运行指标（Server-Sent Events）"""
+    # 批次不存在或指标已过期时直接返回错误，不建立长连接
+    await CallBatchRunService.get_run_metrics_service(redis=redis, run_id=run_id)
+
+    async def events():
+        last = None
+        idle = 0.0
+        while not await request.is_disconnected():
+            data = await redis.get(RunMetrics.key(run_id))
+            if data and data != last:
+                last = data
+                idle = 0.0
+                yield f"event: metrics\ndata: {data}\n\n"
+                if json.loads(data)["status"] != CallBatchRun.STATUS_RUNNING:
+                    return
+            else:
+                idle += settings.CALLING_METRICS_PUBLISH_INTERVAL
+                # 保活注释行，避免代理断开空闲连接
+                if idle >= 15:
+                    idle = 0.0
+                    yield ": keep-alive\n\n"
+            await asyncio.sleep(settings.CALLING_METRICS_PUBLISH_INTERVAL)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @CallingTaskRouter.get(
     "/logs",
     summary="获取执行日志",
@@ -181,6 +290,25 @@ async def get_logs_controller(
     return SuccessResponse(data=result, msg="获取日志成功")
 
 
+@CallingTaskRouter.get(
+    "/logs/daily",
+    summary="获取日志日汇总",
+    description="按日期、系统名称、工单类型获取外呼成功/失败汇总，当天数据定时刷新（CALLING_LOG_ROLLUP_INTERVAL_MINUTES）",
+    response_model=list[CallLogDailyOutSchema],
+)
+async def get_log_daily_controller(
+    auth: Annotated[AuthSchema, Depends(AuthPermission(["module_calling:task:query"]))],
+    start_date: Annotated[date, Query(description="开始日期")],
+    end_date: Annotated[date, Query(description="结束日期（含）")],
+    sys_name: Annotated[str | None, Query(description="系统名称")] = None,
+) -> JSONResponse:
+    """获取日志日汇总"""
+    result = await CallLogMaintenanceService.get_daily_stats_service(
+        start_date=start_date, end_date=end_date, sys_name=sys_name
+    )
+    return SuccessResponse(data=result, msg="获取日志汇总成功")
+
+
 @CallingTaskRouter.get(
     "/preview/{id}",
     summary="预览待推送数据",
@@ -189,13 +317,15 @@ async def get_logs_controller(
 async def preview_pending_data_controller(
     id: Annotated[int, Path(description="任务ID")],
     auth: Annotated[AuthSchema, Depends(AuthPermission(["module_calling:task:query"]))],
+    redis: Annotated[Redis, Depends(redis_getter)],
     page_no: Annotated[int, Query(description="页码", ge=1)] = 1,
     page_size: Annotated[int, Query(description="每页数量", ge=1, le=100)] = 20,
+    cursor: Annotated[str | None, Query(description="上一页返回的 next_cursor，传入时按游标翻页")] = None,
 ) -> JSONResponse:
     """预览待推送数据"""
     from .api_service import PreviewDataService
     result = await PreviewDataService.get_pending_data_service(
-        task_id=id, auth=auth, page_no=page_no, page_size=page_size
+        task_id=id, auth=auth, redis=redis, page_no=page_no, page_size=page_size, cursor=cursor
     )
     log.info(f"预览待推送数据，任务ID: {id}，共 {result['total']} 条")
     return SuccessResponse(data=result, msg="获取待推送数据成功")
@@ -303,7 +433,6 @@ async def execute_cleanup_controller(
     """立即执行清理"""
     from .api_service import CallingCleanupService
     # 异步执行，不阻塞接口
-    import asyncio
     asyncio.create_task(CallingCleanupService.execute_cleanup())
     
     log.info("用户触发立即清理历史记录")
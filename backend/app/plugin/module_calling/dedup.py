@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""外呼历史去重索引（Redis 集合）"""
+import asyncio
+from typing import List, Sequence
+
+from redis.asyncio import Redis
+from sqlalchemy import select
+
+from app.config.setting import settings
+from app.core.database import async_db_session
+from app.core.logger import log
+from app.plugin.module_calling.model import CallHistory
+
+
+class HistoryDedupIndex:
+    """
+    已外呼号码去重索引
+
+    CALLING_DEDUP_MODE=redis 时启用：以 Redis 集合保存 call_history 中的全部号码，
+    源表查询不再与 call_history 做反连接（适用于源表在其他 Schema/库、反连接较慢或无法执行的场景），
+    改为在流式读取阶段按分片 SMISMEMBER 过滤。
+
+    - 回写成功后同步 SADD，历史表清空时同步清空
+    - 就绪标记不存在（首次启用、Redis 数据丢失、同步失败）时从 call_history 重建
+    """
+
+    KEY = "calling:history:mobiles"
+    READY_KEY = "calling:history:mobiles:ready"
+    LOCK_KEY = "calling:history:mobiles:lock"
+
+    @classmethod
+    def enabled(cls) -> bool:
+        """是否启用 Redis 去重索引"""
+        return settings.CALLING_DEDUP_MODE == "redis"
+
+    @classmethod
+    async def ensure(cls, redis: Redis) -> None:
+        """确保索引已就绪，未就绪时（加锁）从 call_history 重建"""
+        if await redis.exists(cls.READY_KEY):
+            return
+        if not await redis.set(cls.LOCK_KEY, "1", ex=600, nx=True):
+            # 其他实例正在重建，等待完成
+            while not await redis.exists(cls.READY_KEY):
+                if not await redis.exists(cls.LOCK_KEY):
+                    return await cls.ensure(redis)
+                await asyncio.sleep(1)
+            return
+        try:
+            await cls.rebuild(redis)
+        finally:
+            await redis.delete(cls.LOCK_KEY)
+
+    @classmethod
+    async def rebuild(cls, redis: Redis) -> int:
+        """
+        从 call_history 流式重建索引
+
+        直接写入正式 Key（SADD 幂等），重建期间并发回写的号码不会丢失。
+
+        返回:
+        - int: 索引号码数
+        """
+        start_time = asyncio.get_running_loop().time()
+        await redis.delete(cls.KEY)
+        total = 0
+        async with async_db_session() as db:
+            query = select(CallHistory.mobile_phone).execution_options(
+                yield_per=settings.CALLING_STREAM_CHUNK_SIZE
+            )
+            result = await db.stream_scalars(query)
+            async for mobiles in result.partitions(settings.CALLING_STREAM_CHUNK_SIZE):
+                if mobiles:
+                    await redis.sadd(cls.KEY, *mobiles)
+                    total += len(mobiles)
+        await redis.set(cls.READY_KEY, "1")
+        duration = asyncio.get_running_loop().time() - start_time
+        log.info(f"外呼历史去重索引已重建: {total} 个号码，耗时 {duration:.2f} 秒")
+        return total
+
+    @classmethod
+    async def filter_new(cls, redis: Redis, mobiles: Sequence[str]) -> List[str]:
+        """
+        过滤出未外呼过的号码
+
+        参数:
+        - mobiles: 待检查号码
+
+        返回:
+        - List[str]: 不在索引中的号码（保持原顺序）
+        """
+        if not mobiles:
+            return []
+        flags = await redis.smismember(cls.KEY, list(mobiles))
+        return [mobile for mobile, exists in zip(mobiles, flags, strict=True) if not exists]
+
+    @classmethod
+    async def add(cls, redis: Redis | None, mobiles: Sequence[str]) -> None:
+        """回写成功后同步号码，同步失败时清除就绪标记，下次执行前重建"""
+        if not redis or not mobiles or not cls.enabled():
+            return
+        try:
+            await redis.sadd(cls.KEY, *mobiles)
+        except Exception as e:
+            log.error(f"同步外呼历史去重索引失败，将在下次执行前重建: {e}")
+            try:
+                await redis.delete(cls.READY_KEY)
+            except Exception:
+                pass
+
+    @classmethod
+    async def clear(cls, redis: Redis | None) -> None:
+        """历史表清空后同步清空索引（空索引即为就绪状态）"""
+        if not redis or not cls.enabled():
+            return
+        try:
+            pipe = redis.pipeline(transaction=True)
+            pipe.delete(cls.KEY)
+            pipe.set(cls.READY_KEY, "1")
+            await pipe.execute()
+        except Exception as e:
+            log.error(f"清空外呼历史去重索引失败: {e}")
+            try:
+                await redis.delete(cls.READY_KEY)
+            except Exception:
+                pass
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""外呼网关 HTTP 客户端"""
+import httpx
+
+from app.config.setting import settings
+from app.core.logger import log
+
+
+class CallingGateway:
+    """
+    外呼网关长连接客户端
+
+    应用启动时创建、关闭时释放，所有外呼批次共享同一个连接池（HTTP keep-alive），
+    避免每个批次新建客户端及重复建立 TCP 连接。
+    """
+
+    client: httpx.AsyncClient | None = None
+
+    @classmethod
+    def init_client(cls) -> httpx.AsyncClient:
+        """创建网关客户端（已创建时直接返回）"""
+        if cls.client is None or cls.client.is_closed:
+            cls.client = httpx.AsyncClient(
+                headers={
+                    "Content-Type": "application/json",
+                    "X-APP-ID": settings.CALLING_APP_ID,
+                    "X-APP-KEY": settings.CALLING_APP_KEY,
+                },
+                timeout=httpx.Timeout(settings.CALLING_HTTP_TIMEOUT),
+                limits=httpx.Limits(
+                    max_connections=settings.CALLING_HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.CALLING_HTTP_MAX_KEEPALIVE,
+                    keepalive_expiry=settings.CALLING_HTTP_KEEPALIVE_EXPIRY,
+                ),
+            )
+            log.info(
+                f"外呼网关客户端已创建: 最大连接 {settings.CALLING_HTTP_MAX_CONNECTIONS}, "
+                f"保活连接 {settings.CALLING_HTTP_MAX_KEEPALIVE}"
+            )
+        return cls.client
+
+    @classmethod
+    def get_client(cls) -> httpx.AsyncClient:
+        """获取网关客户端，未在生命周期中创建时（如命令行执行）按需创建"""
+        return cls.init_client()
+
+    @classmethod
+    async def close_client(cls) -> None:
+        """关闭网关客户端"""
+        if cls.client is not None:
+            await cls.client.aclose()
+            cls.client = None
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""外呼批次运行指标：计数、耗时分布、在途数与预计剩余时间"""
+import asyncio
+import bisect
+import contextlib
+import json
+import time
+from collections import Counter, deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Tuple
+
+from redis.asyncio import Redis
+
+from app.config.setting import settings
+from app.core.logger import log
+from app.plugin.module_calling.model import CallBatchRun
+
+
+def error_category(error_msg: str) -> str:
+    """
+    将失败原因归类，去掉响应内容等明细，控制分类数量
+
+    例: "HTTP 503 - ..." -> "HTTP 503"，"网络异常: ..." -> "网络异常"，
+    "业务失败 (code=1): ..." -> "业务失败 (code=1)"
+    """
+    if not error_msg:
+        return "未知"
+    return error_msg.split(":", 1)[0].split(" - ", 1)[0].strip()[:50]
+
+
+class RunMetrics:
+    """
+    外呼批次运行指标
+
+    推送协程每完成一个号码调用 record，后台任务每 CALLING_METRICS_PUBLISH_INTERVAL 秒
+    将快照写入 Redis（calling:run:{run_id}:metrics），多实例下任一实例都能查询与推送 SSE。
+
+    - 累计计数：已处理、成功、失败及失败原因分布
+    - push_to_api 耗时直方图（整批）与最近窗口分位数（发现网关变慢）
+    - 在途请求数、最近窗口吞吐、预计剩余时间（需有待推送预览快照提供总数）
+    """
+
+    KEY_PREFIX = "calling:run"
+
+    # 耗时直方图桶上界（毫秒），最后一个桶为 +Inf
+    BUCKETS: Tuple[int, ...] = (50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000)
+
+    # 最近窗口：吞吐按秒、分位数按样本数
+    WINDOW_SECONDS = 30
+    WINDOW_SAMPLES = 1000
+
+    def __init__(
+        self,
+        redis: Redis,
+        run_id: int,
+        task_id: int,
+        expected_total: int | None = None,
+        processed: int = 0,
+        success: int = 0,
+    ):
+        self.redis = redis
+        self.run_id = run_id
+        self.task_id = task_id
+        self.expected_total = expected_total
+        self.status = CallBatchRun.STATUS_RUNNING
+        self.started_at = time.time()
+        # 续推时从检查点计数开始累计
+        self.base_processed = processed
+        self.processed = processed
+        self.success = success
+        self.failed = processed - success
+        self.in_flight = 0
+        self.errors: Counter[str] = Counter()
+        self.histogram: List[int] = [0] * (len(self.BUCKETS) + 1)
+        self.latency_sum = 0.0
+        self.latency_count = 0
+        self.recent_latencies: Deque[float] = deque(maxlen=self.WINDOW_SAMPLES)
+        self.recent_done: Deque[float] = deque()
+        self._publisher: asyncio.Task | None = None
+
+    @classmethod
+    def key(cls, run_id: int) -> str:
+        return f"{cls.KEY_PREFIX}:{run_id}:metrics"
+
+    def push_started(self) -> None:
+        """开始推送一个号码"""
+        self.in_flight += 1
+
+    def push_finished(self) -> None:
+        """结束推送一个号码（无论结果）"""
+        self.in_flight -= 1
+
+    def record(self, is_success: bool, error_msg: str = "", latency: float | None = None) -> None:
+        """
+        记录一个号码的推送结果
+
+        参数:
+        - is_success: 是否成功
+        - error_msg: 失败原因
+        - latency: push_to_api 耗时（秒），未实际请求（如熔断放弃）时为空
+        """
+        now = time.time()
+        self.processed += 1
+        self.recent_done.append(now)
+        if is_success:
+            self.success += 1
+        else:
+            self.failed += 1
+            self.errors[error_category(error_msg)] += 1
+        if latency is not None:
+            ms = latency * 1000
+            self.histogram[bisect.bisect_left(self.BUCKETS, ms)] += 1
+            self.latency_sum += ms
+            self.latency_count += 1
+            self.recent_latencies.append(ms)
+
+    def _recent_rate(self, now: float) -> float:
+        """最近窗口内每秒完成数"""
+        window_start = now - self.WINDOW_SECONDS
+        while self.recent_done and self.recent_done[0] < window_start:
+            self.recent_done.popleft()
+        elapsed = min(self.WINDOW_SECONDS, now - self.started_at)
+        return len(self.recent_done) / elapsed if elapsed > 0 else 0.0
+
+    def _percentiles(self) -> Dict[str, float]:
+        """最近窗口耗时分位数（毫秒）"""
+        if not self.recent_latencies:
+            return {}
+        samples = sorted(self.recent_latencies)
+
+        def pick(q: float) -> float:
+            return round(samples[min(len(samples) - 1, int(q * len(samples)))], 1)
+
+        return {"p50": pick(0.5), "p90": pick(0.9), "p99": pick(0.99), "max": round(samples[-1], 1)}
+
+    def snapshot(self) -> Dict[str, Any]:
+        """当前指标快照"""
+        now = time.time()
+        elapsed = now - self.started_at
+        session_processed = self.processed - self.base_processed
+        rate = self._recent_rate(now)
+        eta = None
+        if self.status == CallBatchRun.STATUS_RUNNING and self.expected_total is not None and rate > 0:
+            eta = round(max(self.expected_total - session_processed, 0) / rate, 1)
+        return {
+            "run_id": self.run_id,
+            "task_id": self.task_id,
+            "status": self.status,
+            "started_time": datetime.fromtimestamp(self.started_at).strftime("%Y-%m-%d %H:%M:%S"),
+            "updated_time": datetime.fromtimestamp(now).strftime("%Y-%m-%d %H:%M:%S"),
+            "elapsed_seconds": round(elapsed, 1),
+            "expected_total": self.expected_total,
+            "processed": self.processed,
+            "success": self.success,
+            "failed": self.failed,
+            "in_flight": self.in_flight,
+            "throughput": round(session_processed / elapsed, 2) if elapsed > 0 else 0.0,
+            "recent_throughput": round(rate, 2),
+            "eta_seconds": eta,
+            "latency_avg_ms": round(self.latency_sum / self.latency_count, 1) if self.latency_count else None,
+            "latency_recent_ms": self._percentiles(),
+            "latency_histogram": {
+                **{f"le_{bound}": count for bound, count in zip(self.BUCKETS, self.histogram[:-1], strict=True)},
+                "inf": self.histogram[-1],
+            },
+            "errors": dict(self.errors.most_common(20)),
+        }
+
+    async def publish(self) -> None:
+        """写入 Redis，失败只记录日志不影响推送"""
+        try:
+            await self.redis.set(
+                self.key(self.run_id),
+                json.dumps(self.snapshot(), ensure_ascii=False),
+                ex=settings.CALLING_METRICS_TTL,
+            )
+        except Exception as e:
+            log.error(f"发布外呼批次指标失败 [{self.run_id}]: {e}")
+
+    async def _publish_loop(self) -> None:
+        while True:
+            await self.publish()
+            await asyncio.sleep(settings.CALLING_METRICS_PUBLISH_INTERVAL)
+
+    def start(self) -> None:
+        """启动定时发布"""
+        if self._publisher is None:
+            self._publisher = asyncio.create_task(self._publish_loop())
+
+    async def stop(self, status: str) -> None:
+        """停止定时发布并写入最终状态"""
+        self.status = status
+        if self._publisher is not None:
+            self._publisher.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._publisher
+            self._publisher = None
+        await self.publish()
+
+    @classmethod
+    async def load(cls, redis: Redis, run_id: int) -> Dict[str, Any] | None:
+        """读取批次最新指标快照"""
+        data = await redis.get(cls.key(run_id))
+        return json.loads(data) if data else None
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
-from datetime import datetime
-from sqlalchemy import String, Integer, Boolean, Text, DateTime
+from datetime import date, datetime
+from sqlalchemy import String, Integer, Boolean, Text, Date, DateTime, Float, Index, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, declared_attr
 
 from app.core.base_model import MappedBase
@@ -49,10 +49,18 @@ class CallLog(MappedBase):
     外呼流水日志表
     """
     __tablename__ = "call_log"
-    __table_args__ = {"schema": settings.CALLING_SCHEMA}
+    __table_args__ = (
+        # 同一批次内每个号码只记录一条，分片回写可重复执行（ON CONFLICT DO NOTHING）
+        UniqueConstraint("run_id", "mobile_phone", name="uq_call_log_run_mobile"),
+        # 当天日志、保留期清理按时间范围查询；按号码查询按时间倒序取最近记录
+        Index("ix_call_log_push_time", "push_time"),
+        Index("ix_call_log_mobile_push_time", "mobile_phone", "push_time"),
+        {"schema": settings.CALLING_SCHEMA},
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True, comment="日志ID")
-    mobile_phone: Mapped[str] = mapped_column(String(20), index=True, comment="手机号码")
+    run_id: Mapped[int | None] = mapped_column(Integer, nullable=True, index=True, comment="批次ID")
+    mobile_phone: Mapped[str] = mapped_column(String(20), comment="手机号码")
     staff_name: Mapped[str] = mapped_column(String(50), comment="员工姓名")
     sys_name: Mapped[str] = mapped_column(String(50), comment="系统名称")
     order_type: Mapped[str] = mapped_column(String(50), comment="工单类型")
@@ -63,6 +71,25 @@ class CallLog(MappedBase):
     push_time: Mapped[datetime] = mapped_column(default=datetime.now, comment="推送时间")
 
 
+class CallLogDaily(CallingBase):
+    """
+    外呼日志日汇总表
+    按日期、系统名称、工单类型汇总成功/失败数，看板读取汇总数据，
+    原始日志超过保留期后清理
+    """
+    __tablename__ = "call_log_daily"
+    __table_args__ = {"schema": settings.CALLING_SCHEMA}
+
+    stat_date: Mapped[date] = mapped_column(Date, primary_key=True, comment="统计日期")
+    sys_name: Mapped[str] = mapped_column(String(50), primary_key=True, comment="系统名称")
+    order_type: Mapped[str] = mapped_column(String(50), primary_key=True, comment="工单类型")
+    success_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False, comment="成功数")
+    fail_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False, comment="失败数")
+    updated_time: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.now, nullable=False, comment="汇总时间"
+    )
+
+
 class CallingTaskConfig(CallingBase):
     """
     外呼任务配置表
@@ -81,6 +108,14 @@ class CallingTaskConfig(CallingBase):
     
     # 字段映射 JSON 格式: {"mobile_phone": "col1", "staff_name": "col2", ...}
     field_mapping: Mapped[str] = mapped_column(Text, nullable=False, comment="字段映射 JSON")
+
+    # 推送吞吐配置
+    push_concurrency: Mapped[int] = mapped_column(
+        Integer, default=5, server_default="5", nullable=False, comment="推送并发数"
+    )
+    push_rate_limit: Mapped[float] = mapped_column(
+        Float, default=0, server_default="0", nullable=False, comment="每秒最大推送数(0=不限速)"
+    )
     
     created_time: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.now, nullable=False, comment="创建时间"
@@ -89,3 +124,36 @@ class CallingTaskConfig(CallingBase):
         DateTime, default=datetime.now, onupdate=datetime.now, nullable=False, comment="更新时间"
     )
 
+
+
+class CallBatchRun(CallingBase):
+    """
+    外呼批次执行记录表
+    每次执行任务生成一个批次，按分片记录检查点（已处理到的手机号）及计数，
+    中断后可从检查点继续执行
+    """
+    __tablename__ = "call_batch_run"
+    __table_args__ = {"schema": settings.CALLING_SCHEMA}
+
+    # 批次状态
+    STATUS_RUNNING = "running"
+    STATUS_COMPLETED = "completed"
+    STATUS_FAILED = "failed"
+    STATUS_INTERRUPTED = "interrupted"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True, comment="批次ID")
+    task_id: Mapped[int] = mapped_column(Integer, index=True, nullable=False, comment="任务配置ID")
+    status: Mapped[str] = mapped_column(String(20), nullable=False, comment="状态(running/completed/failed/interrupted)")
+    cursor_mobile: Mapped[str | None] = mapped_column(String(20), nullable=True, comment="检查点: 已处理的最后一个手机号")
+    chunk_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False, comment="已完成分片数")
+    total_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False, comment="已推送号码数")
+    success_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False, comment="推送成功数")
+    fail_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False, comment="推送失败数")
+    error_msg: Mapped[str | None] = mapped_column(String(2000), nullable=True, comment="错误信息")
+    started_time: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.now, nullable=False, comment="开始时间"
+    )
+    updated_time: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.now, onupdate=datetime.now, nullable=False, comment="检查点更新时间"
+    )
+    finished_time: Mapped[datetime | None] = mapped_column(DateTime, nullable=True, comment="结束时间")
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+"""外呼推送引擎：并发工作池 + 令牌桶限速 + Redis 熔断器"""
+import asyncio
+import random
+import time
+from collections.abc import Awaitable, Callable, Sequence
+from typing import Any, Dict, List, TypeVar
+
+from redis.asyncio import Redis
+
+from app.config.setting import settings
+from app.core.logger import log
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def backoff_delay(attempt: int) -> float:
+    """
+    计算第 attempt 次（从 0 开始）重试前的等待时间：指数退避 + 随机抖动
+
+    参数:
+    - attempt: 已失败次数 - 1
+
+    返回:
+    - float: 等待秒数
+    """
+    delay = min(settings.CALLING_RETRY_BACKOFF_MAX, settings.CALLING_RETRY_BACKOFF_BASE * (2 ** attempt))
+    # Full jitter 的折中：保留一半基础等待，避免大量请求同一时刻重试
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class TokenBucket:
+    """
+    令牌桶限速器
+
+    按键共享：每个任务一个桶（速率取任务配置），目标接口另有一个全局桶（速率取 CALLING_TARGET_RATE_LIMIT），
+    并发任务之间互不覆盖速率。rate <= 0 表示不限速。
+    """
+
+    # {桶键: 令牌桶}
+    _buckets: Dict[str, "TokenBucket"] = {}
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    def get(cls, key: str, rate: float) -> "TokenBucket":
+        """获取键对应的令牌桶，速率变更（同一任务修改配置）时同步更新"""
+        bucket = cls._buckets.get(key)
+        if bucket is None:
+            bucket = cls._buckets[key] = cls(rate)
+        elif bucket.rate != rate:
+            bucket.rate = rate
+            bucket.capacity = max(rate, 1.0)
+        return bucket
+
+    async def acquire(self) -> None:
+        """获取一个令牌，令牌不足时等待"""
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class CircuitBreaker:
+    """
+    基于 Redis 的熔断器
+
+    统计窗口内网关系统性错误（网络异常、HTTP 5xx/429）达到阈值时打开熔断，
+    熔断期间所有实例、所有任务对该接口的推送暂停，到期后自动放行试探。
+    失败次数按窗口累计、到期自动清零，成功请求不重置计数（成功与失败交替时仍会熔断，
+    成功路径也无需访问 Redis）；熔断打开时清零计数，放行试探后重新统计。
+    """
+
+    KEY_PREFIX = "calling:circuit"
+
+    def __init__(self, redis: Redis, name: str):
+        self.redis = redis
+        self.open_key = f"{self.KEY_PREFIX}:{name}:open"
+        self.failure_key = f"{self.KEY_PREFIX}:{name}:failures"
+
+    async def remaining(self) -> float:
+        """熔断剩余时间（秒），未熔断返回 0"""
+        try:
+            ttl = await self.redis.pttl(self.open_key)
+        except Exception as e:
+            log.error(f"读取熔断状态失败: {e}")
+            return 0
+        return ttl / 1000 if ttl and ttl > 0 else 0
+
+    async def record_failure(self) -> None:
+        """记录一次系统性错误，达到阈值时打开熔断"""
+        try:
+            failures = await self.redis.incr(self.failure_key)
+            if failures == 1:
+                await self.redis.expire(self.failure_key, settings.CALLING_CIRCUIT_WINDOW_SECONDS)
+            if failures >= settings.CALLING_CIRCUIT_FAILURE_THRESHOLD:
+                opened = await self.redis.set(
+                    self.open_key, "1", ex=settings.CALLING_CIRCUIT_OPEN_SECONDS, nx=True
+                )
+                if opened:
+                    await self.redis.delete(self.failure_key)
+                    log.warning(
+                        f"外呼网关窗口内异常 {failures} 次，熔断 {settings.CALLING_CIRCUIT_OPEN_SECONDS} 秒"
+                    )
+        except Exception as e:
+            log.error(f"记录熔断失败次数失败: {e}")
+
+
+class PushEngine:
+    """
+    外呼推送引擎
+
+    - 固定数量的工作协程从队列取号推送，并发度按任务配置
+    - 按任务令牌桶限速，同一目标接口另受全局令牌桶限速
+    - 熔断打开时工作协程暂停等待，批次累计暂停超过上限后剩余号码直接记为失败
+    """
+
+    def __init__(self, redis: Redis, target: str, task_id: int, concurrency: int = 1, rate: float = 0):
+        self.concurrency = max(1, concurrency)
+        self.bucket = TokenBucket.get(f"{target}:task:{task_id}", rate)
+        self.target_bucket = TokenBucket.get(target, settings.CALLING_TARGET_RATE_LIMIT)
+        self.breaker = CircuitBreaker(redis, target)
+        self.paused_seconds = 0.0
+        self.aborted = False
+        self._pause_lock = asyncio.Lock()
+
+    async def wait_circuit(self) -> bool:
+        """
+        熔断打开时等待其关闭
+
+        返回:
+        - bool: 是否可以继续推送（累计暂停超过上限时返回 False）
+        """
+        if self.aborted:
+            return False
+        remaining = await self.breaker.remaining()
+        if not remaining:
+            return True
+        # 多个工作协程同时遇到熔断时只累计一次暂停时间
+        async with self._pause_lock:
+            remaining = await self.breaker.remaining()
+            while remaining and not self.aborted:
+                if self.paused_seconds >= settings.CALLING_CIRCUIT_MAX_PAUSE_SECONDS:
+                    self.aborted = True
+                    log.error(f"外呼网关熔断累计暂停 {self.paused_seconds:.0f} 秒，放弃剩余推送")
+                    break
+                log.warning(f"外呼网关熔断中，暂停推送 {remaining:.1f} 秒")
+                await asyncio.sleep(remaining)
+                self.paused_seconds += remaining
+                remaining = await self.breaker.remaining()
+        return not self.aborted
+
+    async def run(
+        self,
+        items: Sequence[T],
+        handler: Callable[[T], Awaitable[R]],
+        on_fail: Callable[[T, str], R],
+    ) -> List[R]:
+        """
+        并发执行推送
+
+        参数:
+        - items: 待推送对象列表
+        - handler: 单个对象的推送协程（内部负责重试）
+        - on_fail: 熔断放弃或推送异常时，由对象与失败原因生成结果的函数
+
+        返回:
+        - List[R]: 与 items 顺序一致的结果列表
+        """
+        results: List[Any] = [None] * len(items)
+        queue: asyncio.Queue[int] = asyncio.Queue()
+        for index in range(len(items)):
+            queue.put_nowait(index)
+
+        async def worker() -> None:
+            while True:
+                try:
+                    index = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                item = items[index]
+                if not await self.wait_circuit():
+                    results[index] = on_fail(item, "外呼网关熔断，放弃推送")
+                    continue
+                await self.bucket.acquire()
+                await self.target_bucket.acquire()
+                try:
+                    results[index] = await handler(item)
+                except Exception as e:
+                    log.error(f"推送异常: {e}")
+                    results[index] = on_fail(item, f"推送异常: {e}")
+
+        workers = min(self.concurrency, len(items))
+        await asyncio.gather(*(worker() for _ in range(workers)))
+        return results
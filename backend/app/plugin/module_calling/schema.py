@@ -23,6 +23,8 @@ class CallingTaskCreateSchema(BaseModel):
     is_enabled: bool = Field(default=True, description="是否启用")
     remark: Optional[str] = Field(default=None, max_length=500, description="备注")
     field_mapping: FieldMappingSchema = Field(..., description="字段映射配置")
+    push_concurrency: int = Field(default=5, ge=1, le=100, description="推送并发数")
+    push_rate_limit: float = Field(default=0, ge=0, description="每秒最大推送数(0=不限速)")
 
 
 class CallingTaskUpdateSchema(CallingTaskCreateSchema):
@@ -40,6 +42,8 @@ class CallingTaskOutSchema(BaseModel):
     is_enabled: bool = Field(..., description="是否启用")
     remark: Optional[str] = Field(default=None, description="备注")
     field_mapping: FieldMappingSchema = Field(..., description="字段映射配置")
+    push_concurrency: int = Field(default=5, description="推送并发数")
+    push_rate_limit: float = Field(default=0, description="每秒最大推送数(0=不限速)")
     created_time: str = Field(..., description="创建时间")
     updated_time: str = Field(..., description="更新时间")
 
@@ -101,6 +105,53 @@ class CallLogOutSchema(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class CallLogDailyOutSchema(BaseModel):
+    """外呼日志日汇总响应模型"""
+    stat_date: str = Field(..., description="统计日期")
+    sys_name: str = Field(..., description="系统名称")
+    order_type: str = Field(..., description="工单类型")
+    success_count: int = Field(..., description="成功数")
+    fail_count: int = Field(..., description="失败数")
+
+
+class CallBatchRunOutSchema(BaseModel):
+    """外呼批次响应模型"""
+    id: int = Field(..., description="批次ID")
+    task_id: int = Field(..., description="任务配置ID")
+    status: str = Field(..., description="状态(running/completed/failed/interrupted)")
+    cursor_mobile: Optional[str] = Field(default=None, description="检查点: 已处理的最后一个手机号")
+    chunk_count: int = Field(..., description="已完成分片数")
+    total_count: int = Field(..., description="已推送号码数")
+    success_count: int = Field(..., description="推送成功数")
+    fail_count: int = Field(..., description="推送失败数")
+    error_msg: Optional[str] = Field(default=None, description="错误信息")
+    started_time: str = Field(..., description="开始时间")
+    updated_time: str = Field(..., description="检查点更新时间")
+    finished_time: str = Field(default="", description="结束时间")
+
+
+class CallRunMetricsOutSchema(BaseModel):
+    """外呼批次运行指标"""
+    run_id: int = Field(..., description="批次ID")
+    task_id: int = Field(..., description="任务配置ID")
+    status: str = Field(..., description="状态(running/completed/failed/interrupted)")
+    started_time: str = Field(..., description="开始时间")
+    updated_time: str = Field(..., description="指标更新时间")
+    elapsed_seconds: float = Field(..., description="已运行秒数")
+    expected_total: Optional[int] = Field(default=None, description="预计待推送总数（来自预览快照）")
+    processed: int = Field(..., description="已处理号码数")
+    success: int = Field(..., description="成功数")
+    failed: int = Field(..., description="失败数")
+    in_flight: int = Field(..., description="在途请求数")
+    throughput: float = Field(..., description="平均吞吐(条/秒)")
+    recent_throughput: float = Field(..., description="最近 30 秒吞吐(条/秒)")
+    eta_seconds: Optional[float] = Field(default=None, description="预计剩余秒数")
+    latency_avg_ms: Optional[float] = Field(default=None, description="平均推送耗时(毫秒)")
+    latency_recent_ms: dict[str, float] = Field(default_factory=dict, description="最近推送耗时分位数(p50/p90/p99/max)")
+    latency_histogram: dict[str, int] = Field(default_factory=dict, description="推送耗时分布(毫秒桶上界: 数量)")
+    errors: dict[str, int] = Field(default_factory=dict, description="失败原因分布")
+
+
 # ============ 预览数据相关 Schema ============
 
 class PreviewDataItemSchema(BaseModel):
@@ -118,6 +169,7 @@ class PreviewDataResultSchema(BaseModel):
     items: list[PreviewDataItemSchema] = Field(..., description="数据列表")
     page_no: int = Field(..., description="当前页码")
     page_size: int = Field(..., description="每页数量")
+    next_cursor: str | None = Field(default=None, description="下一页游标（本页最后一个手机号），无更多数据时为空")
 
 
 # ============ 清理配置 Schema ============
@@ -1,50 +1,98 @@
 import asyncio
 import json
+import random
 import time
 from datetime import datetime
+from string import Template
 from typing import Dict, List, Set, Any
 
 import httpx
 from apscheduler.triggers.cron import CronTrigger
 from redis.asyncio import Redis
-from sqlalchemy import select, delete, text
+from sqlalchemy import select, delete, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from app.config.setting import settings
 from app.core.database import async_db_session
 from app.core.logger import log
-from app.plugin.module_calling.model import CallTask, CallHistory, CallLog, CallingTaskConfig
+from app.plugin.module_calling.cluster import CallingCluster
+from app.plugin.module_calling.dedup import HistoryDedupIndex
+from app.plugin.module_calling.gateway import CallingGateway
+from app.plugin.module_calling.metrics import RunMetrics
+from app.plugin.module_calling.model import CallTask, CallHistory, CallLog, CallingTaskConfig, CallBatchRun
+from app.plugin.module_calling.push_engine import CircuitBreaker, PushEngine, backoff_delay
 
 
 class DistinctIdGenerator:
     """
     分布式流水号生成器 (基于 Redis)
     格式: YYYYMMDDHHmmss + 3位序列号 (共17位)
+
+    按块分配序列号：一次 Lua 脚本（INCRBY + 首次 EXPIRE）为当前秒预留 block_size 个序号，
+    之后在本地依次发放，同一秒内多次调用只需一次 Redis 往返。
+    当前秒的 999 个序号耗尽时等待到下一秒再分配（循环等待，不递归）。
     """
 
-    def __init__(self, redis: Redis):
+    # 每秒最大序列号（3位）
+    MAX_SEQ = 999
+
+    # 预留序号块：INCRBY 返回块末尾序号，首次创建 key 时设置过期时间
+    RESERVE_SCRIPT = """
+    local last = redis.call('INCRBY', KEYS[1], ARGV[1])
+    if last == tonumber(ARGV[1]) then
+        redis.call('EXPIRE', KEYS[1], ARGV[2])
+    end
+    return last
+    """
+
+    # {Redis 连接 id: 生成器}，同一连接共享本地序号块
+    _instances: Dict[int, "DistinctIdGenerator"] = {}
+
+    def __init__(self, redis: Redis, block_size: int | None = None):
         self.redis = redis
+        self.block_size = max(1, min(block_size or settings.CALLING_DISTINCT_ID_BLOCK, self.MAX_SEQ))
+        self._reserve = redis.register_script(self.RESERVE_SCRIPT)
+        self._lock = asyncio.Lock()
+        # 当前持有的序号块: 所属秒、下一个可用序号、块末尾序号
+        self._time_str = ""
+        self._next = 1
+        self._end = 0
+
+    @classmethod
+    def shared(cls, redis: Redis) -> "DistinctIdGenerator":
+        """获取 Redis 连接共享的生成器实例"""
+        generator = cls._instances.get(id(redis))
+        if generator is None or generator.redis is not redis:
+            generator = cls._instances[id(redis)] = cls(redis)
+        return generator
 
     async def generate(self) -> str:
         """生成唯一的17位流水号"""
-        now = datetime.now()
-        time_str = now.strftime("%Y%m%d%H%M%S")
-        
-        # 使用 Redis INCR 命令实现原子递增
-        # Key 格式: calling:seq:{time_str}
-        key = f"calling:seq:{time_str}"
-        
-        # 自增并设置过期时间（5秒后过期即可，因为只在当前秒内有效）
-        seq = await self.redis.incr(key)
-        if seq == 1:
-            await self.redis.expire(key, 5)
-            
-        # 如果序列号超过 999 (同一秒超过 1000 请求)，则等待下一秒
-        # 这种情况在高并发下极少发生，但在极端情况下需要保护
-        if seq > 999:
-            await asyncio.sleep(0.01)
-            return await self.generate()
-            
-        return f"{time_str}{seq:03d}"
+        async with self._lock:
+            while True:
+                now = time.time()
+                time_str = time.strftime("%Y%m%d%H%M%S", time.localtime(now))
+
+                # 本地块仍属于当前秒且未用完，直接发放
+                if time_str == self._time_str and self._next <= self._end:
+                    seq = self._next
+                    self._next += 1
+                    return f"{time_str}{seq:03d}"
+
+                # 为当前秒预留新块，Key 格式: calling:seq:{time_str}
+                last = int(await self._reserve(
+                    keys=[f"calling:seq:{time_str}"], args=[self.block_size, 5]
+                ))
+                start = last - self.block_size + 1
+                if start <= self.MAX_SEQ:
+                    self._time_str = time_str
+                    self._next = start
+                    self._end = min(last, self.MAX_SEQ)
+                    continue
+
+                # 当前秒序号已耗尽（同一秒超过 999 个），等待到下一秒
+                self._time_str = ""
+                await asyncio.sleep(1 - now % 1 + 0.001)
 
 
 class CallingService:
@@ -60,80 +108,127 @@ class CallingService:
     VERSION = "1.0"
     SIGN = "主动服务触发渠道系统发送事件信息"
 
+    # call_history 版本号，回写或清理历史后递增，预览快照据此失效
+    HISTORY_VERSION_KEY = "calling:history:version"
+
+    # 类变量，存储应用的Redis连接（调度初始化时保存），供无 Redis 参数的清理任务使用
+    redis_instance: Redis | None = None
+
+    # 请求体模板（仅逐条替换时间、流水号与号码等字段）及按秒缓存的时间字符串
+    _body_template: Template | None = None
+    _time_cache: tuple[int, str, str] = (0, "", "")
+
     @classmethod
     def get_current_time_formatted(cls):
-        """获取 req_time 和 oper_time"""
-        now = datetime.now()
-        req_time = now.strftime("%Y%m%d%H%M%S") + "000"
-        oper_time = now.strftime("%Y-%m-%d %H:%M:%S")
-        return req_time, oper_time
+        """获取 req_time 和 oper_time（同一秒内复用格式化结果）"""
+        now = int(time.time())
+        if cls._time_cache[0] != now:
+            local = time.localtime(now)
+            cls._time_cache = (
+                now,
+                time.strftime("%Y%m%d%H%M%S", local) + "000",
+                time.strftime("%Y-%m-%d %H:%M:%S", local),
+            )
+        return cls._time_cache[1], cls._time_cache[2]
 
     @classmethod
-    async def build_request_body(cls, record: CallTask, redis: Redis) -> Dict:
-        """构建请求体"""
-        req_time, oper_time = cls.get_current_time_formatted()
-        generator = DistinctIdGenerator(redis)
-        distinct_id = await generator.generate()
-
-        return {
-            "contract_root": {
-                "tcp_cont": {
-                    "req_time": req_time,
-                    "svc_code": cls.SVC_CODE,
-                    "api_code": cls.API_CODE,
-                    "transaction_id": "",
-                    "sign": cls.SIGN,
-                    "version": cls.VERSION
-                },
-                "svc_cont": {
-                    "distinct_id": distinct_id,
-                    "properties": {
-                        "event_code": cls.EVENT_CODE,
-                        "oper_time": oper_time,
-                        "target_obj_type": cls.TARGET_OBJ_TYPE,
-                        "target_obj_id": cls.TARGET_OBJ_ID,
-                        "accs_nbr": record.mobile_phone,
-                        "contact_nbr": record.mobile_phone,
-                        "lan_id": cls.LAN_ID,
-                        "cust_name": record.staff_name,
-                        "busi_params": {
-                            "staff_name": record.staff_name,
-                            "sys_name": record.sys_name,
-                            "order_type": record.order_type,
-                            "order_nums": record.order_nums
+    def get_body_template(cls) -> Template:
+        """
+        获取请求体模板
+
+        固定参数预先序列化为 JSON 文本，逐条字段以 $占位符 保留，
+        构建请求体时只需替换占位符（替换值为 JSON 编码后的文本）。
+        """
+        if cls._body_template is None:
+            body = {
+                "contract_root": {
+                    "tcp_cont": {
+                        "req_time": "$req_time",
+                        "svc_code": cls.SVC_CODE,
+                        "api_code": cls.API_CODE,
+                        "transaction_id": "",
+                        "sign": cls.SIGN,
+                        "version": cls.VERSION
+                    },
+                    "svc_cont": {
+                        "distinct_id": "$distinct_id",
+                        "properties": {
+                            "event_code": cls.EVENT_CODE,
+                            "oper_time": "$oper_time",
+                            "target_obj_type": cls.TARGET_OBJ_TYPE,
+                            "target_obj_id": cls.TARGET_OBJ_ID,
+                            "accs_nbr": "$mobile_phone",
+                            "contact_nbr": "$mobile_phone",
+                            "lan_id": cls.LAN_ID,
+                            "cust_name": "$staff_name",
+                            "busi_params": {
+                                "staff_name": "$staff_name",
+                                "sys_name": "$sys_name",
+                                "order_type": "$order_type",
+                                "order_nums": "$order_nums"
+                            }
                         }
                     }
                 }
             }
-        }
+            text_body = json.dumps(body, ensure_ascii=False)
+            for field in ("req_time", "oper_time", "distinct_id", "mobile_phone",
+                          "staff_name", "sys_name", "order_type", "order_nums"):
+                text_body = text_body.replace(f'"${field}"', f"${field}")
+            cls._body_template = Template(text_body)
+        return cls._body_template
+
+    @classmethod
+    async def build_request_body(cls, record: CallTask, redis: Redis) -> bytes:
+        """构建请求体（JSON 编码后的字节串）"""
+        req_time, oper_time = cls.get_current_time_formatted()
+        distinct_id = await DistinctIdGenerator.shared(redis).generate()
+        dumps = json.dumps
+
+        return cls.get_body_template().substitute(
+            req_time=dumps(req_time),
+            oper_time=dumps(oper_time),
+            distinct_id=dumps(distinct_id),
+            mobile_phone=dumps(record.mobile_phone, ensure_ascii=False),
+            staff_name=dumps(record.staff_name, ensure_ascii=False),
+            sys_name=dumps(record.sys_name, ensure_ascii=False),
+            order_type=dumps(record.order_type, ensure_ascii=False),
+            order_nums=dumps(record.order_nums),
+        ).encode("utf-8")
 
     @classmethod
-    async def push_to_api(cls, client: httpx.AsyncClient, body: Dict, mobile: str) -> tuple[bool, str]:
-        """调用 API 推送"""
+    async def push_to_api(
+        cls,
+        client: httpx.AsyncClient,
+        body: bytes,
+        mobile: str,
+        breaker: CircuitBreaker | None = None,
+    ) -> tuple[bool, str]:
+        """
+        调用 API 推送
+
+        失败时按指数退避 + 随机抖动重试；网络异常、HTTP 5xx/429 计入熔断器。
+        请求头由网关客户端统一设置；报文仅在 DEBUG 级别或按采样比例记录。
+        """
         if not settings.CALLING_API_URL:
             log.warning("未配置 CALLING_API_URL，跳过推送")
             return False, "未配置 API URL"
 
-        headers = {
-            "Content-Type": "application/json",
-            "X-APP-ID": settings.CALLING_APP_ID,
-            "X-APP-KEY": settings.CALLING_APP_KEY
-        }
-        
+        # 按采样比例以 INFO 级别记录报文，其余仅 DEBUG 级别（惰性格式化）
+        sampled = random.random() < settings.CALLING_PAYLOAD_LOG_SAMPLE_RATE
+        payload_log = log.opt(lazy=True).info if sampled else log.opt(lazy=True).debug
+
         last_error = ""
 
         for attempt in range(settings.CALLING_RETRY_COUNT):
+            # 是否为网关系统性错误（计入熔断）
+            systemic = False
             try:
                 # 首次尝试时记录请求体
                 if attempt == 0:
-                    log.info(f"推送请求体 ({mobile}): {json.dumps(body, ensure_ascii=False, indent=2)}")
+                    payload_log("推送请求体 ({}): {}", lambda: mobile, lambda: body.decode("utf-8"))
                 
-                response = await client.post(
-                    settings.CALLING_API_URL,
-                    json=body,
-                    headers=headers,
-                    timeout=30.0
-                )
+                response = await client.post(settings.CALLING_API_URL, content=body)
                 
                 if response.status_code == 200:
                     try:
@@ -142,8 +237,8 @@ class CallingService:
                         result_msg = resp_json.get("contractRoot", {}).get("svcCont", {}).get("result", {}).get("result_msg", "")
                         
                         if resp_code == "0":
-                            log.info(f"推送成功: {mobile}")
-                            log.info(f"响应体 ({mobile}): {json.dumps(resp_json, ensure_ascii=False, indent=2)}")
+                            log.debug(f"推送成功: {mobile}")
+                            payload_log("响应体 ({}): {}", lambda: mobile, lambda: response.text)
                             return True, ""
                         else:
                             last_error = f"业务失败 (code={resp_code}): {result_msg}"
@@ -152,36 +247,260 @@ class CallingService:
                         last_error = f"解析响应失败: {str(e)}"
                         log.warning(f"响应解析异常 ({attempt + 1}/{settings.CALLING_RETRY_COUNT}): {last_error}")
                 else:
+                    systemic = response.status_code >= 500 or response.status_code == 429
                     last_error = f"HTTP {response.status_code} - {response.text[:200]}"
                     log.warning(f"推送失败 ({attempt + 1}/{settings.CALLING_RETRY_COUNT}): {last_error}")
             
             except httpx.RequestError as e:
+                systemic = True
                 last_error = f"网络异常: {str(e)}"
                 log.warning(f"网络异常 ({attempt + 1}/{settings.CALLING_RETRY_COUNT}): {last_error}")
             except Exception as e:
                 last_error = f"未知异常: {str(e)}"
                 log.error(f"未知异常 ({attempt + 1}/{settings.CALLING_RETRY_COUNT}): {last_error}")
 
-            # 重试等待
+            if systemic and breaker:
+                await breaker.record_failure()
+
+            # 重试等待（指数退避 + 随机抖动）
             if attempt < settings.CALLING_RETRY_COUNT - 1:
-                await asyncio.sleep(1)
+                await asyncio.sleep(backoff_delay(attempt))
         
         return False, last_error
 
+    @classmethod
+    def build_call_log(cls, task: CallTask, is_success: bool, error_msg: str) -> CallLog:
+        """构建流水日志对象"""
+        return CallLog(
+            mobile_phone=task.mobile_phone,
+            staff_name=task.staff_name,
+            sys_name=task.sys_name,
+            order_type=task.order_type,
+            order_nums=task.order_nums,
+            status=1 if is_success else 0,
+            error_msg=error_msg,
+            push_time=datetime.now()
+        )
+
+    @classmethod
+    def build_source_query(
+        cls,
+        field_mapping: Dict[str, str],
+        source_schema: str,
+        source_table: str,
+        after_mobile: str | None = None,
+        cast_mobile: bool = True,
+        exclude_history: bool = True,
+    ):
+        """
+        构建源表待推送数据查询
+
+        直接在数据库层面过滤掉已存在于 call_history 的手机号，并按手机号排序，
+        使同一号码的多条记录相邻，流式读取时只需与上一条比较即可去重；
+        传入 after_mobile 时只读取检查点之后的号码（用于断点续推）。
+        源表手机号列本身为字符类型时（cast_mobile=False）不做类型转换，便于使用两侧索引。
+        exclude_history=False 时不做反连接，由调用方在流式读取阶段通过去重索引过滤。
+        """
+        # 使用 NOT EXISTS 子句，相比 LEFT JOIN + IS NULL 性能通常更好且逻辑更清晰
+        source = f'"{source_schema}"."{source_table}"'
+        mobile_col = f'"{field_mapping["mobile_phone"]}"'
+        mobile_expr = f"source_t.{mobile_col}::VARCHAR" if cast_mobile else f"source_t.{mobile_col}"
+
+        # 使用配置的 Schema
+        history_table = f'"{settings.CALLING_SCHEMA}"."call_history"'
+        conditions = []
+        if exclude_history:
+            conditions.append(f"""NOT EXISTS (
+                SELECT 1 FROM {history_table} h 
+                WHERE h.mobile_phone = {mobile_expr}
+            )""")
+        if after_mobile:
+            conditions.append(f"{mobile_expr} > :after_mobile")
+        where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        query = text(f"""
+            SELECT 
+                {mobile_expr} as mobile_phone,
+                "{field_mapping['staff_name']}" as staff_name,
+                "{field_mapping['sys_name']}" as sys_name,
+                "{field_mapping['order_type']}" as order_type,
+                "{field_mapping['order_nums']}" as order_nums
+            FROM {source} source_t
+            {where_clause}
+            ORDER BY {mobile_expr}
+        """)
+        if after_mobile:
+            query = query.bindparams(after_mobile=after_mobile)
+        return query
+
+    @classmethod
+    async def is_text_column(cls, db: Any, schema_name: str, table_name: str, column_name: str) -> bool:
+        """判断源表列是否为字符类型（无需转换即可与 call_history.mobile_phone 比较）"""
+        result = await db.execute(text("""
+            SELECT data_type FROM information_schema.columns
+            WHERE table_schema = :schema_name AND table_name = :table_name AND column_name = :column_name
+        """), {"schema_name": schema_name, "table_name": table_name, "column_name": column_name})
+        return result.scalar() in ("character varying", "character", "text")
+
+    @classmethod
+    async def touch_history(cls, redis: Redis | None = None) -> None:
+        """
+        call_history 变更后递增版本号，使待推送预览快照失效
+
+        参数:
+        - redis: Redis 连接，未传入时使用调度初始化时保存的连接
+        """
+        redis = redis or cls.redis_instance
+        if not redis:
+            return
+        try:
+            await redis.incr(cls.HISTORY_VERSION_KEY)
+        except Exception as e:
+            log.error(f"更新外呼历史版本号失败: {e}")
+
+    @classmethod
+    def row_to_task(cls, row: Any) -> CallTask:
+        """将查询行转换为 CallTask 对象"""
+        return CallTask(
+            mobile_phone=str(row[0]) if row[0] else "",
+            staff_name=str(row[1]) if row[1] else "",
+            sys_name=str(row[2]) if row[2] else "",
+            order_type=str(row[3]) if row[3] else "",
+            order_nums=int(row[4]) if row[4] else 0
+        )
+
+    @classmethod
+    async def write_back(
+        cls,
+        run_id: int,
+        call_logs: List[CallLog],
+        success_tasks: List[CallTask],
+    ) -> None:
+        """
+        回写一个分片的流水日志、历史记录并推进批次检查点（同一事务）
+
+        流水日志按 (run_id, mobile_phone)、历史表按 mobile_phone 使用 ON CONFLICT DO NOTHING，
+        分片重复回写或号码已存在时不影响同批其他记录。
+        """
+        async with async_db_session() as db:
+            async with db.begin():
+                # 写入流水日志
+                if call_logs:
+                    stmt = pg_insert(CallLog).values([
+                        {
+                            "run_id": run_id,
+                            "mobile_phone": call_log.mobile_phone,
+                            "staff_name": call_log.staff_name,
+                            "sys_name": call_log.sys_name,
+                            "order_type": call_log.order_type,
+                            "order_nums": call_log.order_nums,
+                            "status": call_log.status,
+                            "error_msg": call_log.error_msg,
+                            "push_time": call_log.push_time,
+                        } for call_log in call_logs
+                    ]).on_conflict_do_nothing(index_elements=["run_id", "mobile_phone"])
+                    await db.execute(stmt)
+
+                # 更新历史表 (追加成功的记录，不清空)
+                if success_tasks:
+                    stmt = pg_insert(CallHistory).values([
+                        {
+                            "mobile_phone": t.mobile_phone,
+                            "staff_name": t.staff_name,
+                            "sys_name": t.sys_name,
+                            "order_type": t.order_type,
+                            "order_nums": t.order_nums,
+                        } for t in success_tasks
+                    ]).on_conflict_do_nothing(index_elements=["mobile_phone"])
+                    await db.execute(stmt)
+
+                # 推进检查点
+                await db.execute(
+                    update(CallBatchRun)
+                    .where(CallBatchRun.id == run_id)
+                    .values(
+                        cursor_mobile=call_logs[-1].mobile_phone,
+                        chunk_count=CallBatchRun.chunk_count + 1,
+                        total_count=CallBatchRun.total_count + len(call_logs),
+                        success_count=CallBatchRun.success_count + len(success_tasks),
+                        fail_count=CallBatchRun.fail_count + len(call_logs) - len(success_tasks),
+                        updated_time=datetime.now(),
+                    )
+                )
+
+    @classmethod
+    async def start_run(cls, task_id: int) -> int:
+        """创建新的执行批次，返回批次ID"""
+        async with async_db_session() as db:
+            async with db.begin():
+                run = CallBatchRun(task_id=task_id, status=CallBatchRun.STATUS_RUNNING)
+                db.add(run)
+                await db.flush()
+                return run.id
+
+    @classmethod
+    async def get_run(cls, run_id: int) -> CallBatchRun | None:
+        """获取执行批次"""
+        async with async_db_session() as db:
+            return await db.get(CallBatchRun, run_id)
+
+    @classmethod
+    async def finish_run(cls, run_id: int, status: str, error_msg: str | None = None) -> None:
+        """结束执行批次"""
+        try:
+            async with async_db_session() as db:
+                async with db.begin():
+                    await db.execute(
+                        update(CallBatchRun)
+                        .where(CallBatchRun.id == run_id)
+                        .values(
+                            status=status,
+                            error_msg=error_msg[:2000] if error_msg else None,
+                            finished_time=datetime.now(),
+                            updated_time=datetime.now(),
+                        )
+                    )
+        except Exception as e:
+            log.error(f"更新批次状态失败 [{run_id}]: {e}")
+
+    @classmethod
+    async def mark_interrupted_runs(cls, exclude_task_ids: List[int] | None = None) -> int:
+        """
+        将进程重启前仍处于执行中的批次标记为已中断（应用启动时调用）
+
+        参数:
+        - exclude_task_ids: 正在其他节点执行（持有执行锁）的任务ID，其批次不做标记
+
+        返回:
+        - int: 标记的批次数
+        """
+        stmt = update(CallBatchRun).where(CallBatchRun.status == CallBatchRun.STATUS_RUNNING)
+        if exclude_task_ids:
+            stmt = stmt.where(CallBatchRun.task_id.not_in(exclude_task_ids))
+        async with async_db_session() as db:
+            async with db.begin():
+                result = await db.execute(
+                    stmt
+                    .values(status=CallBatchRun.STATUS_INTERRUPTED, updated_time=datetime.now())
+                )
+                return result.rowcount or 0
 
     @classmethod
-    async def execute_task_with_config(cls, redis: Redis, task_id: int):
+    async def execute_task_with_config(cls, redis: Redis, task_id: int, run_id: int | None = None):
         """
         根据任务配置执行外呼任务
         
-        从 CallingTaskConfig 读取配置，动态查询源数据表执行外呼
+        从 CallingTaskConfig 读取配置，流式读取源数据表（服务端游标），
+        每读取 CALLING_STREAM_CHUNK_SIZE 条推送一次，并在同一事务中回写该分片的日志、历史与批次检查点，
+        内存占用与源表大小无关，异常中断时最多重复推送一个分片。
         
         参数:
         - redis: Redis 连接
         - task_id: 任务配置 ID
+        - run_id: 续推的批次ID（需已置为执行中），为空时创建新批次
         """
         start_time = time.time()
-        log.info(f"====== 开始执行外呼任务 (配置ID: {task_id}) ======")
+        log.info(f"====== 开始执行外呼任务 (配置ID: {task_id}, 续推批次: {run_id or '无'}) ======")
 
         # Step 1: 读取任务配置
         task_config = None
@@ -193,10 +512,14 @@ class CallingService:
         
         if not task_config:
             log.error(f"任务配置不存在: {task_id}")
+            if run_id:
+                await cls.finish_run(run_id, CallBatchRun.STATUS_FAILED, "任务配置不存在")
             return
         
         if not task_config.is_enabled:
             log.warning(f"任务已禁用: {task_config.name}")
+            if run_id:
+                await cls.finish_run(run_id, CallBatchRun.STATUS_INTERRUPTED, "任务已禁用")
             return
 
         # 解析字段映射
@@ -204,116 +527,146 @@ class CallingService:
         log.info(f"任务配置: {task_config.name}, 源表: {task_config.source_schema}.{task_config.source_table}")
         log.info(f"字段映射: {field_mapping}")
 
-        # Step 2: 从配置的源表读取新增数据 (利用 SQL 过滤)
-        tasks = []
-        
+        # Step 2: 创建批次或读取续推批次的检查点
+        if not run_id:
+            run_id = await cls.start_run(task_id)
+        run = await cls.get_run(run_id)
+        if not run:
+            log.error(f"批次不存在: {run_id}")
+            return
+        total_count = run.total_count
+        success_count = run.success_count
+        last_mobile = run.cursor_mobile
+        if last_mobile:
+            log.info(f"从检查点续推: 批次 {run_id}, 已处理至 {last_mobile}, 已推送 {total_count} 条")
+
+        # Step 3: 初始化推送引擎（并发工作池 + 限速 + 熔断）
+        # 未配置限速时沿用全局请求间隔换算的速率
+        rate = task_config.push_rate_limit or 0
+        if not rate and settings.CALLING_REQUEST_INTERVAL > 0:
+            rate = 1 / settings.CALLING_REQUEST_INTERVAL
+        engine = PushEngine(
+            redis=redis,
+            target=settings.CALLING_API_URL,
+            task_id=task_id,
+            concurrency=task_config.push_concurrency or 1,
+            rate=rate,
+        )
+        log.info(f"推送并发数: {engine.concurrency}, 限速: {rate or '不限'} 次/秒")
+
         async with async_db_session() as db:
-            # 动态构建 SQL 查询，直接在数据库层面过滤掉已存在于 call_history 的手机号
-            # 使用 NOT EXISTS 子句，相比 LEFT JOIN + IS NULL 性能通常更好且逻辑更清晰
-            source_table = f'"{task_config.source_schema}"."{task_config.source_table}"'
-            mobile_col = f'"{field_mapping["mobile_phone"]}"'
-            
-            # 使用配置的 Schema
-            history_table = f'"{settings.CALLING_SCHEMA}"."call_history"'
-            
-            query = text(f"""
-                SELECT 
-                    {mobile_col} as mobile_phone,
-                    "{field_mapping['staff_name']}" as staff_name,
-                    "{field_mapping['sys_name']}" as sys_name,
-                    "{field_mapping['order_type']}" as order_type,
-                    "{field_mapping['order_nums']}" as order_nums
-                FROM {source_table} source_t
-                WHERE NOT EXISTS (
-                    SELECT 1 FROM {history_table} h 
-                    WHERE h.mobile_phone = source_t.{mobile_col}::VARCHAR
+            cast_mobile = not await cls.is_text_column(
+                db, task_config.source_schema, task_config.source_table, field_mapping["mobile_phone"]
+            )
+        # 启用去重索引时源表直接顺序扫描，已外呼号码在分片阶段过滤
+        use_dedup_index = HistoryDedupIndex.enabled()
+        if use_dedup_index:
+            await HistoryDedupIndex.ensure(redis)
+        query = cls.build_source_query(
+            field_mapping,
+            task_config.source_schema,
+            task_config.source_table,
+            after_mobile=last_mobile,
+            cast_mobile=cast_mobile,
+            exclude_history=not use_dedup_index,
+        ).execution_options(yield_per=settings.CALLING_STREAM_CHUNK_SIZE)
+
+        # 所有批次共享网关长连接客户端
+        client = CallingGateway.get_client()
+
+        # 运行指标：预计总数取待推送预览快照（如有），用于估算剩余时间
+        from app.plugin.module_calling.api_service import PreviewDataService
+        metrics = RunMetrics(
+            redis,
+            run_id,
+            task_id,
+            expected_total=await PreviewDataService.get_snapshot_total(redis, task_id),
+            processed=total_count,
+            success=success_count,
+        )
+        metrics.start()
+
+        async def push(task: CallTask) -> CallLog:
+            body = await cls.build_request_body(task, redis)
+            metrics.push_started()
+            try:
+                start = time.perf_counter()
+                is_success, error_msg = await cls.push_to_api(
+                    client, body, task.mobile_phone, breaker=engine.breaker
                 )
-            """)
-            
+                metrics.record(is_success, error_msg, time.perf_counter() - start)
+            finally:
+                metrics.push_finished()
+            return cls.build_call_log(task, is_success, error_msg)
+
+        def push_failed(task: CallTask, reason: str) -> CallLog:
+            metrics.record(False, reason)
+            return cls.build_call_log(task, False, reason)
+
+        # Step 4: 流式读取源数据，逐分片推送并回写
+        async with async_db_session() as db:
             try:
-                result = await db.execute(query)
-                rows = result.fetchall()
-                
-                # 转换为 CallTask 格式的对象
-                for row in rows:
-                    task = CallTask(
-                        mobile_phone=str(row[0]) if row[0] else "",
-                        staff_name=str(row[1]) if row[1] else "",
-                        sys_name=str(row[2]) if row[2] else "",
-                        order_type=str(row[3]) if row[3] else "",
-                        order_nums=int(row[4]) if row[4] else 0
+                result = await db.stream(query)
+                async for rows in result.partitions(settings.CALLING_STREAM_CHUNK_SIZE):
+                    # 结果按手机号排序，跳过空号及与上一条相同的号码
+                    tasks: List[CallTask] = []
+                    for row in rows:
+                        task = cls.row_to_task(row)
+                        if not task.mobile_phone or task.mobile_phone == last_mobile:
+                            continue
+                        last_mobile = task.mobile_phone
+                        tasks.append(task)
+                    if tasks and use_dedup_index:
+                        new_mobiles = set(
+                            await HistoryDedupIndex.filter_new(redis, [task.mobile_phone for task in tasks])
+                        )
+                        skipped = len(tasks) - len(new_mobiles)
+                        tasks = [task for task in tasks if task.mobile_phone in new_mobiles]
+                        if skipped:
+                            log.debug(f"去重索引过滤已外呼号码 {skipped} 个")
+                    if not tasks:
+                        continue
+
+                    call_logs: List[CallLog] = await engine.run(
+                        tasks,
+                        push,
+                        on_fail=push_failed,
+                    )
+                    success_tasks = [
+                        task for task, call_log in zip(tasks, call_logs, strict=True) if call_log.status == 1
+                    ]
+
+                    # Step 5: 回写本分片并推进检查点，回写失败时中止批次，可从上一个检查点续推
+                    await cls.write_back(run_id, call_logs, success_tasks)
+                    if success_tasks:
+                        await HistoryDedupIndex.add(redis, [task.mobile_phone for task in success_tasks])
+                        await cls.touch_history(redis)
+
+                    total_count += len(tasks)
+                    success_count += len(success_tasks)
+                    log.info(
+                        f"分片推送完成: 本片 {len(tasks)} 条, 成功 {len(success_tasks)} 条, "
+                        f"累计 {success_count}/{total_count}"
                     )
-                    tasks.append(task)
-                
-                log.info(f"从源表读取到 {len(tasks)} 条新增数据(已过滤历史记录)")
             except Exception as e:
-                log.error(f"查询源数据表失败: {e}")
+                log.error(f"外呼批次执行失败 [{run_id}] (已推送 {total_count} 条): {e}")
+                await cls.finish_run(run_id, CallBatchRun.STATUS_FAILED, str(e))
+                await metrics.stop(CallBatchRun.STATUS_FAILED)
                 return
+            except asyncio.CancelledError:
+                # 应用关闭或执行锁丢失，可从检查点续推
+                await cls.finish_run(run_id, CallBatchRun.STATUS_INTERRUPTED, "执行被取消")
+                await metrics.stop(CallBatchRun.STATUS_INTERRUPTED)
+                raise
 
-        new_tasks = tasks
-        if not new_tasks:
+        await cls.finish_run(run_id, CallBatchRun.STATUS_COMPLETED)
+        await metrics.stop(CallBatchRun.STATUS_COMPLETED)
+        if not total_count:
             log.info("没有新增记录需要推送")
             return
 
-        # Step 4: 执行推送
-        success_tasks: List[CallTask] = []
-        call_logs: List[CallLog] = []
-        
-        async with httpx.AsyncClient() as client:
-            for i, task in enumerate(new_tasks):
-                body = await cls.build_request_body(task, redis)
-                
-                is_success, error_msg = await cls.push_to_api(client, body, task.mobile_phone)
-                
-                # 记录日志对象
-                call_log = CallLog(
-                    mobile_phone=task.mobile_phone,
-                    staff_name=task.staff_name,
-                    sys_name=task.sys_name,
-                    order_type=task.order_type,
-                    order_nums=task.order_nums,
-                    status=1 if is_success else 0,
-                    error_msg=error_msg,
-                    push_time=datetime.now()
-                )
-                call_logs.append(call_log)
-
-                if is_success:
-                    success_tasks.append(task)
-                
-                # 间隔
-                if settings.CALLING_REQUEST_INTERVAL > 0 and i < len(new_tasks) - 1:
-                    await asyncio.sleep(settings.CALLING_REQUEST_INTERVAL)
-
-        # Step 5: 更新历史记录和写入日志
-        if success_tasks or call_logs:
-            async with async_db_session() as db:
-                try:
-                    # 写入流水日志
-                    if call_logs:
-                        db.add_all(call_logs)
-                    
-                    # 更新历史表 (追加成功的记录，不清空)
-                    if success_tasks:
-                        history_records = [
-                            CallHistory(
-                                mobile_phone=t.mobile_phone,
-                                staff_name=t.staff_name,
-                                sys_name=t.sys_name,
-                                order_type=t.order_type,
-                                order_nums=t.order_nums
-                            ) for t in success_tasks
-                        ]
-                        db.add_all(history_records)
-                    
-                    await db.commit()
-                    log.info(f"数据已回写: 新增日志 {len(call_logs)} 条, 更新历史 {len(success_tasks)} 条")
-                except Exception as e:
-                    await db.rollback()
-                    log.error(f"回写数据库失败: {e}")
-            
         duration = time.time() - start_time
-        log.info(f"====== 任务执行完成，耗时 {duration:.2f} 秒 (成功: {len(success_tasks)}/{len(new_tasks)}) ======")
+        log.info(f"====== 任务执行完成，耗时 {duration:.2f} 秒 (批次: {run_id}, 成功: {success_count}/{total_count}) ======")
 
 
 class CallingSchedulerService:
@@ -326,6 +679,9 @@ class CallingSchedulerService:
     
     # 任务ID前缀，避免与其他任务冲突
     JOB_PREFIX = "calling_task_"
+
+    # 本节点已注册的任务及其 Cron 表达式 {任务ID: cron_expr}，用于心跳时同步
+    _job_crons: Dict[int, str] = {}
     
     @classmethod
     def _get_job_id(cls, task_id: int) -> str:
@@ -367,6 +723,7 @@ class CallingSchedulerService:
         from app.plugin.module_application.job.tools.ap_scheduler import scheduler
         
         log.info("🔎 开始初始化外呼任务调度...")
+        CallingService.redis_instance = redis
 
         # 初始化历史记录清理任务（移动到此处，确保优先初始化）
         try:
@@ -377,28 +734,67 @@ class CallingSchedulerService:
         except Exception as e:
             log.error(f"初始化历史记录清理任务失败: {e}")
         
-        # 读取所有已启用的任务配置
+        # 注册外呼日志每日汇总与过期清理任务
+        try:
+            from .api_service import CallLogMaintenanceService
+            CallLogMaintenanceService.register_job()
+        except Exception as e:
+            log.error(f"初始化外呼日志维护任务失败: {e}")
+
+        # 进程重启前未完成的批次标记为已中断，可通过续推接口继续执行（其他节点正在执行的任务除外）
+        try:
+            running_task_ids = await CallingCluster.locked_task_ids(redis)
+            interrupted = await CallingService.mark_interrupted_runs(exclude_task_ids=running_task_ids)
+            if interrupted:
+                log.warning(f"发现 {interrupted} 个未完成的外呼批次，已标记为中断")
+        except Exception as e:
+            log.error(f"标记中断批次失败: {e}")
+
+        # 注册每个已启用的任务
+        registered_count = await cls.sync_jobs(redis)
+        log.info(f"✅ 外呼任务调度初始化完成，已注册 {registered_count} 个任务")
+
+        # 注册集群节点，心跳时同步其他节点对任务配置的增删改
+        await CallingCluster.start(redis, on_heartbeat=lambda: cls.sync_jobs(redis))
+
+    @classmethod
+    async def close_calling_scheduler(cls) -> None:
+        """注销集群节点（应用关闭时调用）"""
+        await CallingCluster.stop()
+
+    @classmethod
+    async def sync_jobs(cls, redis: Redis) -> int:
+        """
+        按数据库中的任务配置同步本节点调度任务
+
+        任务配置通过接口修改时只会更新处理请求的节点，其余节点在心跳时同步：
+        新增或 Cron 变更的任务重新注册，已禁用或删除的任务移除。
+
+        返回:
+        - int: 已注册的任务数
+        """
+        from app.plugin.module_application.job.tools.ap_scheduler import scheduler
+
         async with async_db_session() as db:
             result = await db.execute(
                 select(CallingTaskConfig).where(CallingTaskConfig.is_enabled == True)
             )
             task_configs = result.scalars().all()
-        
-        if not task_configs:
-            log.info("未发现已启用的外呼任务配置")
-            return
-        
-        # 注册每个任务
-        registered_count = 0
+
+        enabled_ids = set()
         for config in task_configs:
+            enabled_ids.add(config.id)
+            if cls._job_crons.get(config.id) == config.cron_expr and scheduler.get_job(cls._get_job_id(config.id)):
+                continue
             try:
                 cls.add_job(config, redis)
-                registered_count += 1
                 log.info(f"已注册外呼任务: {config.name} (ID: {config.id})")
             except Exception as e:
                 log.error(f"注册外呼任务失败 [{config.name}]: {e}")
-        
-        log.info(f"✅ 外呼任务调度初始化完成，已注册 {registered_count} 个任务")
+
+        for task_id in set(cls._job_crons) - enabled_ids:
+            cls.remove_job(task_id)
+        return len(cls._job_crons)
 
     
     @classmethod
@@ -433,6 +829,7 @@ class CallingSchedulerService:
                 replace_existing=True,
                 misfire_grace_time=60,
             )
+            cls._job_crons[task_config.id] = task_config.cron_expr
             
             log.info(f"外呼任务已添加到调度器: {task_config.name} ({task_config.cron_expr})")
             
@@ -445,13 +842,37 @@ class CallingSchedulerService:
         """
         任务执行包装器
         
-        被调度器调用，执行实际的外呼任务
+        被调度器调用，执行实际的外呼任务。
+        每个节点都注册了相同的调度任务，只有一致性哈希归属节点执行，并持有任务执行锁。
         """
+        if not await CallingCluster.is_owner(task_id):
+            log.debug(f"外呼任务 {task_id} 不归属本节点 ({CallingCluster.node_id})，跳过")
+            return
         log.info(f"调度器触发外呼任务执行: task_id={task_id}")
         try:
-            await CallingService.execute_task_with_config(redis, task_id)
+            await cls.run_exclusive(redis, task_id)
         except Exception as e:
             log.error(f"外呼任务执行失败 [{task_id}]: {e}")
+
+    @classmethod
+    async def run_exclusive(cls, redis: Redis, task_id: int, run_id: int | None = None) -> bool:
+        """
+        持有任务执行锁执行外呼任务（调度触发、手动执行、续推共用）
+
+        参数:
+        - redis: Redis 连接
+        - task_id: 任务配置 ID
+        - run_id: 续推的批次ID
+
+        返回:
+        - bool: 是否执行（任务正在其他节点执行时返回 False）
+        """
+        executed = await CallingCluster.run_locked(
+            redis, task_id, lambda: CallingService.execute_task_with_config(redis, task_id, run_id=run_id)
+        )
+        if not executed and run_id:
+            await CallingService.finish_run(run_id, CallBatchRun.STATUS_INTERRUPTED, "任务正在其他节点执行")
+        return executed
     
     @classmethod
     def remove_job(cls, task_id: int) -> None:
@@ -459,6 +880,7 @@ class CallingSchedulerService:
         from app.plugin.module_application.job.tools.ap_scheduler import scheduler
         
         job_id = cls._get_job_id(task_id)
+        cls._job_crons.pop(task_id, None)
         existing_job = scheduler.get_job(job_id)
         if existing_job:
             scheduler.remove_job(job_id)
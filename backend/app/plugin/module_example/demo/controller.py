@@ -63,6 +63,7 @@ async def get_obj_list_controller(
         page_size=page.page_size,
         search=search,
         order_by=page.order_by,
+        cursor=page.cursor,
     )
     log.info("查询示例列表成功")
     return SuccessResponse(data=result_dict, msg="查询示例列表成功")
@@ -108,6 +108,7 @@ class DemoCRUD(CRUDBase[DemoModel, DemoCreateSchema, DemoUpdateSchema]):
         order_by: list[dict] | None = None,
         search: dict | None = None,
         preload: list | None = None,
+        cursor: str | None = None,
     ) -> dict:
         """
         分页查询
@@ -118,6 +119,7 @@ class DemoCRUD(CRUDBase[DemoModel, DemoCreateSchema, DemoUpdateSchema]):
         - order_by (list[dict] | None): 排序参数
         - search (dict | None): 查询参数
         - preload (list | None): 预加载关系，未提供时使用模型默认项
+        - cursor (str | None): 分页游标，传入时使用游标分页
 
         返回:
         - dict: 分页数据
@@ -132,4 +134,5 @@ class DemoCRUD(CRUDBase[DemoModel, DemoCreateSchema, DemoUpdateSchema]):
             search=search_dict,
             out_schema=DemoOutSchema,
             preload=preload,
+            cursor=cursor,
         )
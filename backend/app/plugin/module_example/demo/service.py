@@ -1,7 +1,5 @@
-import io
 from typing import Any
 
-import pandas as pd
 from fastapi import UploadFile
 
 from app.api.v1.module_system.auth.schema import AuthSchema
@@ -71,6 +69,7 @@ class DemoService:
         page_size: int,
         search: DemoQueryParam | None = None,
         order_by: list[dict[str, str]] | None = None,
+        cursor: str | None = None,
     ) -> dict:
         """
         分页查询
@@ -81,6 +80,7 @@ class DemoService:
         - page_size (int): 每页数量
         - search (DemoQueryParam | None): 查询参数
         - order_by (list[dict[str, str]] | None): 排序参数
+        - cursor (str | None): 分页游标
 
         返回:
         - dict: 分页数据
@@ -94,6 +94,7 @@ class DemoService:
             limit=page_size,
             order_by=order_by_list,
             search=search_dict,
+            cursor=cursor,
         )
         return result
 
@@ -233,8 +234,7 @@ class DemoService:
 
         try:
             # 读取Excel文件
-            contents = await file.read()
-            df = pd.read_excel(io.BytesIO(contents))
+            df = await ExcelUtil.read_excel(file.file, usecols=list(header_dict.keys()))
             await file.close()
 
             if df.empty:
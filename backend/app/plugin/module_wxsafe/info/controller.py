@@ -1,12 +1,14 @@
 # -*- coding: utf-8 -*-
-from typing import Annotated
+import os
+from typing import Annotated, Literal
 from fastapi import APIRouter, Depends, UploadFile, File, Query
 from fastapi.responses import Response
+from starlette.background import BackgroundTask
 from app.api.v1.module_system.auth.schema import AuthSchema
 from app.core.dependencies import get_current_user, AuthPermission
 from app.plugin.module_wxsafe.info.service import WxSafeService
 from app.plugin.module_wxsafe.info.schema import WxSafeInfoCreate, WxSafeImportResponse, WxSafeInfoInvestigationUpdate
-from app.common.response import SuccessResponse, ResponseSchema
+from app.common.response import SuccessResponse, ResponseSchema, StreamResponse, UploadFileResponse
 
 router = APIRouter(prefix="/info", tags=["网信安涉诈信息管理"])
 
@@ -114,8 +116,8 @@ async def import_data(
     file: UploadFile = File(...),
     auth: AuthSchema = Depends(AuthPermission(["module_wxsafe:info:import"]))
 ):
-    content = await file.read()
-    result = await WxSafeService.import_wx_safe(auth, content)
+    # 直接传入上传文件对象（大文件已落盘），流式读取避免整文件读入内存
+    result = await WxSafeService.import_wx_safe(auth, file.file)
     return SuccessResponse(data=result)
 
 @router.post("/export", summary="导出涉诈信息")
@@ -124,6 +126,7 @@ async def export_data(
     phone_number: str = Query(None),
     join_location: str = Query(None),
     report_month: str = Query(None),
+    file_type: Literal["xlsx", "csv"] = Query("xlsx", description="导出格式: xlsx / csv (流式输出，适合超大数据量)"),
     auth: AuthSchema = Depends(AuthPermission(["module_wxsafe:info:export"]))
 ):
     search = {}
@@ -136,9 +139,19 @@ async def export_data(
     if report_month:
         search["report_month"] = ("like", report_month)
 
-    result = await WxSafeService.export_wx_safe(auth, search)
-    return Response(
-        content=result,
+    if file_type == "csv":
+        result = await WxSafeService.export_wx_safe_csv(auth, search)
+        return StreamResponse(
+            data=result,
+            media_type="text/csv; charset=utf-8",
+            headers={"Content-Disposition": "attachment; filename=wx_safe_data.csv"}
+        )
+
+    # 临时文件在响应发送完成后删除
+    file_path = await WxSafeService.export_wx_safe(auth, search)
+    return UploadFileResponse(
+        file_path=file_path,
+        filename="wx_safe_data.xlsx",
         media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": f"attachment; filename=wx_safe_data.xlsx"}
+        background=BackgroundTask(os.remove, file_path)
     )
\ No newline at end of file
@@ -1,10 +1,13 @@
 # -*- coding: utf-8 -*-
+import re
 import pandas as pd
-import io
 from typing import Any
-from sqlalchemy import select
+from sqlalchemy import select, insert
+from app.config.setting import settings
 from app.core.base_crud import CRUDBase
-from app.plugin.module_wxsafe.info.model import WxSafeInfo
+from app.core.validator import MOBILE_REGEX
+from app.plugin.module_wxsafe.info.model import WxSafeInfo, WxSafeDetail
+from app.plugin.module_wxsafe.info.search import WxSafeLocation
 from app.plugin.module_wxsafe.info.schema import (
     WxSafeInfoCreate, 
     WxSafeInfoUpdate, 
@@ -12,7 +15,137 @@ from app.plugin.module_wxsafe.info.schema import (
     ImportResultDetail
 )
 from app.core.exceptions import CustomException
-from pydantic import ValidationError
+from app.utils.excel_util import ExcelSource, ExcelUtil
+from pydantic import TypeAdapter, ValidationError
+
+
+# 主表字段
+MASTER_FIELDS = {
+    "clue_number", "category", "phone_number", "report_month", 
+    "incident_time", "city", "fraud_type", "victim_number",
+    "is_compliant", "has_resume_before", 
+    "is_resume_compliant", "responsibility", "is_self_or_family", 
+    "police_collab", "investigation_note", "abnormal_scene", "feedback"
+}
+# 附表字段（不含关联键 clue_number / phone_number）
+DETAIL_FIELDS = {
+    "join_date", "online_duration", "install_type", "join_location",
+    "is_local_handle", "owner_name", "cert_address", "customer_type", 
+    "other_phones", "age", "agent_name", "store_name", "staff_id", 
+    "staff_name", "concurrent_cards", "package_name", "is_fusion_package", 
+    "has_broadband", "card_type"
+}
+
+# 导入字段映射 (中文 -> 英文) - 仅保留 8 个核心字段
+IMPORT_MAPPING = {
+    "线索编号": "clue_number",
+    "涉诈或涉案": "category",
+    "业务号码": "phone_number",
+    "月份": "report_month",
+    "涉诈（涉案）时间": "incident_time",
+    "涉诈涉案地（城市）": "city",
+    "涉诈类型": "fraud_type",
+    "受害人号码": "victim_number"
+}
+
+# 导入数据批量校验器
+_import_adapter = TypeAdapter(list[WxSafeInfoCreate])
+# 手机号预校验失败的行参与批量校验时使用的占位号码
+_PHONE_PLACEHOLDER = "13800000000"
+
+
+def normalize_import_frame(df: pd.DataFrame) -> tuple[list[dict[str, Any]], dict[int, list[str]]]:
+    """
+    按列清洗导入数据
+
+    号码类字段转为字符串并去掉 Excel 数值带出的 ".0"，时间字段批量解析，
+    手机号格式按列预校验（避免单行校验异常中断整批校验）。
+
+    返回:
+    - 行数据列表（缺失值为 None）
+    - 预校验错误 {行号: [错误信息]}
+    """
+    data = df[list(IMPORT_MAPPING)].rename(columns=IMPORT_MAPPING)
+    errors: dict[int, list[str]] = {}
+
+    # 号码类字段：防止被读成浮点数
+    for col in ("clue_number", "phone_number", "victim_number"):
+        data[col] = data[col].astype("string").str.replace(r"\.0$", "", regex=True)
+    for col in ("category", "report_month", "city", "fraud_type"):
+        data[col] = data[col].astype("string")
+
+    # 时间字段：多种格式批量解析，非空但无法解析的记为错误
+    raw_time = data["incident_time"]
+    parsed_time = pd.to_datetime(raw_time, errors="coerce", format="mixed")
+    for pos in (raw_time.notna() & parsed_time.isna()).to_numpy().nonzero()[0]:
+        errors.setdefault(int(pos), []).append(f"incident_time: 无法识别的时间格式 ({raw_time.iloc[pos]})")
+    data["incident_time"] = parsed_time.astype(object).where(parsed_time.notna(), None)
+
+    # 手机号格式
+    phone = data["phone_number"]
+    bad_phone = (phone.notna() & (phone != "") & ~phone.str.match(MOBILE_REGEX).fillna(False)).fillna(False)
+    for pos in bad_phone.to_numpy().nonzero()[0]:
+        errors.setdefault(int(pos), []).append("phone_number: 手机号格式不正确")
+
+    data = data.astype(object).where(data.notna(), None)
+    records = data.to_dict("records")
+    for record in records:
+        if record["incident_time"] is not None:
+            record["incident_time"] = record["incident_time"].to_pydatetime()
+    return records, errors
+
+
+def validate_import_rows(
+    records: list[dict[str, Any]],
+    errors: dict[int, list[str]],
+) -> dict[int, WxSafeInfoCreate]:
+    """
+    批量校验行数据
+
+    一次校验全部行，按错误位置归集到行，再对无错误的行一次性生成模型（通常最多两次批量校验）。
+    预校验已失败的行同样参与校验，以便同时报告其他字段的错误：
+    格式错误的手机号以合法占位值代替（mobile_validator 抛出的异常会中断整批校验），
+    这些行不计入校验通过的行。
+
+    返回:
+    - 校验通过的行 {行号: 模型}，失败原因写入 errors
+    """
+    prechecked = set(errors)
+    rows = [
+        {**record, "phone_number": _PHONE_PLACEHOLDER}
+        if pos in prechecked and record["phone_number"] and not re.match(MOBILE_REGEX, record["phone_number"])
+        else record
+        for pos, record in enumerate(records)
+    ]
+    positions = list(range(len(rows)))
+    while positions:
+        try:
+            models = _import_adapter.validate_python([rows[pos] for pos in positions])
+            return {
+                pos: model for pos, model in zip(positions, models, strict=True) if pos not in prechecked
+            }
+        except ValidationError as ve:
+            failed = set()
+            for e in ve.errors():
+                pos = positions[e["loc"][0]]
+                failed.add(pos)
+                errors.setdefault(pos, []).append(f"{e['loc'][-1]}: {e['msg']}")
+            positions = [pos for pos in positions if pos not in failed]
+        except Exception:
+            # 自定义校验器抛出非 ValidationError 异常时无法定位到行，退回逐行校验
+            valid = {}
+            for pos in positions:
+                try:
+                    model = WxSafeInfoCreate(**rows[pos])
+                except ValidationError as ve:
+                    errors.setdefault(pos, []).extend(f"{e['loc'][-1]}: {e['msg']}" for e in ve.errors())
+                except Exception as e:
+                    errors.setdefault(pos, []).append(str(e))
+                else:
+                    if pos not in prechecked:
+                        valid[pos] = model
+            return valid
+    return {}
 
 
 class CRUDWxSafe(CRUDBase[WxSafeInfo, WxSafeInfoCreate, WxSafeInfoUpdate]):
@@ -24,27 +157,11 @@ class CRUDWxSafe(CRUDBase[WxSafeInfo, WxSafeInfoCreate, WxSafeInfoUpdate]):
         """
         重写创建方法，处理主附表
         """
-        from app.plugin.module_wxsafe.info.model import WxSafeDetail
         obj_dict = data if isinstance(data, dict) else data.model_dump()
         
         # 1. 提取字段
-        master_fields = [
-            "clue_number", "category", "phone_number", "report_month", 
-            "incident_time", "city", "fraud_type", "victim_number",
-            "is_compliant", "has_resume_before", 
-            "is_resume_compliant", "responsibility", "is_self_or_family", 
-            "police_collab", "investigation_note", "abnormal_scene", "feedback"
-        ]
-        detail_fields = [
-            "join_date", "online_duration", "install_type", "join_location",
-            "is_local_handle", "owner_name", "cert_address", "customer_type", 
-            "other_phones", "age", "agent_name", "store_name", "staff_id", 
-            "staff_name", "concurrent_cards", "package_name", "is_fusion_package", 
-            "has_broadband", "card_type"
-        ]
-        
-        master_data = {k: v for k, v in obj_dict.items() if k in master_fields}
-        detail_data = {k: v for k, v in obj_dict.items() if k in detail_fields}
+        master_data = {k: v for k, v in obj_dict.items() if k in MASTER_FIELDS}
+        detail_data = {k: v for k, v in obj_dict.items() if k in DETAIL_FIELDS}
         
         # 2. 创建主表对象
         obj = self.model(**master_data)
@@ -57,6 +174,9 @@ class CRUDWxSafe(CRUDBase[WxSafeInfo, WxSafeInfoCreate, WxSafeInfoUpdate]):
         # 3. 创建附表对象
         detail_data["clue_number"] = obj_dict["clue_number"]
         detail_data["phone_number"] = obj_dict["phone_number"]
+        detail_data["join_location_code"] = WxSafeLocation.match(
+            detail_data.get("join_location"), await WxSafeLocation.known_codes(self.auth.db)
+        )
         detail_obj = WxSafeDetail(**detail_data)
         self.auth.db.add(detail_obj)
         
@@ -64,185 +184,124 @@ class CRUDWxSafe(CRUDBase[WxSafeInfo, WxSafeInfoCreate, WxSafeInfoUpdate]):
         await self.auth.db.refresh(obj)
         return obj
     
-    async def import_data(self, file_content: bytes) -> WxSafeImportResponse:
+    async def import_data(self, file_content: ExcelSource) -> WxSafeImportResponse:
         """
-        从 Excel 导入数据 (批量优化版)
+        从 Excel 导入数据 (分批流式读取，按列批量处理)
+
+        每批 ExcelUtil.CHUNK_SIZE 行：按列清洗与解析 -> 批量校验 -> 向量化查重 -> 主附表批量写入，
+        内存占用与批大小相关而与文件大小无关。所有批次在同一事务中写入，任一批写入失败则整体回滚，
+        每行的成功/失败原因与逐行处理时一致地返回。
         """
+        chunks = ExcelUtil.aiter_excel_chunks(file_content, usecols=list(IMPORT_MAPPING))
+        results: list[ImportResultDetail] = []
+        seen_clues: set[str] = set()
+        header_checked = False
+        success_count = 0
+        write_error = None
+        audit = {}
+        if self.auth.user:
+            audit = {k: self.auth.user.id for k in ("created_id", "updated_id") if hasattr(WxSafeInfo, k)}
+
         try:
-            df = pd.read_excel(io.BytesIO(file_content))
-        except Exception as e:
-            raise CustomException(msg=f"Excel 文件解析失败: {e!s}")
-
-        # 字段映射 (中文 -> 英文) - 仅保留 8 个核心字段
-        mapping = {
-            "线索编号": "clue_number",
-            "涉诈或涉案": "category",
-            "业务号码": "phone_number",
-            "月份": "report_month",
-            "涉诈（涉案）时间": "incident_time",
-            "涉诈涉案地（城市）": "city",
-            "涉诈类型": "fraud_type",
-            "受害人号码": "victim_number"
-        }
-
-        # 检查必要列
-        must_cols = ["线索编号", "业务号码"]
-        missing_cols = [col for col in mapping.keys() if col not in df.columns]
-        if missing_cols:
-            raise CustomException(msg=f"导入失败，缺少必要列: {', '.join(missing_cols)}")
+            while True:
+                try:
+                    df = await anext(chunks, None)
+                except Exception as e:
+                    raise CustomException(msg=f"Excel 文件解析失败: {e!s}")
+                if df is None:
+                    break
 
-        results: list[ImportResultDetail] = []
-        valid_masters = []
-        valid_details = []
-        
-        # 1. 预处理：获取所有 Excel 中的线索编号，用于批量查重
-        xls_clue_numbers = []
-        if "线索编号" in df.columns:
-             # 转为字符串并去重，防止 Excel 内部重复导致查询条件冗余（虽然 in 查询不在乎）
-             xls_clue_numbers = df["线索编号"].dropna().astype(str).unique().tolist()
-        
-        # 批量查询数据库中已存在的线索编号
-        existing_clue_set = set()
-        if xls_clue_numbers:
-            # 分批查询防止参数过多 (按 1000 条分批)
-            batch_size = 1000
-            for i in range(0, len(xls_clue_numbers), batch_size):
-                batch = xls_clue_numbers[i:i + batch_size]
-                stmt = select(WxSafeInfo.clue_number).where(WxSafeInfo.clue_number.in_(batch))
-                db_res = await self.auth.db.execute(stmt)
-                existing_clue_set.update(db_res.scalars().all())
-
-        from app.plugin.module_wxsafe.info.model import WxSafeDetail
-
-        for _, row in df.iterrows():
-            # 提取数据并清洗 (处理 NaN)
-            item_data = {}
-            for cn_name, en_name in mapping.items():
-                val = row[cn_name]
-                if pd.isna(val):
-                    item_data[en_name] = None
-                else:
-                    # 特殊处理业务号码和受害人号码，防止被读成浮点数
-                    if en_name in ["phone_number", "victim_number", "clue_number"]:
-                        val_str = str(val)
-                        if val_str.endswith('.0'):
-                             val_str = val_str[:-2]
-                        item_data[en_name] = val_str
-                    # 处理时间字段
-                    elif en_name == "incident_time":
-                        if isinstance(val, pd.Timestamp):
-                            item_data[en_name] = val.to_pydatetime()
-                        elif isinstance(val, str):
-                            try:
-                                # 尝试多种格式解析
-                                from dateutil import parser
-                                item_data[en_name] = parser.parse(val)
-                            except:
-                                item_data[en_name] = val # 让 Pydantic 报错
-                        else:
-                            item_data[en_name] = val
-                    # 强制转换月份为字符串
-                    elif en_name == "report_month":
-                        item_data[en_name] = str(val) if val is not None else None
-                    else:
-                        item_data[en_name] = val
-
-            clue_num = str(item_data.get("clue_number", "未知"))
-            
-            try:
-                # 2. 验证数据格式 (利用 Pydantic Schema)
-                schema_data = WxSafeInfoCreate(**item_data)
-                
-                # 3. 查重 (数据库已存在 或 Excel 前序行已出现)
-                if schema_data.clue_number in existing_clue_set:
+                # 检查必要列 (首批即可确定表头)
+                if not header_checked:
+                    header_checked = True
+                    missing_cols = [col for col in IMPORT_MAPPING.keys() if col not in df.columns]
+                    if missing_cols:
+                        raise CustomException(msg=f"导入失败，缺少必要列: {', '.join(missing_cols)}")
+                if df.empty:
+                    continue
+
+                # 1. 按列清洗并批量校验
+                records, errors = normalize_import_frame(df)
+                valid = validate_import_rows(records, errors)
+
+                # 2. 查重 (数据库已存在 或 Excel 前序行已出现)，仅校验通过的行参与
+                valid_positions = sorted(valid)
+                clues = pd.Series([valid[pos].clue_number for pos in valid_positions], index=valid_positions, dtype=object)
+                unique_clues = [clue for clue in clues.unique().tolist() if clue not in seen_clues]
+                db_hits: set[str] = set()
+                # 分批查询防止参数过多 (按 1000 条分批)
+                batch_size = 1000
+                for i in range(0, len(unique_clues), batch_size):
+                    batch = unique_clues[i:i + batch_size]
+                    stmt = select(WxSafeInfo.clue_number).where(WxSafeInfo.clue_number.in_(batch))
+                    db_res = await self.auth.db.execute(stmt)
+                    db_hits.update(db_res.scalars().all())
+                duplicated = clues.duplicated(keep="first") | clues.isin(seen_clues) | clues.isin(db_hits)
+                duplicate_positions = set(clues.index[duplicated])
+                seen_clues.update(unique_clues)
+
+                # 3. 按行汇总结果，构建主附表写入数据
+                master_rows: list[dict[str, Any]] = []
+                detail_rows: list[dict[str, Any]] = []
+                for pos, record in enumerate(records):
+                    clue_num = str(record["clue_number"]) if record["clue_number"] is not None else "未知"
+                    if pos in errors:
+                        results.append(ImportResultDetail(
+                            clue_number=clue_num,
+                            status="失败",
+                            reason=f"格式校验失败: {'; '.join(errors[pos])}"
+                        ))
+                        continue
+                    if pos in duplicate_positions:
+                        results.append(ImportResultDetail(
+                            clue_number=clue_num,
+                            status="失败",
+                            reason="线索编号已存在或重复"
+                        ))
+                        continue
+                    if write_error:
+                        results.append(ImportResultDetail(clue_number=clue_num, status="失败", reason=write_error))
+                        continue
+
+                    obj_dict = valid[pos].model_dump()
+                    master_rows.append({**{k: obj_dict[k] for k in MASTER_FIELDS}, **audit})
+                    detail_rows.append({
+                        **{k: obj_dict[k] for k in DETAIL_FIELDS},
+                        "clue_number": obj_dict["clue_number"],
+                        "phone_number": obj_dict["phone_number"],
+                    })
                     results.append(ImportResultDetail(
                         clue_number=clue_num,
-                        status="失败",
-                        reason="线索编号已存在或重复"
+                        status="成功"
                     ))
-                    continue
-                
-                # 标记为已存在，防止 Excel 内部后续重复
-                existing_clue_set.add(schema_data.clue_number)
-                
-                # 4. 构建对象 (不入库)
-                obj_dict = schema_data.model_dump()
-                
-                master_fields = [
-                    "clue_number", "category", "phone_number", "report_month", 
-                    "incident_time", "city", "fraud_type", "victim_number",
-                    "is_compliant", "has_resume_before", 
-                    "is_resume_compliant", "responsibility", "is_self_or_family", 
-                    "police_collab", "investigation_note", "abnormal_scene", "feedback"
-                ]
-                detail_fields = [
-                    "join_date", "online_duration", "install_type", "join_location",
-                    "is_local_handle", "owner_name", "cert_address", "customer_type", 
-                    "other_phones", "age", "agent_name", "store_name", "staff_id", 
-                    "staff_name", "concurrent_cards", "package_name", "is_fusion_package", 
-                    "has_broadband", "card_type"
-                ]
-                
-                master_data = {k: v for k, v in obj_dict.items() if k in master_fields}
-                detail_data = {k: v for k, v in obj_dict.items() if k in detail_fields}
-                
-                # 补全关联键
-                detail_data["clue_number"] = obj_dict["clue_number"]
-                detail_data["phone_number"] = obj_dict["phone_number"]
-                
-                # 实例化 Master
-                master_obj = WxSafeInfo(**master_data)
-                if self.auth.user:
-                    if hasattr(master_obj, "created_id"): setattr(master_obj, "created_id", self.auth.user.id)
-                    if hasattr(master_obj, "updated_id"): setattr(master_obj, "updated_id", self.auth.user.id)
-                
-                # 实例化 Detail
-                detail_obj = WxSafeDetail(**detail_data)
-
-                valid_masters.append(master_obj)
-                valid_details.append(detail_obj)
-
-                results.append(ImportResultDetail(
-                    clue_number=clue_num,
-                    status="成功"
-                ))
-            except ValidationError as ve:
-                errors = ve.errors()
-                error_msg = "; ".join([f"{e['loc'][-1]}: {e['msg']}" for e in errors])
-                results.append(ImportResultDetail(
-                    clue_number=clue_num,
-                    status="失败",
-                    reason=f"格式校验失败: {error_msg}"
-                ))
-            except Exception as e:
-                results.append(ImportResultDetail(
-                    clue_number=clue_num,
-                    status="失败",
-                    reason=f"系统错误: {e!s}"
-                ))
-
-        # 5. 批量执行插入
-        success_count = 0
-        if valid_masters:
-            try:
-                self.auth.db.add_all(valid_masters)
-                self.auth.db.add_all(valid_details)
-                await self.auth.db.flush()
-                success_count = len(valid_masters)
-            except Exception as e:
-                # 批量插入失败，回滚并更新状态
-                # 注意：这里可能需要更精细的错误处理，但通常预查重后极少失败
-                await self.auth.db.rollback()
-                success_count = 0
-                error_msg = f"数据库写入异常: {e!s}"
-                for res in results:
-                    if res.status == "成功":
-                        res.status = "失败"
-                        res.reason = error_msg
+
+                # 4. 主附表按批写入 (executemany，按批生成多行 INSERT)
+                if master_rows:
+                    try:
+                        await self.auth.db.execute(insert(WxSafeInfo), master_rows)
+                        await self.auth.db.execute(insert(WxSafeDetail), detail_rows)
+                        success_count += len(master_rows)
+                    except Exception as e:
+                        # 批量插入失败，整体回滚并更新状态，后续批次只校验不写入
+                        # 注意：这里可能需要更精细的错误处理，但通常预查重后极少失败
+                        await self.auth.db.rollback()
+                        success_count = 0
+                        write_error = f"数据库写入异常: {e!s}"
+                        for res in results:
+                            if res.status == "成功":
+                                res.status = "失败"
+                                res.reason = write_error
+        finally:
+            await chunks.aclose()
+
+        # 导入不含入网属地（由外部程序写入附表），顺带修正外部写入后为空或过期的属地编码
+        # (PostgreSQL 由触发器维护，无需修正)
+        if success_count and settings.DATABASE_TYPE != "postgres":
+            await WxSafeLocation.backfill(self.auth.db)
 
         return WxSafeImportResponse(
-            total=len(df),
+            total=len(results),
             success_count=success_count,
-            fail_count=len(df) - success_count,
+            fail_count=len(results) - success_count,
             details=results
         )
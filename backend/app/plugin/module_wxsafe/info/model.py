@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 from datetime import datetime
-from sqlalchemy import String, Integer, Text, DateTime, ForeignKey, BigInteger, JSON
+from sqlalchemy import DDL, String, Integer, Text, DateTime, ForeignKey, BigInteger, JSON, Index, event
 from sqlalchemy.orm import Mapped, mapped_column, declared_attr, relationship
 
 from app.core.base_model import MappedBase
@@ -23,6 +23,18 @@ class WxSafeInfo(WxSafeBase):
     网信安涉诈信息表 (主表 - 线索与核查)
     """
     __tablename__ = "wxsafe_fz_master"
+    __table_args__ = (
+        # 线索编号、业务号码模糊检索 (LIKE '%x%')：PostgreSQL 使用 pg_trgm GIN 索引，其他数据库不创建
+        Index(
+            "ix_wxsafe_fz_master_clue_trgm", "clue_number",
+            postgresql_using="gin", postgresql_ops={"clue_number": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_wxsafe_fz_master_phone_trgm", "phone_number",
+            postgresql_using="gin", postgresql_ops={"phone_number": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        {"schema": settings.WXSAFE_SCHEMA},
+    )
 
     # 1-8 核心字段
     clue_number: Mapped[str] = mapped_column(String(100), primary_key=True, comment="线索编号")
@@ -65,9 +77,14 @@ class WxSafeLog(WxSafeBase):
     网信安涉诈信息操作日志表
     """
     __tablename__ = "wxsafe_fz_log"
+    __table_args__ = (
+        # 按线索取最新一条操作记录（列表最新操作人、操作日志倒序），同时覆盖按线索编号查询
+        Index("ix_wxsafe_fz_log_clue_created_time", "clue_number", "created_time"),
+        {"schema": settings.WXSAFE_SCHEMA},
+    )
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
-    clue_number: Mapped[str] = mapped_column(String(100), index=True, nullable=False, comment="关联线索编号")
+    clue_number: Mapped[str] = mapped_column(String(100), nullable=False, comment="关联线索编号")
     operator_id: Mapped[str | None] = mapped_column(String(50), nullable=True, comment="操作人ID")
     operator_name: Mapped[str | None] = mapped_column(String(100), nullable=True, comment="操作人姓名")
     action_type: Mapped[str] = mapped_column(String(20), default="UPDATE", comment="操作类型")
@@ -82,6 +99,14 @@ class WxSafeDetail(WxSafeBase):
     网信安涉诈详情表 (附表 - 业务画像，由外部程序更新)
     """
     __tablename__ = "wxsafe_fz_detail"
+    __table_args__ = (
+        # 入网属地模糊检索及未规范化属地的前缀匹配
+        Index(
+            "ix_wxsafe_fz_detail_location_trgm", "join_location",
+            postgresql_using="gin", postgresql_ops={"join_location": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        {"schema": settings.WXSAFE_SCHEMA},
+    )
 
     clue_number: Mapped[str] = mapped_column(
         String(100), 
@@ -96,6 +121,9 @@ class WxSafeDetail(WxSafeBase):
     online_duration: Mapped[int | None] = mapped_column(Integer, nullable=True, comment="在网时长（月）")
     install_type: Mapped[str | None] = mapped_column(String(50), nullable=True, comment="新装或存量")
     join_location: Mapped[str | None] = mapped_column(String(100), nullable=True, comment="入网属地")
+    join_location_code: Mapped[str | None] = mapped_column(
+        String(64), index=True, nullable=True, comment="入网属地编码 (规范化属地名，用于属地隔离等值查询)"
+    )
     is_local_handle: Mapped[str | None] = mapped_column(String(50), nullable=True, comment="属地或非属地办理")
     owner_name: Mapped[str | None] = mapped_column(String(100), nullable=True, comment="机主名称")
     cert_address: Mapped[str | None] = mapped_column(String(255), nullable=True, comment="证件地址")
@@ -117,4 +145,78 @@ class WxSafeDetail(WxSafeBase):
     )
 
     # 反向关联
-    master: Mapped["WxSafeInfo"] = relationship(back_populates="detail")
\ No newline at end of file
+    master: Mapped["WxSafeInfo"] = relationship(back_populates="detail")
+
+
+# 入网属地编码触发器 (仅 PostgreSQL)：
+# - 附表写入入网属地时 (含外部程序直接写入) 计算编码
+# - 部门新增、删除、改名时重新计算入网属地以新旧编码开头的行
+# 编码规则与 WxSafeLocation.dept_code / match 一致：去掉 "分公司"、"市" 的部门名中与入网属地前缀匹配的最长者。
+# 建表 (create_all) 后创建，已有库由迁移 f4c1e9a7b358 创建。
+_WXSAFE = f'"{settings.WXSAFE_SCHEMA}"'
+_SYS = f'"{settings.DATABASE_SCHEMA}"'
+LOCATION_CODE_DDL = [
+    f"""
+    CREATE OR REPLACE FUNCTION {_WXSAFE}.wxsafe_location_code(location text) RETURNS varchar
+    LANGUAGE sql STABLE AS $$
+        SELECT c.code
+        FROM (SELECT DISTINCT trim(replace(replace(name, '分公司', ''), '市', '')) AS code FROM {_SYS}.sys_dept) c
+        WHERE c.code <> '' AND left(trim(location), length(c.code)) = c.code
+        ORDER BY length(c.code) DESC
+        LIMIT 1
+    $$
+    """,
+    f"""
+    CREATE OR REPLACE FUNCTION {_WXSAFE}.wxsafe_fz_detail_location_code() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        NEW.join_location_code := {_WXSAFE}.wxsafe_location_code(NEW.join_location);
+        RETURN NEW;
+    END
+    $$
+    """,
+    f"DROP TRIGGER IF EXISTS trg_wxsafe_fz_detail_location_code ON {_WXSAFE}.wxsafe_fz_detail",
+    f"""
+    CREATE TRIGGER trg_wxsafe_fz_detail_location_code
+    BEFORE INSERT OR UPDATE OF join_location ON {_WXSAFE}.wxsafe_fz_detail
+    FOR EACH ROW EXECUTE PROCEDURE {_WXSAFE}.wxsafe_fz_detail_location_code()
+    """,
+    f"""
+    CREATE OR REPLACE FUNCTION {_WXSAFE}.wxsafe_refresh_location_codes() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    DECLARE
+        codes text[] := '{{}}';
+        code text;
+    BEGIN
+        IF TG_OP = 'UPDATE' AND OLD.name IS NOT DISTINCT FROM NEW.name THEN
+            RETURN NULL;
+        END IF;
+        IF TG_OP <> 'INSERT' THEN
+            codes := array_append(codes, trim(replace(replace(OLD.name, '分公司', ''), '市', '')));
+        END IF;
+        IF TG_OP <> 'DELETE' THEN
+            codes := array_append(codes, trim(replace(replace(NEW.name, '分公司', ''), '市', '')));
+        END IF;
+        -- 只有入网属地以新旧编码开头的行可能受影响：LIKE 走 join_location 的 trgm 索引，
+        -- left() 精确比较 (编码含 LIKE 通配符时 LIKE 只作预筛选)
+        FOR code IN SELECT DISTINCT c FROM unnest(codes) AS c WHERE c <> '' LOOP
+            UPDATE {_WXSAFE}.wxsafe_fz_detail
+            SET join_location_code = {_WXSAFE}.wxsafe_location_code(join_location)
+            WHERE join_location LIKE code || '%%'
+              AND left(join_location, length(code)) = code
+              AND join_location_code IS DISTINCT FROM {_WXSAFE}.wxsafe_location_code(join_location);
+        END LOOP;
+        RETURN NULL;
+    END
+    $$
+    """,
+    f"DROP TRIGGER IF EXISTS trg_sys_dept_wxsafe_location_code ON {_SYS}.sys_dept",
+    f"""
+    CREATE TRIGGER trg_sys_dept_wxsafe_location_code
+    AFTER INSERT OR DELETE OR UPDATE OF name ON {_SYS}.sys_dept
+    FOR EACH ROW EXECUTE PROCEDURE {_WXSAFE}.wxsafe_refresh_location_codes()
+    """,
+]
+for _statement in LOCATION_CODE_DDL:
+    # sys_dept 与附表无外键依赖，建表顺序不确定，因此在全部表创建后执行
+    event.listen(MappedBase.metadata, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""网信安检索：模糊检索条件、部门属地编码映射（属地隔离）"""
+import time
+from functools import lru_cache
+from typing import List
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.api.v1.module_system.dept.model import DeptModel
+from app.config.setting import settings
+from app.core.logger import log
+from app.plugin.module_wxsafe.info.model import WxSafeDetail
+
+
+def escape_like(value: str) -> str:
+    """转义 LIKE 通配符，用户输入的 % _ 按字面匹配"""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def contains_filter(column, value: str) -> ColumnElement[bool]:
+    """
+    模糊检索条件 (LIKE '%x%')
+
+    PostgreSQL 下由 pg_trgm GIN 索引支持（检索词不少于 3 个字符时走索引）；
+    MySQL / SQLite 未创建三元组索引，仍为扫描，语义一致。
+    """
+    return column.like(f"%{escape_like(value.strip())}%", escape="\\")
+
+
+class WxSafeLocation:
+    """
+    部门 -> 入网属地编码
+
+    属地编码为去掉 "分公司"、"市" 后的部门名（如 "南宁市分公司" -> "南宁"），
+    线索的 join_location_code 为与入网属地前缀匹配的最长部门属地编码，
+    属地隔离由 join_location LIKE '<部门>%' 改为编码等值查询。
+    PostgreSQL 下编码由触发器维护（附表写入入网属地、部门增删改名时重新计算，见 model.py），
+    其他数据库由 create 写入、backfill 修正；编码为空的行仍按属地前缀匹配，隔离结果不变。
+    """
+
+    _codes: List[str] | None = None
+    _loaded_at: float = 0.0
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def dept_code(dept_name: str) -> str:
+        """部门名称对应的属地编码"""
+        return dept_name.replace("分公司", "").replace("市", "").strip()
+
+    @classmethod
+    async def known_codes(cls, db: AsyncSession, refresh: bool = False) -> List[str]:
+        """
+        全部部门属地编码（按长度倒序，便于最长前缀匹配）
+
+        进程内缓存 WXSAFE_LOCATION_CACHE_TTL 秒，refresh 为 True 时重新读取。
+        """
+        if (
+            refresh
+            or cls._codes is None
+            or time.monotonic() - cls._loaded_at > settings.WXSAFE_LOCATION_CACHE_TTL
+        ):
+            result = await db.execute(select(DeptModel.name).distinct())
+            codes = {cls.dept_code(name) for name in result.scalars().all() if name}
+            cls._codes = sorted((code for code in codes if code), key=len, reverse=True)
+            cls._loaded_at = time.monotonic()
+        return cls._codes
+
+    @classmethod
+    def match(cls, join_location: str | None, codes: List[str]) -> str | None:
+        """入网属地对应的属地编码，无匹配部门时为空"""
+        if not join_location:
+            return None
+        join_location = join_location.strip()
+        return next((code for code in codes if join_location.startswith(code)), None)
+
+    @classmethod
+    def isolation_filter(cls, dept_name: str) -> ColumnElement[bool]:
+        """属地隔离条件（需已关联附表）"""
+        code = cls.dept_code(dept_name)
+        return or_(
+            WxSafeDetail.join_location_code == code,
+            and_(
+                WxSafeDetail.join_location_code.is_(None),
+                WxSafeDetail.join_location.like(f"{escape_like(code)}%", escape="\\"),
+            ),
+        )
+
+    @classmethod
+    def in_location(cls, dept_name: str, detail: WxSafeDetail | None) -> bool:
+        """单条线索是否属于部门属地，与 isolation_filter 判定一致"""
+        if detail is None:
+            return False
+        code = cls.dept_code(dept_name)
+        if detail.join_location_code is not None:
+            return detail.join_location_code == code
+        return bool(detail.join_location) and detail.join_location.startswith(code)
+
+    @classmethod
+    async def backfill(cls, db: AsyncSession) -> int:
+        """
+        修正附表属地编码：补全为空的编码，并修正入网属地或部门变更后过期的编码
+
+        先清空已不匹配的编码（部门已删除或改名、入网属地已变更），
+        再按编码逐个更新：前缀匹配该编码、且不匹配更长编码的行，编码不等时更新。
+
+        返回:
+        - int: 更新行数
+        """
+        codes = await cls.known_codes(db, refresh=True)
+        # 保持详情更新时间不变（编码修正不是业务数据变更）
+        keep_time = {"updated_time": WxSafeDetail.updated_time}
+
+        stale = [
+            WxSafeDetail.join_location.is_(None),
+            ~WxSafeDetail.join_location.startswith(WxSafeDetail.join_location_code),
+        ]
+        if codes:
+            stale.append(WxSafeDetail.join_location_code.not_in(codes))
+        result = await db.execute(
+            update(WxSafeDetail)
+            .where(WxSafeDetail.join_location_code.is_not(None), or_(*stale))
+            .values(join_location_code=None, **keep_time)
+            .execution_options(synchronize_session=False)
+        )
+        total = result.rowcount or 0
+
+        for code in codes:
+            longer = [other for other in codes if len(other) > len(code) and other.startswith(code)]
+            result = await db.execute(
+                update(WxSafeDetail)
+                .where(
+                    WxSafeDetail.join_location.like(f"{escape_like(code)}%", escape="\\"),
+                    *(
+                        ~WxSafeDetail.join_location.like(f"{escape_like(other)}%", escape="\\")
+                        for other in longer
+                    ),
+                    or_(WxSafeDetail.join_location_code.is_(None), WxSafeDetail.join_location_code != code),
+                )
+                .values(join_location_code=code, **keep_time)
+                .execution_options(synchronize_session=False)
+            )
+            total += result.rowcount or 0
+        if total:
+            log.info(f"网信安入网属地编码已修正: {total} 行")
+        return total
@@ -1,12 +1,60 @@
 # -*- coding: utf-8 -*-
 from datetime import datetime
 import calendar
-from sqlalchemy import select, func
+from collections.abc import AsyncIterator
+import anyio
+from sqlalchemy import Select, select, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
-from app.plugin.module_wxsafe.info.crud import CRUDWxSafe
-from app.plugin.module_wxsafe.info.model import WxSafeInfo, WxSafeDetail
+from app.config.setting import settings
+from app.core.database import async_db_session
+from app.plugin.module_wxsafe.info.crud import CRUDWxSafe, DETAIL_FIELDS
+from app.plugin.module_wxsafe.info.model import WxSafeInfo, WxSafeDetail, WxSafeLog
 from app.api.v1.module_system.auth.schema import AuthSchema
 from app.plugin.module_wxsafe.info.schema import WxSafeInfoInDB, WxSafeLogOut
+from app.plugin.module_wxsafe.info.search import WxSafeLocation, contains_filter
+from app.utils.excel_util import ExcelSource, ExcelUtil
+
+
+# 导出字段映射 (英文 -> 中文)
+EXPORT_MAPPING = {
+    "clue_number": "线索编号",
+    "category": "涉诈或涉案",
+    "phone_number": "业务号码",
+    "report_month": "月份",
+    "incident_time": "涉诈（涉案）时间",
+    "city": "涉诈涉案地（城市）",
+    "fraud_type": "涉诈类型",
+    "victim_number": "受害人号码",
+    "join_date": "入网时间",
+    "online_duration": "在网时长（月）",
+    "install_type": "新装或存量",
+    "join_location": "入网属地",
+    "is_local_handle": "属地或非属地办理",
+    "owner_name": "机主名称",
+    "cert_address": "证件地址",
+    "customer_type": "政企或个人",
+    "other_phones": "名下手机号码",
+    "age": "年龄",
+    "agent_name": "代理商",
+    "store_name": "受理厅店",
+    "staff_id": "受理人工号",
+    "staff_name": "受理人",
+    "concurrent_cards": "与涉诈号码同时办理的卡号",
+    "package_name": "所办理套餐",
+    "is_fusion_package": "是否融合套餐",
+    "has_broadband": "是否有宽带业务",
+    "card_type": "主卡或副卡",
+    "is_compliant": "是否合规受理",
+    "has_resume_before": "涉诈涉案前是否有复通",
+    "is_resume_compliant": "复通是否规范",
+    "responsibility": "责任认定",
+    "is_self_or_family": "是否本人或亲属涉诈涉案",
+    "police_collab": "警企协同情况",
+    "investigation_note": "调查户主备注",
+    "abnormal_scene": "异常场景识别",
+    "feedback": "核查情况反馈"
+}
 
 
 class WxSafeService:
@@ -36,14 +84,15 @@ class WxSafeService:
         return diff
 
     @classmethod
-    async def _record_audit_log(cls, auth: AuthSchema, clue_number: str, diff: dict, action: str = "UPDATE"):
+    async def _record_audit_log(
+        cls, auth: AuthSchema, clue_number: str, diff: dict, action: str = "UPDATE", db: AsyncSession | None = None
+    ):
         """
-        保存审计日志
+        保存审计日志 (默认写入请求会话，可指定独立会话)
         """
         if not diff:
             return
             
-        from app.plugin.module_wxsafe.info.model import WxSafeLog
         log_obj = WxSafeLog(
             clue_number=clue_number,
             operator_id=str(auth.user.id) if auth.user else None,
@@ -51,12 +100,17 @@ class WxSafeService:
             action_type=action,
             change_diff=diff
         )
-        auth.db.add(log_obj)
+        (db or auth.db).add(log_obj)
 
     @classmethod
-    async def get_wx_safe_list(cls, auth: AuthSchema, offset: int, limit: int, search: dict):
+    def _apply_filters(cls, auth: AuthSchema, query: Select, search: dict, detail_joined: bool = False) -> Select:
         """
-        分页查询 (支持跨表属地隔离)
+        应用属地隔离与检索条件 (列表与导出共用)
+
+        参数:
+        - query: 基础查询
+        - search: 检索条件 (处理过的条件会被 pop)
+        - detail_joined: 基础查询是否已关联附表
         """
         # 获取用户权限集合
         user_permissions = {
@@ -66,17 +120,16 @@ class WxSafeService:
             if role.status == "0" and menu.permission and menu.status == "0"
         }
 
-        # 1. 基础查询对象 (预加载附表画像)
-        query = select(WxSafeInfo).options(joinedload(WxSafeInfo.detail))
-
-        # 2. 跨表数据隔离逻辑
+        # 1. 跨表数据隔离逻辑
         # 如果不是超级管理员，且没有全量管理权限，则必须关联附表按属地过滤
         is_admin = auth.user.is_superuser or "module_wxsafe:info:query" in user_permissions
         if not is_admin and auth.user.dept:
-            clean_dept_name = auth.user.dept.name.replace("分公司", "").replace("市", "")
-            query = query.join(WxSafeInfo.detail).where(WxSafeDetail.join_location.like(f"{clean_dept_name}%"))
+            if not detail_joined:
+                query = query.join(WxSafeInfo.detail)
+                detail_joined = True
+            query = query.where(WxSafeLocation.isolation_filter(auth.user.dept.name))
 
-        # 3. 处理业务过滤条件
+        # 2. 处理业务过滤条件
         # 月份查询转时间范围 (支持单月字符串、区间列表或逗号分隔字符串)
         if "report_month" in search:
             _, val = search.pop("report_month")
@@ -113,41 +166,53 @@ class WxSafeService:
                 query = query.where(WxSafeInfo.is_compliant.isnot(None))
 
         # 其他基础字段搜索 (线索编号、手机号、入网属地等)
+        # (PostgreSQL 下由 pg_trgm 索引支持)
         if "clue_number" in search:
-            query = query.where(WxSafeInfo.clue_number.like(f"%{search.pop('clue_number')[1]}%"))
+            query = query.where(contains_filter(WxSafeInfo.clue_number, search.pop("clue_number")[1]))
         if "phone_number" in search:
-            query = query.where(WxSafeInfo.phone_number.like(f"%{search.pop('phone_number')[1]}%"))
+            query = query.where(contains_filter(WxSafeInfo.phone_number, search.pop("phone_number")[1]))
         if "join_location" in search:
             # 入网属地现在在附表
-            if not is_admin: # 如果已经是 join 状态了
-                query = query.where(WxSafeDetail.join_location.like(f"%{search.pop('join_location')[1]}%"))
-            else:
-                query = query.join(WxSafeInfo.detail).where(WxSafeDetail.join_location.like(f"%{search.pop('join_location')[1]}%"))
+            if not detail_joined:
+                query = query.join(WxSafeInfo.detail)
+            query = query.where(contains_filter(WxSafeDetail.join_location, search.pop("join_location")[1]))
+
+        return query
+
+    @classmethod
+    async def get_wx_safe_list(cls, auth: AuthSchema, offset: int, limit: int, search: dict):
+        """
+        分页查询 (支持跨表属地隔离)
+        """
+        # 基础查询对象 (预加载附表画像)
+        query = select(WxSafeInfo).options(joinedload(WxSafeInfo.detail))
+        query = cls._apply_filters(auth, query, search)
 
-        # 4. 执行计数与分页
+        # 执行计数与分页
         count_query = select(func.count()).select_from(query.subquery())
         total_res = await auth.db.execute(count_query)
         total = total_res.scalar() or 0
         
+        # 最新操作人：关联子查询随主查询一并返回，按 (clue_number, created_time) 索引每行只取一条
+        latest_operator = (
+            select(WxSafeLog.operator_name)
+            .where(WxSafeLog.clue_number == WxSafeInfo.clue_number)
+            .order_by(WxSafeLog.created_time.desc())
+            .limit(1)
+            .correlate(WxSafeInfo)
+            .scalar_subquery()
+            .label("latest_operator")
+        )
         result = await auth.db.execute(
-            query.order_by(WxSafeInfo.created_time.desc()).offset(offset).limit(limit)
+            query.add_columns(latest_operator)
+            .order_by(WxSafeInfo.created_time.desc()).offset(offset).limit(limit)
         )
-        objs = result.scalars().all()
 
         items = []
-        for obj in objs:
+        for obj, operator_name in result.all():
             data = WxSafeInfoInDB.model_validate(obj).model_dump()
-            # 如果是已核查记录，额外查一下最新的操作人
-            # (注：为了性能，在大数据量下建议使用 SQL JOIN 或窗口函数，这里在 10-20 条的分页规模下采用简单查询)
-            if obj.is_compliant:
-                from app.plugin.module_wxsafe.info.model import WxSafeLog
-                log_stmt = select(WxSafeLog.operator_name).where(
-                    WxSafeLog.clue_number == obj.clue_number
-                ).order_by(WxSafeLog.created_time.desc()).limit(1)
-                log_res = await auth.db.execute(log_stmt)
-                data["latest_operator"] = log_res.scalar() or "-"
-            else:
-                data["latest_operator"] = "-"
+            # 仅已核查记录展示最新操作人
+            data["latest_operator"] = (operator_name if obj.is_compliant else None) or "-"
             items.append(data)
 
         return {
@@ -175,8 +240,9 @@ class WxSafeService:
         
         if not auth.user.is_superuser and "module_wxsafe:info:query" not in user_permissions:
             if auth.user.dept:
-                clean_dept_name = auth.user.dept.name.replace("分公司", "").replace("市", "")
-                base_query = base_query.join(WxSafeInfo.detail).where(WxSafeDetail.join_location.like(f"{clean_dept_name}%"))
+                base_query = base_query.join(WxSafeInfo.detail).where(
+                    WxSafeLocation.isolation_filter(auth.user.dept.name)
+                )
 
         # 计算待核查
         pending_sql = base_query.where(WxSafeInfo.is_compliant.is_(None))
@@ -215,11 +281,10 @@ class WxSafeService:
         if not existing:
             raise CustomException(msg=f"线索编号 {clue_number} 不存在")
         
-        # 权限检查：非超管必须校验属地 (此时 join_location 在附表)
+        # 权限检查：非超管必须校验属地 (此时 join_location 在附表)，判定与列表的属地隔离条件一致
         if not auth.user.is_superuser and auth.user.dept:
-            clean_dept_name = auth.user.dept.name.replace("分公司", "").replace("市", "")
-            if not existing.detail or not existing.detail.join_location or clean_dept_name not in existing.detail.join_location:
-                 raise CustomException(msg=f"无权操作非本属地的数据")
+            if not WxSafeLocation.in_location(auth.user.dept.name, existing.detail):
+                raise CustomException(msg="无权操作非本属地的数据")
         
         # 1. 计算差异
         obj_dict = data if isinstance(data, dict) else data.model_dump(exclude_unset=True)
@@ -241,7 +306,6 @@ class WxSafeService:
         """
         获取操作日志列表
         """
-        from app.plugin.module_wxsafe.info.model import WxSafeLog
         stmt = select(WxSafeLog).where(WxSafeLog.clue_number == clue_number).order_by(WxSafeLog.created_time.desc())
         result = await auth.db.execute(stmt)
         objs = result.scalars().all()
@@ -252,14 +316,13 @@ class WxSafeService:
         """
         获取导出操作日志
         """
-        from app.plugin.module_wxsafe.info.model import WxSafeLog
         stmt = select(WxSafeLog).where(WxSafeLog.action_type == "EXPORT").order_by(WxSafeLog.created_time.desc())
         result = await auth.db.execute(stmt)
         objs = result.scalars().all()
         return [WxSafeLogOut.model_validate(obj).model_dump() for obj in objs]
 
     @classmethod
-    async def import_wx_safe(cls, auth: AuthSchema, file_content: bytes):
+    async def import_wx_safe(cls, auth: AuthSchema, file_content: ExcelSource):
         """
         批量导入
         """
@@ -267,81 +330,124 @@ class WxSafeService:
         return await crud.import_data(file_content)
 
     @classmethod
-    async def export_wx_safe(cls, auth: AuthSchema, search: dict):
+    def _build_export_query(cls, auth: AuthSchema, search: dict) -> Select:
         """
-        导出全量数据
+        导出查询：只查询导出列 (不构建 ORM 对象)，检索条件与列表一致
         """
-        from app.utils.excel_util import ExcelUtil
-        
-        # 提前备份检索条件，防止被 get_wx_safe_list 内部的 pop 操作清空
+        columns = [
+            getattr(WxSafeDetail if field in DETAIL_FIELDS else WxSafeInfo, field)
+            for field in EXPORT_MAPPING
+        ]
+        query = select(*columns).select_from(WxSafeInfo).outerjoin(WxSafeInfo.detail)
+        query = cls._apply_filters(auth, query, search, detail_joined=True)
+        return query.order_by(WxSafeInfo.created_time.desc())
+
+    @classmethod
+    async def _iter_export_rows(cls, db: AsyncSession, query: Select) -> AsyncIterator[list[tuple]]:
+        """
+        服务端游标分批读取导出数据，时间字段格式化为字符串
+
+        迭代器被提前关闭 (aclose) 时关闭结果集，释放服务端游标。
+        """
+        chunk_size = settings.WXSAFE_EXPORT_CHUNK_SIZE
+        result = await db.stream(query.execution_options(yield_per=chunk_size))
+        try:
+            async for rows in result.partitions(chunk_size):
+                yield [
+                    tuple(v.strftime("%Y-%m-%d %H:%M:%S") if isinstance(v, datetime) else v for v in row)
+                    for row in rows
+                ]
+        finally:
+            await result.close()
+
+    @classmethod
+    async def export_wx_safe(cls, auth: AuthSchema, search: dict) -> str:
+        """
+        导出全量数据 (Excel)
+
+        服务端游标分批读取并以只写模式写入临时文件，内存占用与导出总量无关。
+
+        返回:
+        - str: 临时文件路径 (响应发送后由调用方删除)
+        """
+        # 提前备份检索条件，防止被 _apply_filters 内部的 pop 操作清空
         query_snapshot = str(search) if search else "全量导出"
-        
-        # 1. 执行与列表查询相同的全量逻辑 (不分页)
-        # 为简化逻辑，我们这里复用 get_wx_safe_list 的过滤思想但返回全量
-        # 获取 10000 条作为全量限制
-        result = await cls.get_wx_safe_list(auth, 0, 10000, search)
-        list_data_展平 = result["items"]
-        
-        # 记录导出安全日志
+        query = cls._build_export_query(auth, search)
+
+        path, total = await ExcelUtil.write_rows2excel_file(
+            list(EXPORT_MAPPING.values()), cls._iter_export_rows(auth.db, query)
+        )
+
+        # 记录导出安全日志 (实际导出行数)
         await cls._record_audit_log(
-            auth, 
-            clue_number="ALL", 
+            auth,
+            clue_number="ALL",
             diff={
                 "export_query": query_snapshot,
-                "export_count": len(list_data_展平),
+                "export_count": total,
                 "export_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }, 
+            },
             action="EXPORT"
         )
-        
-        # 定义字段映射
-        mapping_dict = {
-            "clue_number": "线索编号",
-            "category": "涉诈或涉案",
-            "phone_number": "业务号码",
-            "report_month": "月份",
-            "incident_time": "涉诈（涉案）时间",
-            "city": "涉诈涉案地（城市）",
-            "fraud_type": "涉诈类型",
-            "victim_number": "受害人号码",
-            "join_date": "入网时间",
-            "online_duration": "在网时长（月）",
-            "install_type": "新装或存量",
-            "join_location": "入网属地",
-            "is_local_handle": "属地或非属地办理",
-            "owner_name": "机主名称",
-            "cert_address": "证件地址",
-            "customer_type": "政企或个人",
-            "other_phones": "名下手机号码",
-            "age": "年龄",
-            "agent_name": "代理商",
-            "store_name": "受理厅店",
-            "staff_id": "受理人工号",
-            "staff_name": "受理人",
-            "concurrent_cards": "与涉诈号码同时办理的卡号",
-            "package_name": "所办理套餐",
-            "is_fusion_package": "是否融合套餐",
-            "has_broadband": "是否有宽带业务",
-            "card_type": "主卡或副卡",
-            "is_compliant": "是否合规受理",
-            "has_resume_before": "涉诈涉案前是否有复通",
-            "is_resume_compliant": "复通是否规范",
-            "responsibility": "责任认定",
-            "is_self_or_family": "是否本人或亲属涉诈涉案",
-            "police_collab": "警企协同情况",
-            "investigation_note": "调查户主备注",
-            "abnormal_scene": "异常场景识别",
-            "feedback": "核查情况反馈"
-        }
-        
-        return ExcelUtil.export_list2excel(list_data_展平, mapping_dict)
+        return path
+
+    @classmethod
+    async def export_wx_safe_csv(cls, auth: AuthSchema, search: dict) -> AsyncIterator[bytes]:
+        """
+        导出全量数据 (CSV 流式响应)
+
+        响应体在请求会话关闭后才开始发送，因此使用独立会话读取；
+        导出结束 (或客户端中断) 时记录实际导出行数。客户端中断时任务已被取消，
+        关闭游标与写审计日志在屏蔽取消的作用域内执行，保证审计记录不丢失。
+
+        返回:
+        - AsyncIterator[bytes]: CSV 内容迭代器
+        """
+        query_snapshot = str(search) if search else "全量导出"
+        query = cls._build_export_query(auth, search)
+
+        async def generate() -> AsyncIterator[bytes]:
+            total = 0
+            completed = False
+            try:
+                yield ExcelUtil.rows2csv([list(EXPORT_MAPPING.values())], bom=True)
+                async with async_db_session() as db:
+                    async with db.begin():
+                        rows_iter = cls._iter_export_rows(db, query)
+                        try:
+                            async for rows in rows_iter:
+                                total += len(rows)
+                                yield ExcelUtil.rows2csv(rows)
+                        finally:
+                            # 客户端中断时显式关闭，在会话结束前释放服务端游标
+                            with anyio.CancelScope(shield=True):
+                                await rows_iter.aclose()
+                completed = True
+            finally:
+                with anyio.CancelScope(shield=True):
+                    async with async_db_session() as db:
+                        async with db.begin():
+                            await cls._record_audit_log(
+                                auth,
+                                clue_number="ALL",
+                                diff={
+                                    "export_query": query_snapshot,
+                                    "export_count": total,
+                                    "export_format": "csv",
+                                    "export_completed": completed,
+                                    "export_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                                },
+                                action="EXPORT",
+                                db=db,
+                            )
+
+        return generate()
 
     @classmethod
     async def get_template(cls):
         """
         获取导入模板
         """
-        from app.utils.excel_util import ExcelUtil
         header_list = [
             "线索编号", "涉诈或涉案", "业务号码", "月份", 
             "涉诈（涉案）时间", "涉诈涉案地（城市）", "涉诈类型", "受害人号码"
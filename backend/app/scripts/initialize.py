@@ -5,6 +5,8 @@ from typing import Any
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.v1.module_system.auth.schema import AuthSchema
+from app.api.v1.module_system.dept.crud import DeptCRUD
 from app.api.v1.module_system.dept.model import DeptModel
 from app.api.v1.module_system.dict.model import DictDataModel, DictTypeModel
 from app.api.v1.module_system.menu.model import MenuModel
@@ -120,6 +122,20 @@ class InitializeData:
                 log.error(f"❌️ 初始化 {table_name} 表数据失败: {e!s}")
                 raise
 
+    async def __init_dept_closure(self, db: AsyncSession) -> None:
+        """
+        部门闭包表为空时根据 sys_dept 生成（首次初始化或存量数据迁移）
+
+        参数:
+        - db (AsyncSession): 异步数据库会话。
+        """
+        dept_crud = DeptCRUD(AuthSchema(db=db))
+        if await dept_crud.has_closure_crud():
+            return
+        count = await dept_crud.rebuild_closure_crud()
+        if count:
+            log.info(f"✅️ 已生成 sys_dept_closure 表数据 {count} 条")
+
     def __create_objects_with_children(self, data: list[dict], model_class: type) -> list:
         """
         通用递归创建对象函数，处理嵌套的 children 数据
@@ -184,6 +200,7 @@ class InitializeData:
         async with async_db_session() as session:
             async with session.begin():
                 await self.__init_data(session)
+                await self.__init_dept_closure(session)
                 # session.add_all(objs)
                 # 确保提交事务
                 await session.commit()
@@ -1,16 +1,34 @@
+import asyncio
+import csv
 import io
-from typing import Any
+import os
+import tempfile
+from collections.abc import AsyncIterator, Iterator, Sequence
+from pathlib import Path
+from typing import Any, BinaryIO
 
 import pandas as pd
-from openpyxl import Workbook
+from openpyxl import Workbook, load_workbook
 from openpyxl.styles import Alignment, PatternFill
 from openpyxl.utils import get_column_letter
 from openpyxl.worksheet.datavalidation import DataValidation
 
+# Excel 来源：文件内容、文件路径或可 seek 的文件对象（如 UploadFile.file，大文件已落盘）
+ExcelSource = bytes | str | Path | BinaryIO
+
+# 单个工作表最大行数（含表头）
+_XLSX_MAX_ROWS = 1048576
+
+# 旧版 .xls（OLE2 复合文档）文件头
+_XLS_SIGNATURE = b"\xd0\xcf\x11\xe0"
+
 
 class ExcelUtil:
     """Excel文件处理工具类"""
 
+    # 流式读取默认每批行数
+    CHUNK_SIZE = 5000
+
     @classmethod
     def __mapping_list(cls, list_data: list[dict[str, Any]], mapping_dict: dict) -> list:
         """
@@ -106,3 +124,250 @@ class ExcelUtil:
         df.to_excel(buffer, index=False, engine="openpyxl")  # pyright: ignore[reportArgumentType]
         binary_data = buffer.getvalue()
         return binary_data
+
+    @classmethod
+    async def write_rows2excel_file(
+        cls,
+        header: list[str],
+        chunks: AsyncIterator[Sequence[Sequence[Any]]],
+    ) -> tuple[str, int]:
+        """
+        分批写入 Excel 临时文件（大数据量导出）。
+
+        使用 openpyxl 只写模式，已追加的行由 openpyxl 暂存在磁盘，内存占用与导出总量无关；
+        单个工作表写满后自动新建工作表并重复表头。追加与保存在线程池中执行，不阻塞事件循环。
+        文件使用完后由调用方删除（如 BackgroundTask(os.remove, path)）。
+
+        参数:
+        - header (list[str]): 表头列表。
+        - chunks (AsyncIterator[Sequence[Sequence[Any]]]): 按批产出的行数据。
+
+        返回:
+        - tuple[str, int]: 临时文件路径与数据行数。
+        """
+        wb = Workbook(write_only=True)
+        sheets: list[Any] = []
+        sheet_rows = _XLSX_MAX_ROWS
+
+        def append(rows: Sequence[Sequence[Any]]) -> None:
+            nonlocal sheet_rows
+            for row in rows:
+                if sheet_rows >= _XLSX_MAX_ROWS:
+                    ws = wb.create_sheet(f"Sheet{len(sheets) + 1}")
+                    ws.append(header)
+                    sheets.append(ws)
+                    sheet_rows = 1
+                sheets[-1].append(list(row))
+                sheet_rows += 1
+
+        fd, path = tempfile.mkstemp(suffix=".xlsx")
+        os.close(fd)
+        total = 0
+        try:
+            async for rows in chunks:
+                await asyncio.to_thread(append, rows)
+                total += len(rows)
+            if not sheets:
+                # 无数据时仍输出表头
+                wb.create_sheet("Sheet1").append(header)
+            await asyncio.to_thread(wb.save, path)
+        except BaseException:
+            os.remove(path)
+            raise
+        return path, total
+
+    @classmethod
+    def rows2csv(cls, rows: Sequence[Sequence[Any]], bom: bool = False) -> bytes:
+        """
+        将一批行数据编码为 CSV（UTF-8），用于流式导出。
+
+        参数:
+        - rows (Sequence[Sequence[Any]]): 行数据（首批可包含表头）。
+        - bom (bool): 是否添加 BOM（首批传 True，Excel 打开中文不乱码）。
+
+        返回:
+        - bytes: CSV 内容。
+        """
+        buffer = io.StringIO()
+        if bom:
+            buffer.write("\ufeff")
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue().encode("utf-8")
+
+    @classmethod
+    def __open(cls, source: ExcelSource) -> BinaryIO | str | Path:
+        """将 bytes 包装为文件对象，其余来源原样返回"""
+        return io.BytesIO(source) if isinstance(source, bytes) else source
+
+    @classmethod
+    def __is_xls(cls, source: BinaryIO | str | Path) -> bool:
+        """根据文件头判断是否为旧版 .xls 文件"""
+        if isinstance(source, (str, Path)):
+            with open(source, "rb") as f:
+                return f.read(4) == _XLS_SIGNATURE
+        position = source.tell()
+        head = source.read(4)
+        source.seek(position)
+        return head == _XLS_SIGNATURE
+
+    @staticmethod
+    def __convert_cell(value: Any) -> Any:
+        """与 pandas openpyxl 引擎一致：整数值的浮点数转为 int，空字符串视为缺失"""
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        if value == "":
+            return None
+        return value
+
+    @staticmethod
+    def __build_header(row: tuple) -> list[str]:
+        """生成表头：空表头命名为 Unnamed: n，重复表头追加 .1、.2（与 pandas 一致）"""
+        header: list[str] = []
+        seen: dict[str, int] = {}
+        for index, value in enumerate(row):
+            name = str(value).strip() if value is not None else f"Unnamed: {index}"
+            if name in seen:
+                seen[name] += 1
+                name = f"{name}.{seen[name]}"
+            else:
+                seen[name] = 0
+            header.append(name)
+        return header
+
+    @classmethod
+    def get_sheet_names(cls, source: ExcelSource) -> list[str]:
+        """
+        获取工作表名称（只读模式，不加载单元格）。
+
+        参数:
+        - source (ExcelSource): Excel 文件内容、路径或文件对象。
+
+        返回:
+        - list[str]: 工作表名称列表。
+        """
+        source = cls.__open(source)
+        if cls.__is_xls(source):
+            return pd.ExcelFile(source, engine="xlrd").sheet_names
+        wb = load_workbook(source, read_only=True)
+        try:
+            return wb.sheetnames
+        finally:
+            wb.close()
+
+    @classmethod
+    def iter_excel_chunks(
+        cls,
+        source: ExcelSource,
+        chunk_size: int | None = None,
+        sheet_name: str | int = 0,
+        usecols: list[str] | None = None,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        按批流式读取 Excel，每批返回一个 DataFrame（首行为表头）。
+
+        .xlsx 使用 openpyxl 只读模式逐行读取，内存占用与批大小相关而与文件大小无关；
+        旧版 .xls 无流式读取方式，整表读取后按批返回。
+        文件没有数据行时返回一个只有表头的空 DataFrame，便于调用方统一校验表头。
+
+        参数:
+        - source (ExcelSource): Excel 文件内容、路径或文件对象。
+        - chunk_size (int | None): 每批行数，默认 CHUNK_SIZE。
+        - sheet_name (str | int): 工作表名称或序号，默认第一个工作表。
+        - usecols (list[str] | None): 只保留的列（按表头名称），不存在的列忽略。
+
+        返回:
+        - Iterator[pd.DataFrame]: DataFrame 迭代器。
+        """
+        chunk_size = chunk_size or cls.CHUNK_SIZE
+        source = cls.__open(source)
+
+        if cls.__is_xls(source):
+            df = pd.read_excel(source, sheet_name=sheet_name, engine="xlrd")
+            if usecols:
+                df = df[[col for col in df.columns if col in usecols]]
+            if df.empty:
+                yield df
+            for start in range(0, len(df), chunk_size):
+                yield df.iloc[start:start + chunk_size].reset_index(drop=True)
+            return
+
+        wb = load_workbook(source, read_only=True, data_only=True)
+        try:
+            ws = wb.worksheets[sheet_name] if isinstance(sheet_name, int) else wb[sheet_name]
+            rows = ws.iter_rows(values_only=True)
+            header_row = next(rows, None)
+            if header_row is None:
+                yield pd.DataFrame()
+                return
+            header = cls.__build_header(header_row)
+            indexes = [i for i, name in enumerate(header) if not usecols or name in usecols]
+            columns = [header[i] for i in indexes]
+
+            yielded = False
+            batch: list[list[Any]] = []
+            for row in rows:
+                values = [cls.__convert_cell(row[i]) if i < len(row) else None for i in indexes]
+                # 跳过空行（只读模式下格式化过的空行也会返回）
+                if all(value is None for value in values):
+                    continue
+                batch.append(values)
+                if len(batch) >= chunk_size:
+                    yield pd.DataFrame(batch, columns=columns)
+                    yielded = True
+                    batch = []
+            if batch or not yielded:
+                yield pd.DataFrame(batch, columns=columns)
+        finally:
+            wb.close()
+
+    @classmethod
+    async def aiter_excel_chunks(
+        cls,
+        source: ExcelSource,
+        chunk_size: int | None = None,
+        sheet_name: str | int = 0,
+        usecols: list[str] | None = None,
+    ) -> AsyncIterator[pd.DataFrame]:
+        """
+        异步按批读取 Excel，解析在线程池中进行，不阻塞事件循环。
+
+        参数与 iter_excel_chunks 相同；调用方处理完一批后才会读取下一批。
+
+        返回:
+        - AsyncIterator[pd.DataFrame]: DataFrame 异步迭代器。
+        """
+        chunks = cls.iter_excel_chunks(source, chunk_size, sheet_name, usecols)
+        done = object()
+        try:
+            while True:
+                chunk = await asyncio.to_thread(next, chunks, done)
+                if chunk is done:
+                    return
+                yield chunk
+        finally:
+            await asyncio.to_thread(chunks.close)
+
+    @classmethod
+    async def read_excel(
+        cls,
+        source: ExcelSource,
+        sheet_name: str | int = 0,
+        usecols: list[str] | None = None,
+    ) -> pd.DataFrame:
+        """
+        在线程池中读取整个工作表（需要全表统计的场景），不阻塞事件循环。
+
+        参数:
+        - source (ExcelSource): Excel 文件内容、路径或文件对象。
+        - sheet_name (str | int): 工作表名称或序号，默认第一个工作表。
+        - usecols (list[str] | None): 只保留的列，减少大文件内存占用。
+
+        返回:
+        - pd.DataFrame: 工作表数据。
+        """
+
+        def read() -> pd.DataFrame:
+            chunks = list(cls.iter_excel_chunks(source, sheet_name=sheet_name, usecols=usecols))
+            return pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+
+        return await asyncio.to_thread(read)
@@ -1,15 +1,238 @@
+import ipaddress
 import re
+from array import array
+from bisect import bisect_right
+from collections.abc import Iterable
+from functools import lru_cache
+from pathlib import Path
 
 import httpx
 
+from app.config.setting import settings
 from app.core.logger import log
 
 
+class IpMatcher:
+    """
+    IP 名单匹配器
+
+    初始化时将名单预解析为精确地址集合与按前缀长度分组的网段集合，
+    匹配时只需集合查找（网段按前缀长度逐组掩码查找，组数不超过 33/129），不再遍历名单。
+    名单项支持单个地址（192.168.1.1）与 CIDR 网段（10.0.0.0/8），无法解析的项忽略。
+    """
+
+    def __init__(self, items: Iterable[str] | None = None) -> None:
+        self.addresses: set[str] = set()
+        # {(IP版本, 前缀长度): {网络地址整数}}
+        self.networks: dict[tuple[int, int], set[int]] = {}
+        for item in items or []:
+            self.add(str(item))
+
+    def add(self, item: str) -> None:
+        """
+        添加名单项。
+
+        参数:
+        - item (str): IP 地址或 CIDR 网段。
+
+        返回:
+        - None
+        """
+        item = item.strip()
+        if not item:
+            return
+        if "/" not in item:
+            self.addresses.add(item)
+            return
+        try:
+            network = ipaddress.ip_network(item, strict=False)
+        except ValueError:
+            log.warning(f"忽略无法解析的IP名单项: {item}")
+            return
+        key = (network.version, network.prefixlen)
+        self.networks.setdefault(key, set()).add(int(network.network_address))
+
+    def match(self, ip: str | None) -> bool:
+        """
+        判断 IP 是否命中名单。
+
+        参数:
+        - ip (str | None): IP 地址。
+
+        返回:
+        - bool: 是否命中。
+        """
+        if not ip:
+            return False
+        if ip in self.addresses:
+            return True
+        if not self.networks:
+            return False
+        try:
+            address = ipaddress.ip_address(ip)
+        except ValueError:
+            return False
+        value = int(address)
+        max_len = address.max_prefixlen
+        for (version, prefixlen), network_set in self.networks.items():
+            if version != address.version:
+                continue
+            mask = ((1 << prefixlen) - 1) << (max_len - prefixlen) if prefixlen else 0
+            if value & mask in network_set:
+                return True
+        return False
+
+    def __bool__(self) -> bool:
+        return bool(self.addresses or self.networks)
+
+
+class IpRangeDatabase:
+    """
+    离线 IP 归属地库
+
+    将 IP 段文件加载为按起始地址排序的整数数组，查询时二分查找，不依赖网络。
+    文件每行一个 IP 段，格式与 ip2region 源数据一致:
+    起始IP|结束IP|国家|区域|省份|城市|运营商（字段为 0 表示未知，# 开头为注释）。
+    起止地址支持点分格式或整数格式，仅支持 IPv4。
+    """
+
+    def __init__(self) -> None:
+        self.starts: array = array("L")
+        self.ends: array = array("L")
+        # 每个 IP 段对应的归属地在 locations 中的下标，相同归属地只保存一份
+        self.indexes: array = array("L")
+        self.locations: list[str] = []
+
+    @classmethod
+    def load(cls, path: Path) -> "IpRangeDatabase":
+        """
+        从文件加载 IP 段。
+
+        参数:
+        - path (Path): IP 段文件路径。
+
+        返回:
+        - IpRangeDatabase: 加载后的 IP 库，无法解析的行忽略。
+        """
+        database = cls()
+        location_ids: dict[str, int] = {}
+        ranges: list[tuple[int, int, int]] = []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                fields = line.split("|")
+                if len(fields) < 3:
+                    continue
+                try:
+                    start = cls.to_int(fields[0])
+                    end = cls.to_int(fields[1])
+                except ValueError:
+                    continue
+                location = "-".join("" if field == "0" else field for field in fields[2:])
+                location_id = location_ids.setdefault(location, len(location_ids))
+                ranges.append((start, end, location_id))
+
+        ranges.sort()
+        database.locations = list(location_ids)
+        database.starts = array("L", (item[0] for item in ranges))
+        database.ends = array("L", (item[1] for item in ranges))
+        database.indexes = array("L", (item[2] for item in ranges))
+        return database
+
+    @staticmethod
+    def to_int(ip: str) -> int:
+        """
+        将点分或整数格式的 IPv4 地址转换为整数。
+
+        参数:
+        - ip (str): IPv4 地址。
+
+        返回:
+        - int: 地址整数。
+
+        异常:
+        - ValueError: 地址格式不合法时抛出。
+        """
+        ip = ip.strip()
+        if ip.isdigit():
+            return int(ip)
+        return int(ipaddress.IPv4Address(ip))
+
+    def lookup(self, ip: str) -> str | None:
+        """
+        查询 IP 归属地。
+
+        参数:
+        - ip (str): IPv4 地址。
+
+        返回:
+        - str | None: 归属地（国家-区域-省份-城市-运营商），未收录时返回 None。
+        """
+        try:
+            value = self.to_int(ip)
+        except ValueError:
+            return None
+        pos = bisect_right(self.starts, value) - 1
+        if pos < 0 or value > self.ends[pos]:
+            return None
+        return self.locations[self.indexes[pos]]
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+
 class IpLocalUtil:
     """
     获取IP归属地工具类
+
+    优先查询离线 IP 库（IP_LOCATION_DB_PATH），结果经 LRU 缓存；
+    仅在开启 IP_LOCATION_ONLINE 且离线库未命中时调用在线接口。
     """
 
+    _database: IpRangeDatabase | None = None
+
+    @classmethod
+    def load_database(cls, path: Path | None = None) -> IpRangeDatabase:
+        """
+        加载（或重新加载）离线 IP 库，并清空查询缓存。
+
+        参数:
+        - path (Path | None): IP 段文件路径，默认使用 IP_LOCATION_DB_PATH。
+
+        返回:
+        - IpRangeDatabase: 加载后的 IP 库，文件不存在或加载失败时为空库。
+        """
+        path = Path(path or settings.IP_LOCATION_DB_PATH)
+        database = IpRangeDatabase()
+        if path.exists():
+            try:
+                database = IpRangeDatabase.load(path)
+                log.info(f"离线IP库加载完成: {path}, 共 {len(database)} 个IP段")
+            except Exception as e:
+                log.error(f"离线IP库加载失败: {e}")
+        else:
+            log.warning(f"离线IP库文件不存在: {path}")
+        cls._database = database
+        cls.lookup_local.cache_clear()
+        return database
+
+    @classmethod
+    @lru_cache(maxsize=settings.IP_LOCATION_CACHE_SIZE)
+    def lookup_local(cls, ip: str) -> str | None:
+        """
+        查询离线 IP 库（带 LRU 缓存），首次调用时加载 IP 库。
+
+        参数:
+        - ip (str): IP地址。
+
+        返回:
+        - str | None: IP归属地信息，未收录时返回None。
+        """
+        database = cls._database if cls._database is not None else cls.load_database()
+        return database.lookup(ip)
+
     @classmethod
     def is_valid_ip(cls, ip: str) -> bool:
         """
@@ -60,8 +283,14 @@ class IpLocalUtil:
         if cls.is_private_ip(ip):
             return "内网IP"
 
+        location = cls.lookup_local(ip)
+        if location is not None:
+            return location
+        if not settings.IP_LOCATION_ONLINE:
+            return "未知"
+
         try:
-            # 使用ip-api.com API获取IP归属地信息
+            # 离线库未命中时使用在线接口获取IP归属地信息
             async with httpx.AsyncClient(timeout=10.0) as client:
                 # 尝试使用 ip9.com.cn API
                 url = f"https://ip9.com.cn/get?ip={ip}"
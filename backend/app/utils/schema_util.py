@@ -79,4 +79,29 @@ async def set_default_schema(engine: AsyncEngine) -> bool:
             
     except SQLAlchemyError as e:
         log.error(f"❌ 设置默认 schema 失败: {e}")
-        return False
\ No newline at end of file
+        return False
+
+async def create_extension_if_not_exists(engine: AsyncEngine, extension: str) -> bool:
+    """
+    如果扩展不存在，则创建它（如 pg_trgm 三元组索引）
+
+    参数:
+        engine: 异步数据库引擎
+        extension: 扩展名称
+
+    返回:
+        bool: 是否成功创建或已存在
+    """
+    # 只有 PostgreSQL 需要扩展
+    if settings.DATABASE_TYPE != "postgres":
+        return True
+
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(text(f"CREATE EXTENSION IF NOT EXISTS {extension}"))
+            log.info(f"✅ PostgreSQL 扩展已就绪: {extension}")
+            return True
+
+    except SQLAlchemyError as e:
+        log.error(f"❌ 创建 PostgreSQL 扩展 {extension} 失败（需数据库管理员权限）: {e}")
+        return False
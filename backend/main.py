@@ -1,3 +1,4 @@
+import asyncio
 import os
 from typing import Annotated
 
@@ -125,5 +126,30 @@ def upgrade(
     typer.echo("所有迁移已应用。")
 
 
+@fastapiadmin_cli.command(
+    name="rebuild-dept-closure",
+    help="根据部门表重建部门闭包表, 运行 python main.py rebuild-dept-closure --env=dev",
+)
+def rebuild_dept_closure(
+    env: Annotated[
+        EnvironmentEnum, typer.Option("--env", help="运行环境 (dev, prod)")
+    ] = EnvironmentEnum.DEV,
+) -> None:
+    """重建部门闭包表"""
+    os.environ["ENVIRONMENT"] = env.value
+
+    async def _rebuild() -> int:
+        from app.api.v1.module_system.auth.schema import AuthSchema
+        from app.api.v1.module_system.dept.service import DeptService
+        from app.core.database import async_db_session
+
+        async with async_db_session() as session:
+            async with session.begin():
+                return await DeptService.rebuild_closure_service(auth=AuthSchema(db=session))
+
+    count = asyncio.run(_rebuild())
+    typer.echo(f"部门闭包表已重建, 共 {count} 条关系")
+
+
 if __name__ == "__main__":
     fastapiadmin_cli()
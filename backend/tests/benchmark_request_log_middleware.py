@@ -0,0 +1,90 @@
+"""
+RequestLogMiddleware 吞吐基准
+
+对比原实现（BaseHTTPMiddleware + call_next）与纯 ASGI 实现在普通 JSON 接口
+及流式接口（模拟 SSE）上的请求吞吐。不连接 Redis，中间件配置使用默认快照。
+
+执行命令: python tests/benchmark_request_log_middleware.py
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import httpx
+from starlette.applications import Starlette
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from app.api.v1.module_system.params.service import MiddlewareConfig, ParamsService
+from app.core.logger import log
+from app.core.middlewares import RequestLogMiddleware
+
+ROUNDS = 2000
+CHUNKS = 50
+
+
+class LegacyRequestLogMiddleware(BaseHTTPMiddleware):
+    """原实现的处理流程（BaseHTTPMiddleware）"""
+
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        start_time = time.time()
+        RequestLogMiddleware._extract_session_id_from_request(request)
+        config = await ParamsService.get_middleware_config(request.app.state.redis)
+        config.ip_black_list.match(request.client.host if request.client else "")
+        response = await call_next(request)
+        response.headers["X-Process-Time"] = str(round(time.time() - start_time, 5))
+        return response
+
+
+async def json_endpoint(request: Request) -> Response:
+    return JSONResponse({"code": 0, "msg": "ok", "data": list(range(20))})
+
+
+async def stream_endpoint(request: Request) -> Response:
+    async def events():
+        for i in range(CHUNKS):
+            yield f"data: {i}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+def build_app(middleware: type) -> Starlette:
+    app = Starlette(
+        routes=[Route("/json", json_endpoint), Route("/stream", stream_endpoint)],
+    )
+    app.add_middleware(middleware)
+    app.state.redis = object()
+    return app
+
+
+async def run(app: Starlette, path: str) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        response = await client.get(path)
+        assert "X-Process-Time" in response.headers, "缺少 X-Process-Time 响应头"
+        start = time.perf_counter()
+        for _ in range(ROUNDS):
+            await client.get(path)
+        return ROUNDS / (time.perf_counter() - start)
+
+
+async def main() -> None:
+    # 使用默认配置快照并关闭日志输出，只统计中间件本身的开销
+    ParamsService._middleware_config = MiddlewareConfig()
+    ParamsService.MIDDLEWARE_CONFIG_TTL = float("inf")
+    log.remove()
+
+    for path in ("/json", "/stream"):
+        legacy = await run(build_app(LegacyRequestLogMiddleware), path)
+        pure = await run(build_app(RequestLogMiddleware), path)
+        print(f"{path:8} 原实现: {legacy:9.1f} req/s  纯ASGI: {pure:9.1f} req/s  提升: {pure / legacy:5.2f} x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
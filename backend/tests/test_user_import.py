@@ -0,0 +1,171 @@
+"""
+用户批量导入测试
+
+数据层以内存实现替换，校验导入流程本身：数据权限范围外的用户不允许更新、
+部门编号预校验、批量写入失败时逐行定位错误行。
+
+执行命令: pytest tests/test_user_import.py
+"""
+
+import asyncio
+import contextlib
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from app.api.v1.module_system.dept.crud import DeptCRUD
+from app.api.v1.module_system.user import service as user_service
+from app.api.v1.module_system.user.crud import UserCRUD
+from app.api.v1.module_system.user.service import UserService
+from app.core.exceptions import CustomException
+from app.utils.excel_util import ExcelUtil
+
+
+class FakeSession:
+    """只支持保存点的会话"""
+
+    @contextlib.asynccontextmanager
+    async def begin_nested(self):
+        yield
+
+
+class FakeUpload:
+    file = None
+
+    async def close(self) -> None:
+        pass
+
+
+def build_frame(rows: list[tuple]) -> pd.DataFrame:
+    return pd.DataFrame(
+        rows, columns=["部门编号", "用户名", "名称", "邮箱", "手机号", "性别", "状态"]
+    )
+
+
+@pytest.fixture
+def store(monkeypatch: pytest.MonkeyPatch) -> dict:
+    """
+    内存数据:
+    - users: 已存在用户 {用户名: 是否超管}
+    - accessible: 当前用户数据权限范围内的用户名
+    - depts: 存在的部门
+    - bad_mobiles: 写入时触发唯一约束冲突的手机号
+    """
+    state = {
+        "users": {"admin": True, "scoped": False, "outsider": False},
+        "accessible": {"scoped"},
+        "depts": {1, 2},
+        "bad_mobiles": set(),
+        "created": [],
+        "upserted": [],
+    }
+
+    async def get_superuser_flags_crud(self, usernames):
+        return {name: state["users"][name] for name in usernames if name in state["users"]}
+
+    async def get_accessible_usernames_crud(self, usernames):
+        return {name for name in usernames if name in state["accessible"]}
+
+    async def get_existing_ids_crud(self, ids):
+        return {i for i in ids if i in state["depts"]}
+
+    async def bulk_create(self, data, **kwargs):
+        for item in data:
+            if item.mobile in state["bad_mobiles"]:
+                raise CustomException(msg=f"批量创建失败: 手机号 {item.mobile} 已存在")
+        state["created"].extend(item.username for item in data)
+        return len(data)
+
+    async def bulk_upsert(self, data, **kwargs):
+        state["upserted"].extend(item["username"] for item in data)
+        return len(data)
+
+    async def invalidate(*args, **kwargs):
+        return None
+
+    monkeypatch.setattr(UserCRUD, "get_superuser_flags_crud", get_superuser_flags_crud)
+    monkeypatch.setattr(UserCRUD, "get_accessible_usernames_crud", get_accessible_usernames_crud)
+    monkeypatch.setattr(DeptCRUD, "get_existing_ids_crud", get_existing_ids_crud)
+    monkeypatch.setattr(UserCRUD, "bulk_create", bulk_create)
+    monkeypatch.setattr(UserCRUD, "bulk_upsert", bulk_upsert)
+    monkeypatch.setattr(user_service.AuthCache, "invalidate", invalidate)
+    monkeypatch.setattr(user_service.PwdUtil, "set_password_hash", lambda password: "hash")
+    return state
+
+
+def run_import(monkeypatch: pytest.MonkeyPatch, df: pd.DataFrame, update_support: bool) -> str:
+    async def read_excel(*args, **kwargs):
+        return df
+
+    monkeypatch.setattr(ExcelUtil, "read_excel", read_excel)
+    auth = SimpleNamespace(db=FakeSession(), user=None)
+    return asyncio.run(
+        UserService.batch_import_user_service(
+            auth=auth, file=FakeUpload(), update_support=update_support
+        )
+    )
+
+
+def test_import_rejects_users_outside_data_scope(store: dict, monkeypatch: pytest.MonkeyPatch) -> None:
+    """数据权限范围外的已存在用户不允许通过导入更新"""
+    df = build_frame([
+        (1, "scoped", "范围内", "a@x.com", "13800000001", "男", "正常"),
+        (1, "outsider", "范围外", "b@x.com", "13800000002", "男", "正常"),
+        (1, "admin", "超管", "c@x.com", "13800000003", "男", "正常"),
+    ])
+    result = run_import(monkeypatch, df, update_support=True)
+
+    assert store["upserted"] == ["scoped"]
+    assert "成功导入 1 条数据" in result
+    assert "第2行: 用户 outsider 不在数据权限范围内，不允许修改" in result
+    assert "第3行: 超级管理员不允许修改" in result
+
+
+def test_import_reports_unknown_dept_per_row(store: dict, monkeypatch: pytest.MonkeyPatch) -> None:
+    """部门编号不存在的行单独报错，其余行正常导入"""
+    df = build_frame([
+        (1, "alice", "A", "a@x.com", "13800000011", "女", "正常"),
+        (99, "bob", "B", "b@x.com", "13800000012", "男", "正常"),
+        (2, "carol", "C", "c@x.com", "13800000013", "女", "停用"),
+    ])
+    result = run_import(monkeypatch, df, update_support=False)
+
+    assert store["created"] == ["alice", "carol"]
+    assert "成功导入 2 条数据" in result
+    assert "第2行: 部门编号 99 不存在" in result
+
+
+def test_import_retries_failed_batch_row_by_row(store: dict, monkeypatch: pytest.MonkeyPatch) -> None:
+    """批量写入失败时逐行重试，只有冲突行报错"""
+    store["bad_mobiles"] = {"13800000022"}
+    df = build_frame([
+        (1, "alice", "A", "a@x.com", "13800000021", "女", "正常"),
+        (1, "bob", "B", "b@x.com", "13800000022", "男", "正常"),
+        (1, "carol", "C", "c@x.com", "13800000023", "女", "正常"),
+    ])
+    result = run_import(monkeypatch, df, update_support=False)
+
+    assert store["created"] == ["alice", "carol"]
+    assert "成功导入 2 条数据" in result
+    assert "第2行: 异常批量创建失败: 手机号 13800000022 已存在" in result
+
+
+def test_import_existing_user_without_update_support(store: dict, monkeypatch: pytest.MonkeyPatch) -> None:
+    """不支持更新时已存在用户报错，文件内重复用户名报错"""
+    df = build_frame([
+        (1, "scoped", "S", "a@x.com", "13800000031", "男", "正常"),
+        (1, "dave", "D", "d@x.com", "13800000032", "男", "正常"),
+        (1, "dave", "D2", "e@x.com", "13800000033", "男", "正常"),
+    ])
+    result = run_import(monkeypatch, df, update_support=False)
+
+    assert store["created"] == ["dave"]
+    assert store["upserted"] == []
+    assert "第1行: 用户 scoped 已存在" in result
+    assert "第3行: 用户 dave 在文件中重复" in result
+
+
+# 运行所有测试
+if __name__ == "__main__":
+    pytest.main(["-v", "tests/test_user_import.py"])
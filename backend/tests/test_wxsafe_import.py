@@ -0,0 +1,87 @@
+"""
+网信安导入清洗与校验测试
+
+校验按列清洗（号码、时间、手机号预校验）与批量校验的逐行结果：
+每行报告全部字段错误，错误信息与逐行 Pydantic 校验格式一致。
+
+执行命令: pytest tests/test_wxsafe_import.py
+"""
+
+import pandas as pd
+import pytest
+
+from app.plugin.module_wxsafe.info.crud import (
+    IMPORT_MAPPING,
+    normalize_import_frame,
+    validate_import_rows,
+)
+
+
+def build_frame(rows: list[tuple]) -> pd.DataFrame:
+    return pd.DataFrame(rows, columns=list(IMPORT_MAPPING))
+
+
+def test_normalize_import_frame_cleans_columns() -> None:
+    """号码去掉 Excel 数值带出的 .0，时间批量解析，缺失值为 None"""
+    df = build_frame([
+        (1001.0, "涉诈", 13812345678.0, "202401", "2024-01-15 12:00:00", "南京", None, 13912345678.0),
+    ])
+    records, errors = normalize_import_frame(df)
+
+    assert errors == {}
+    assert records[0]["clue_number"] == "1001"
+    assert records[0]["phone_number"] == "13812345678"
+    assert records[0]["victim_number"] == "13912345678"
+    assert records[0]["incident_time"].year == 2024
+    assert records[0]["fraud_type"] is None
+
+
+def test_normalize_import_frame_prechecks_phone_and_time() -> None:
+    """手机号格式与无法识别的时间按行记录错误"""
+    df = build_frame([
+        ("XS1", "涉诈", "13812345678", "202401", "2024-01-15", "南京", None, None),
+        ("XS2", "涉诈", "12345", "202401", "未知时间", "南京", None, None),
+    ])
+    records, errors = normalize_import_frame(df)
+
+    assert list(errors) == [1]
+    assert errors[1] == [
+        "incident_time: 无法识别的时间格式 (未知时间)",
+        "phone_number: 手机号格式不正确",
+    ]
+    assert records[1]["incident_time"] is None
+
+
+def test_validate_import_rows_reports_all_errors_of_a_row() -> None:
+    """手机号预校验失败的行同时报告其他字段错误，且不计入通过的行"""
+    df = build_frame([
+        ("XS1", "涉诈", "13812345678", "202401", None, "南京", None, None),
+        (None, "涉诈", "12345", "202401", None, "南京", None, None),
+        (None, "涉案", "13812345679", "202401", None, "南京", None, None),
+    ])
+    records, errors = normalize_import_frame(df)
+    valid = validate_import_rows(records, errors)
+
+    assert list(valid) == [0]
+    assert valid[0].clue_number == "XS1"
+    assert errors[1][0] == "phone_number: 手机号格式不正确"
+    assert [msg.split(":")[0] for msg in errors[1]] == ["phone_number", "clue_number"]
+    assert [msg.split(":")[0] for msg in errors[2]] == ["clue_number"]
+
+
+def test_validate_import_rows_all_valid() -> None:
+    """全部通过时一次校验返回全部行"""
+    df = build_frame([
+        (f"XS{i}", "涉诈", f"1381234567{i}", "202401", None, None, None, None) for i in range(5)
+    ])
+    records, errors = normalize_import_frame(df)
+    valid = validate_import_rows(records, errors)
+
+    assert errors == {}
+    assert sorted(valid) == list(range(5))
+    assert [valid[i].phone_number for i in range(5)] == [f"1381234567{i}" for i in range(5)]
+
+
+# 运行所有测试
+if __name__ == "__main__":
+    pytest.main(["-v", "tests/test_wxsafe_import.py"])
@@ -1,6 +1,9 @@
-import pandas as pd
-import sys
 import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from app.utils.excel_util import ExcelUtil  # noqa: E402
 
 files = [
     "UML/202511百色易问工单清单1.xls",
@@ -10,39 +13,37 @@ files = [
 for f in files:
     print(f"--- File: {f} ---")
     try:
-        # Open the file to get sheet names first
-        xls = pd.ExcelFile(f, engine='xlrd')
-        sheet_names = xls.sheet_names
+        # Read sheet names only, without loading cells
+        sheet_names = ExcelUtil.get_sheet_names(f)
         print(f"All Sheet Names: {sheet_names}")
 
         # Indices for 2nd and 3rd sheets (index 1 and 2)
         target_indices = [1, 2]
-        
+
         for idx in target_indices:
             if idx < len(sheet_names):
                 sheet_name = sheet_names[idx]
-                print(f"
-  >>> Reading Sheet #{idx+1}: '{sheet_name}'")
+                print(f"\n  >>> Reading Sheet #{idx + 1}: '{sheet_name}'")
                 try:
-                    df = pd.read_excel(f, sheet_name=sheet_name, engine='xlrd')
-                    print(f"  Columns ({len(df.columns)}): {df.columns.tolist()}")
-                    print(f"  Row count: {len(df)}")
-                    if not df.empty:
+                    head = None
+                    row_count = 0
+                    for df in ExcelUtil.iter_excel_chunks(f, sheet_name=sheet_name):
+                        if head is None:
+                            head = df.head(3)
+                            print(f"  Columns ({len(df.columns)}): {df.columns.tolist()}")
+                        row_count += len(df)
+                    print(f"  Row count: {row_count}")
+                    if head is not None and not head.empty:
                         print("  First 3 rows:")
                         try:
-                             print(df.head(3).to_markdown(index=False))
+                            print(head.to_markdown(index=False))
                         except ImportError:
-                             print(df.head(3).to_string(index=False))
-                        except AttributeError:
-                             print(df.head(3).to_string(index=False))
+                            print(head.to_string(index=False))
                 except Exception as e:
                     print(f"  Error reading sheet '{sheet_name}': {e}")
             else:
-                print(f"
-  >>> Sheet #{idx+1} does not exist.")
-                
+                print(f"\n  >>> Sheet #{idx + 1} does not exist.")
+
     except Exception as e:
         print(f"Error opening file {f}: {e}")
-    print("
-" + "="*50 + "
-")
+    print("\n" + "=" * 50 + "\n")